@@ -1,8 +1,11 @@
-import json
-from math import floor
 import os
+import sys
 
-_HEADER = "test_datetime,io_bs,io_rw,io_rwmixread,read_iops,read_bw_bytes,read_clat_ns_mean,write_iops,write_bw_bytes,write_clat_ns_mean,error,logfile"
+# The extraction engine is shared with the multi-file converter in project_2,
+# which is reached like project_2 reaches project_3, see project_2/sibling.py
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, "project_2"))
+import extract  # noqa: E402
 
 
 def convert(path: str = None):
@@ -28,38 +31,19 @@ def convert(path: str = None):
     if not os.path.exists(path):
         raise ValueError(f"Not a valid path: {path}")
 
-    # Load .JSON file
-    file_dict = None
-    with open(path) as f:
-        file_dict = json.load(f)
-
-    # Get desired data from .JSON file
-    timestamp = file_dict["timestamp"]
-    bs = file_dict["jobs"][0]["job options"]["bs"]
-    rw = file_dict["global options"]["rw"]
-    rwmixread = file_dict["global options"].get("rwmixread", "")
-    read_dict = file_dict["jobs"][0]["read"]
-    write_dict = file_dict["jobs"][0]["write"]
-    read_iops = floor(read_dict["iops"])
-    read_bw_bytes = floor(read_dict["bw_bytes"])
-    read_clatnsmean = floor(read_dict["clat_ns"]["mean"])
-    write_iops = floor(write_dict["iops"])
-    write_bw_bytes = floor(write_dict["bw_bytes"])
-    write_clatnsmean = floor(write_dict["clat_ns"]["mean"])
-    err_num = file_dict["jobs"][0]["error"]
+    # Get desired data from .JSON file, in the column order of extract.HEADER
+    fields = extract.read(path)
     logfile = os.path.basename(path)
 
     # Format retrieved data
-    data = f"{timestamp},{bs},{rw},{rwmixread},{read_iops},{read_bw_bytes}," \
-           f"{read_clatnsmean},{write_iops},{write_bw_bytes}," \
-           f"{write_clatnsmean},{err_num},{logfile}"
+    data = ",".join([*map(str, fields), logfile])
 
     # Output data to .csv file along with header
     name, _ = logfile.split(".")
     name = name + ".csv"
     new_file_path = os.path.join(os.getcwd(), name)
     with open(new_file_path, "w") as f:
-        write_data = "\n".join([_HEADER, data])
+        write_data = "\n".join([extract.HEADER, data])
         f.write(write_data)
         print("Conversion successful: {new_file_path}".format(
             new_file_path=new_file_path))
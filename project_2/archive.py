@@ -0,0 +1,366 @@
+from collections.abc import Iterator
+import os
+
+# Suffixes of files compressed with gzip, bzip2, xz or zstd. The modules that
+# decompress them are imported on first use, so reading plain files never
+# loads them.
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+
+# Tar archive suffixes and the compression of the whole archive
+_TARS = {".tar": None, ".tar.gz": ".gz", ".tgz": ".gz", ".tar.bz2": ".bz2",
+         ".tbz2": ".bz2", ".tar.xz": ".xz", ".txz": ".xz", ".tar.zst": ".zst"}
+
+TAR_SUFFIXES = tuple(_TARS)
+
+# Member names converted from a tar archive
+_MEMBER_SUFFIXES = tuple([".json"] + [".json" + suffix
+                                      for suffix in COMPRESSED_SUFFIXES])
+
+# Bytes read from a file per call
+_CHUNK_SIZE = 1024 * 1024
+
+# Tar headers and member data come in blocks of 512 bytes
+_BLOCK = 512
+
+# Type flags of tar members holding file data, and of the headers that name
+# or size the member after them: pax extended headers and GNU long names
+_FILE_TYPES = (b"0", b"\0", b"7")
+_PAX = b"x"
+_GNU_LONG_NAME = b"L"
+
+
+class Member:
+    """A .json file inside a tar archive, with its still compressed bytes.
+
+    Members are small enough to be sent to a worker process, where they are
+    decompressed and parsed.
+    """
+    __slots__ = ("archive", "name", "data")
+
+    def __init__(self, archive: str, name: str, data: bytes):
+        self.archive = archive
+        self.name = name
+        self.data = data
+
+    def read(self) -> bytes:
+        """Returns the decompressed contents of the member.
+
+        Raises:
+            ValueError: Not a valid compressed file
+        """
+        return decompress(self.data, self.name)
+
+
+def is_compressed(path: str) -> bool:
+    """Returns True if path names a single compressed file, e.g. .json.gz.
+    """
+    return path.endswith(COMPRESSED_SUFFIXES) and not is_tar(path)
+
+
+def is_tar(path: str) -> bool:
+    """Returns True if path names a tar archive, compressed or not.
+    """
+    return path.endswith(TAR_SUFFIXES)
+
+
+def read(path: str, digest=None) -> bytes:
+    """Returns the decompressed contents of a compressed file.
+
+    The file is decompressed as a stream, one chunk at a time, without a
+    temporary file.
+
+    Args:
+        path: A string path to an existing compressed file.
+        digest: Optional, a hashlib object updated with the compressed bytes
+            as they are read.
+
+    Raises:
+        ValueError: Not a valid compressed file
+    """
+    suffix = os.path.splitext(path)[1]
+    with open(path, "rb") as f:
+        chunks = iter(lambda: f.read(_CHUNK_SIZE), b"")
+        if digest is not None:
+            chunks = _digested(chunks, digest)
+        try:
+            return b"".join(_decompressed(chunks, suffix))
+        except _errors(suffix) as error:
+            raise ValueError(f"Not a valid compressed file: {path} ({error})")
+
+
+def decompress(data: bytes, name: str) -> bytes:
+    """Decompresses data according to the suffix of name, if it has one.
+
+    Raises:
+        ValueError: Not a valid compressed file
+    """
+    suffix = os.path.splitext(name)[1]
+    if suffix not in COMPRESSED_SUFFIXES:
+        return data
+    try:
+        return b"".join(_decompressed([data], suffix))
+    except _errors(suffix) as error:
+        raise ValueError(f"Not a valid compressed file: {name} ({error})")
+
+
+def members(path: str) -> Iterator[Member]:
+    """Yields the .json and compressed .json files inside a tar archive.
+
+    The archive is read as a stream, decompressing it on the fly if it is
+    compressed, and each member is yielded as soon as its bytes are read, so
+    neither the archive nor its members are ever written to disk. Compressed
+    members keep their compression, to be decompressed where they are parsed.
+
+    Headers are read here rather than by tarfile, whose per-member cost was
+    larger than parsing a small fio .json file. Regular files of ustar, pax
+    and GNU archives are read, with their long names, other members are
+    skipped.
+
+    Raises:
+        ValueError: Not a valid tar archive
+        ValueError: Not a valid compressed file
+    """
+    suffix = _TARS[next(suffix for suffix in TAR_SUFFIXES
+                        if path.endswith(suffix))]
+    with open(path, "rb") as f:
+        chunks = iter(lambda: f.read(_CHUNK_SIZE), b"")
+        if suffix is not None:
+            chunks = _decompressed(chunks, suffix)
+        try:
+            yield from _members(_Blocks(chunks), path)
+        except _errors(suffix) as error:
+            raise ValueError(f"Not a valid compressed file: {path} ({error})")
+
+
+def expand(paths) -> Iterator:
+    """Yields paths as they are, except tar archives, which are replaced by
+    their members.
+
+    Args:
+        paths: An iterable of string paths.
+
+    Yields:
+        String paths and Member objects, in order.
+    """
+    for path in paths:
+        if is_tar(path):
+            yield from members(path)
+        else:
+            yield path
+
+
+def _members(blocks: "_Blocks", path: str) -> Iterator[Member]:
+    """Yields the members of the tar archive read from blocks.
+    """
+    # Set by a pax or GNU header for the member that follows it
+    pax = {}
+    long_name = None
+    while True:
+        header = blocks.read(_BLOCK)
+        if not header or header == bytes(_BLOCK):
+            return
+        if len(header) < _BLOCK or _checksum(header) != _number(
+                header[148:156], path):
+            raise ValueError(f"Not a valid tar archive: {path}")
+        kind = header[156:157]
+        if "size" in pax and kind in _FILE_TYPES:
+            size = int(pax["size"])
+        else:
+            size = _number(header[124:136], path)
+        padding = -size % _BLOCK
+
+        if kind == _PAX or kind == _GNU_LONG_NAME:
+            data = blocks.read(size)
+            if len(data) < size:
+                raise ValueError(f"Not a valid tar archive: {path}")
+            blocks.skip(padding)
+            if kind == _PAX:
+                pax = _pax_records(data, path)
+            else:
+                long_name = data.split(b"\0", 1)[0].decode(
+                    "utf-8", "surrogateescape")
+            continue
+
+        name = pax.get("path") or long_name or _name(header)
+        pax = {}
+        long_name = None
+        if kind in _FILE_TYPES and name.endswith(_MEMBER_SUFFIXES):
+            data = blocks.read(size)
+            if len(data) < size:
+                raise ValueError(f"Not a valid tar archive: {path}")
+            blocks.skip(padding)
+            yield Member(path, name, data)
+        else:
+            blocks.skip(size + padding)
+
+
+def _name(header: bytes) -> str:
+    """Returns the member name of a tar header, with its ustar prefix.
+    """
+    name = header[:100].split(b"\0", 1)[0]
+    if header[257:263] == b"ustar\0":
+        prefix = header[345:500].split(b"\0", 1)[0]
+        if prefix:
+            name = prefix + b"/" + name
+    return name.decode("utf-8", "surrogateescape")
+
+
+def _number(field: bytes, path: str) -> int:
+    """Returns a numeric tar header field, in octal or GNU base-256.
+
+    Raises:
+        ValueError: Not a valid tar archive
+    """
+    if field[:1] == b"\x80":
+        return int.from_bytes(field[1:], "big")
+    try:
+        return int(field.strip(b"\0 ") or b"0", 8)
+    except ValueError:
+        raise ValueError(f"Not a valid tar archive: {path}")
+
+
+def _checksum(header: bytes) -> int:
+    """Returns the checksum of a tar header, counting its own field as
+    spaces.
+    """
+    return sum(header) - sum(header[148:156]) + 8 * ord(" ")
+
+
+def _pax_records(data: bytes, path: str) -> dict[str, str]:
+    """Returns the key=value records of a pax extended header.
+
+    Raises:
+        ValueError: Not a valid tar archive
+    """
+    records = {}
+    position = 0
+    while position < len(data) and data[position:position + 1] != b"\0":
+        length = data[position:position + 20].split(b" ", 1)[0]
+        try:
+            end = position + int(length)
+        except ValueError:
+            raise ValueError(f"Not a valid tar archive: {path}")
+        if end <= position:
+            raise ValueError(f"Not a valid tar archive: {path}")
+        key, _, value = data[position + len(length) + 1:end - 1].partition(
+            b"=")
+        records[key.decode("utf-8", "surrogateescape")] = value.decode(
+            "utf-8", "surrogateescape")
+        position = end
+    return records
+
+
+class _Blocks:
+    """Reads exact byte counts from an iterator of chunks, such as the
+    decompressed stream of an archive.
+    """
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._chunk = b""
+        self._position = 0
+
+    def read(self, size: int) -> bytes:
+        """Returns the next size bytes, or fewer at the end of the stream.
+        """
+        end = self._position + size
+        if end <= len(self._chunk):
+            data = self._chunk[self._position:end]
+            self._position = end
+            return data
+        parts = [self._chunk[self._position:]]
+        missing = size - len(parts[0])
+        for chunk in self._chunks:
+            if len(chunk) >= missing:
+                parts.append(chunk[:missing])
+                self._chunk = chunk
+                self._position = missing
+                return b"".join(parts)
+            parts.append(chunk)
+            missing -= len(chunk)
+        self._chunk = b""
+        self._position = 0
+        return b"".join(parts)
+
+    def skip(self, size: int):
+        """Drops the next size bytes, or the rest of the stream, without
+        copying them.
+        """
+        end = self._position + size
+        while end > len(self._chunk):
+            end -= len(self._chunk)
+            self._chunk = next(self._chunks, b"")
+            if not self._chunk:
+                end = 0
+        self._position = end
+
+
+def _digested(chunks, digest) -> Iterator[bytes]:
+    """Yields chunks, updating digest with each one.
+    """
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def _decompressed(chunks, suffix: str) -> Iterator[bytes]:
+    """Yields the decompressed data of compressed chunks as they come.
+
+    Concatenated streams, as written by pigz or pbzip2, are read one after
+    the other.
+
+    Raises:
+        EOFError: The compressed stream ended early
+    """
+    decompressor = _decompressor(suffix)
+    for chunk in chunks:
+        while chunk:
+            if decompressor.eof:
+                decompressor = _decompressor(suffix)
+            yield decompressor.decompress(chunk)
+            chunk = decompressor.unused_data if decompressor.eof else b""
+    if not decompressor.eof:
+        raise EOFError("compressed stream ended early")
+
+
+def _decompressor(suffix: str):
+    """Returns a new incremental decompressor for a compression suffix.
+    """
+    if suffix == ".gz":
+        import zlib
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if suffix == ".bz2":
+        import bz2
+        return bz2.BZ2Decompressor()
+    if suffix == ".xz":
+        import lzma
+        return lzma.LZMADecompressor()
+    return _zstandard().ZstdDecompressor().decompressobj()
+
+
+def _errors(suffix: str) -> tuple:
+    """Returns the exceptions raised for corrupt data by the codec of suffix.
+    """
+    errors = (OSError, EOFError)
+    if suffix == ".gz":
+        import zlib
+        return errors + (zlib.error,)
+    if suffix == ".xz":
+        import lzma
+        return errors + (lzma.LZMAError,)
+    if suffix == ".zst":
+        return errors + (_zstandard().ZstdError,)
+    return errors
+
+
+def _zstandard():
+    """Imports the optional zstandard package.
+
+    Raises:
+        ValueError: Not a valid compressed file without zstandard installed
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("Not a valid compressed file: .zst needs the "
+                         "zstandard package")
+    return zstandard
@@ -0,0 +1,116 @@
+"""Compares converting compressed files and tar archives to plain files.
+
+A synthetic corpus is written as plain .json files, as .json.gz copies, and
+as tar archives: plain, gzip compressed, and holding the .json.gz copies, so
+that members are decompressed by the workers rather than by the parent. Each
+format is converted with every --jobs value and the best of --repeat runs is
+printed next to the plain files, whose time it should stay close to.
+
+Example:
+    python -m benchmarks.archives --files 2000 --jobs 1 4 --repeat 3
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+import time
+
+from benchmarks import corpus
+import archive
+import convert
+
+
+def write_formats(directory: str, paths: list[str]) -> dict[str, list[str]]:
+    """Writes the compressed copies and archives of paths into directory.
+
+    Returns:
+        The paths to convert for each format, keyed by format name.
+    """
+    compressed = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        compressed.append(os.path.join(directory,
+                                       os.path.basename(path) + ".gz"))
+        with open(compressed[-1], "wb") as f:
+            f.write(gzip.compress(data, compresslevel=6))
+
+    formats = {"json": paths, "json.gz": compressed}
+    for name, mode, members in (("tar", "w", paths),
+                                ("tar.gz", "w:gz", paths),
+                                ("tar of json.gz", "w", compressed)):
+        archive_path = os.path.join(directory,
+                                    name.replace(" ", "-") + ".tar")
+        if mode == "w:gz":
+            archive_path += ".gz"
+        with tarfile.open(archive_path, mode) as tar:
+            for member in members:
+                tar.add(member, arcname=os.path.basename(member))
+        formats[name] = [archive_path]
+    return formats
+
+
+def _time(paths: list[str], output: str, workers: int, repeat: int) -> float:
+    """Returns the fastest of repeat conversions of paths, in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            convert.convert(paths=paths, output_filename=output,
+                            workers=workers)
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args: list[str] = None):
+    """Parses command line input and prints the conversion times.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = corpus.generate(directory, parsed.files)
+        formats = write_formats(directory, paths)
+        sizes = {name: sum(os.path.getsize(path) for path in format_paths)
+                 for name, format_paths in formats.items()}
+        output = os.path.join(directory, "results.csv")
+
+        print(f"{'format':<16} {'jobs':>4} {'MB':>8} {'seconds':>8} "
+              f"{'files/s':>8} {'vs json':>8}")
+        for workers in parsed.jobs:
+            plain = None
+            for name, format_paths in formats.items():
+                seconds = _time(format_paths, output, workers, parsed.repeat)
+                plain = plain or seconds
+                print(f"{name:<16} {workers:>4} "
+                      f"{sizes[name] / 1024 / 1024:>8.1f} {seconds:>8.3f} "
+                      f"{parsed.files / seconds:>8.0f} "
+                      f"{seconds / plain:>7.2f}x")
+
+        # Every format must give the rows of the plain files
+        for name, format_paths in formats.items():
+            rows = [row.replace(".json.gz", ".json") for row in
+                    _rows(format_paths, output)]
+            if rows != _rows(paths, output):
+                raise SystemExit(f"Rows differ for {name}, see "
+                                 f"{archive.__file__}")
+
+
+def _rows(paths: list[str], output: str) -> list[str]:
+    """Returns the rows of converting paths.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        convert.convert(paths=paths, output_filename=output)
+    with open(output) as f:
+        return f.read().split("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Generates synthetic fio .json corpora from the samples in the data directory.
+
+Each generated file starts from a real sample with the same read/write mix,
+so the layout and size of its sections match what fio writes. The block size,
+rw mode, rwmixread and number of jobs are varied, and the summary values are
+scaled so that no two files are the same. --bins adds clat_ns histogram bins
+like fio's json+ output, which makes each file much larger.
+
+Example:
+    python -m benchmarks.corpus --directory /tmp/corpus --files 10000 --jobs 32
+"""
+import argparse
+import json
+import os
+import random
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data")
+
+_BLOCK_SIZES = ("4k", "8k", "16k", "64k", "128k", "1M")
+
+# The rw modes each sample's direction can be relabelled as
+_RW_MODES = {"read": ("read", "randread"),
+             "write": ("write", "randwrite"),
+             "rw": ("rw", "randrw")}
+
+_MIXES = ("10", "30", "50", "70", "90")
+
+
+def samples() -> dict[str, list[dict]]:
+    """Returns the sample documents in the data directory keyed by their rw.
+    """
+    documents = {}
+    for name in sorted(os.listdir(DATA_DIRECTORY)):
+        if name.endswith(".json"):
+            with open(os.path.join(DATA_DIRECTORY, name)) as f:
+                document = json.load(f)
+            documents.setdefault(document["global options"]["rw"],
+                                 []).append(document)
+    return documents
+
+
+def document(rng: random.Random,
+             sources: dict[str, list[dict]],
+             index: int,
+             jobs: int = 1,
+             groups: int = 1,
+             bins: int = 0) -> dict:
+    """Returns a new fio document derived from a random sample.
+
+    Args:
+        rng: The random.Random the variations are drawn from.
+        sources: The sample documents returned by samples().
+        index: The position of the document in the corpus, which offsets its
+            timestamp.
+        jobs: The number of entries in the jobs array.
+        groups: The number of distinct groupids the jobs are spread over.
+        bins: The number of clat_ns bins of each direction that ran I/O.
+
+    Returns:
+        A dict with the layout of a fio .json document.
+    """
+    direction = rng.choice(sorted(sources))
+    source = rng.choice(sources[direction])
+    new = dict(source)
+    new["timestamp"] = source["timestamp"] + index
+    new["timestamp_ms"] = new["timestamp"] * 1000
+    new["global options"] = dict(source["global options"])
+    new["global options"]["rw"] = rng.choice(_RW_MODES[direction])
+    if "rwmixread" in new["global options"]:
+        new["global options"]["rwmixread"] = rng.choice(_MIXES)
+
+    bs = rng.choice(_BLOCK_SIZES)
+    template = source["jobs"][0]
+    new["jobs"] = []
+    for job_index in range(jobs):
+        job = dict(template)
+        job["jobname"] = f"{template['jobname']}-{job_index}"
+        job["groupid"] = job_index % groups
+        job["job options"] = dict(template["job options"], bs=bs)
+        for name in ("read", "write"):
+            stats = dict(template[name])
+            scale = rng.uniform(0.5, 1.5)
+            stats["iops"] = stats["iops"] * scale
+            stats["bw_bytes"] = int(stats["bw_bytes"] * scale)
+            stats["clat_ns"] = dict(stats["clat_ns"],
+                                    mean=stats["clat_ns"]["mean"] / scale)
+            if bins and stats["iops"]:
+                stats["clat_ns"]["bins"] = {
+                    str(1000 + latency * 16): rng.randrange(1, 100000)
+                    for latency in range(bins)}
+            job[name] = stats
+        new["jobs"].append(job)
+    return new
+
+
+def generate(directory: str,
+             count: int,
+             jobs: int = 1,
+             groups: int = 1,
+             bins: int = 0,
+             seed: int = 0) -> list[str]:
+    """Writes count synthetic fio .json files into directory.
+
+    The same arguments always produce the same corpus.
+
+    Args:
+        directory: An existing directory to write the corpus into.
+        count: The number of .json files to create.
+        jobs: The number of entries in the jobs array of every file.
+        groups: The number of distinct groupids the jobs are spread over.
+        bins: The number of clat_ns bins of each direction that ran I/O.
+        seed: The seed of the variations.
+
+    Returns:
+        A list of paths to the created .json files.
+    """
+    rng = random.Random(seed)
+    sources = samples()
+    paths = []
+    for i in range(count):
+        new = document(rng, sources, i, jobs, groups, bins)
+        options = new["global options"]
+        name = f"{i:07d}-{options['rw']}{options.get('rwmixread', '')}-" \
+               f"{new['jobs'][0]['job options']['bs']}.json"
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            json.dump(new, f, indent=2, separators=(",", " : "))
+        paths.append(path)
+    return paths
+
+
+def main(args: list[str] = None):
+    """Parses command line input and writes a corpus.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--directory", type=str, required=True)
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--groups", type=int, default=1)
+    parser.add_argument("--bins", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parsed = parser.parse_args(args)
+
+    os.makedirs(parsed.directory, exist_ok=True)
+    paths = generate(parsed.directory, parsed.files, parsed.jobs,
+                     parsed.groups, parsed.bins, parsed.seed)
+    print(f"Corpus: {parsed.directory} ({len(paths)} files)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compares extract.read() against a full json.load of each data sample.
+
+Example:
+    python -m benchmarks.extraction --repeat 2000
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks import corpus
+import extract
+
+
+def _full_parse(path: str) -> tuple:
+    """Loads the whole document with json.load before picking the fields.
+    """
+    with open(path) as f:
+        return extract.from_document(json.load(f))
+
+
+def _time(function, path: str, repeat: int) -> float:
+    """Returns the mean microseconds per call of function(path).
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(path)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(args: list[str] = None):
+    """Parses command line input and prints a per-sample timing table.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2000)
+    parsed = parser.parse_args(args)
+
+    samples = sorted(name for name in os.listdir(corpus.DATA_DIRECTORY)
+                     if name.endswith(".json"))
+    print(f"{'sample':<16} {'json.load us':>13} {'extract us':>11} "
+          f"{'speedup':>8}")
+    for name in samples:
+        path = os.path.join(corpus.DATA_DIRECTORY, name)
+        full = _time(_full_parse, path, parsed.repeat)
+        selective = _time(extract.read, path, parsed.repeat)
+        print(f"{name:<16} {full:>13.1f} {selective:>11.1f} "
+              f"{full / selective:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
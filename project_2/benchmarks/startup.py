@@ -0,0 +1,112 @@
+"""Measures the per-invocation startup cost of the converters.
+
+Each command is run in a fresh interpreter --repeat times and the best wall
+time is kept, next to a bare 'python -c pass' as the floor. The imports of
+each command are then timed once with python -X importtime, and the modules
+with the largest self time are listed, so a new module level import that
+slows every run shows up by name.
+
+Example:
+    python -m benchmarks.startup --repeat 20 --top 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus
+
+PROJECT_DIRECTORY = os.path.dirname(corpus.DATA_DIRECTORY)
+PROJECT_1_DIRECTORY = os.path.join(os.path.dirname(PROJECT_DIRECTORY),
+                                   "project_1")
+
+
+def commands(output_directory: str) -> dict[str, tuple[list[str], str]]:
+    """Returns the timed commands as label: (argv, project directory).
+
+    Commands run in output_directory and import from their project directory.
+    """
+    sample = os.path.join(corpus.DATA_DIRECTORY, "rw50-8k.json")
+    output = os.path.join(output_directory, "startup.csv")
+    return {
+        "python": ([sys.executable, "-c", "pass"], PROJECT_DIRECTORY),
+        "project_1 import": ([sys.executable, "-c", "import convert"],
+                             PROJECT_1_DIRECTORY),
+        "project_1 convert": ([sys.executable, "-c",
+                               f"import convert; convert.convert({sample!r})"],
+                              PROJECT_1_DIRECTORY),
+        "project_2 import": ([sys.executable, "-c", "import convert"],
+                             PROJECT_DIRECTORY),
+        "project_2 convert": ([sys.executable,
+                               os.path.join(PROJECT_DIRECTORY, "convert.py"),
+                               "--json_file", sample,
+                               "--output_filename", output],
+                              PROJECT_DIRECTORY),
+    }
+
+
+def _wall_time(argv: list[str], project: str, cwd: str,
+               repeat: int) -> float:
+    """Returns the fastest of repeat runs of argv, in seconds.
+    """
+    environment = dict(os.environ, PYTHONPATH=project)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, check=True, stdout=subprocess.DEVNULL,
+                       env=environment)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def import_times(argv: list[str], project: str,
+                 cwd: str) -> list[tuple[str, int]]:
+    """Returns (module, self microseconds) of every import made by argv,
+    slowest first.
+    """
+    result = subprocess.run([argv[0], "-X", "importtime", *argv[1:]],
+                            cwd=cwd, check=True, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True,
+                            env=dict(os.environ, PYTHONPATH=project))
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_time)))
+    return sorted(modules, key=lambda module: module[1], reverse=True)
+
+
+def main(args: list[str] = None):
+    """Parses command line input and prints the startup times.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=5)
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        timed = commands(directory)
+        print(f"{'command':<18} {'wall ms':>8} {'imports':>8} "
+              f"{'import ms':>10}")
+        slowest = {}
+        for label, (argv, project) in timed.items():
+            seconds = _wall_time(argv, project, directory, parsed.repeat)
+            modules = import_times(argv, project, directory)
+            slowest[label] = modules[:parsed.top]
+            total = sum(self_time for _, self_time in modules)
+            print(f"{label:<18} {seconds * 1000:>8.1f} {len(modules):>8} "
+                  f"{total / 1000:>10.1f}")
+
+    for label, modules in slowest.items():
+        if label == "python":
+            continue
+        print(f"\n{label}, slowest imports:")
+        for name, self_time in modules:
+            print(f"  {self_time / 1000:>7.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
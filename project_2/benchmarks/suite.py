@@ -0,0 +1,275 @@
+"""Times every converter mode on a synthetic corpus and records the results.
+
+Each mode is run in a fresh process so that its peak RSS is its own, and the
+best of --repeat runs is kept. Results are printed as a table and can be
+written as .json with --output. Passing an earlier results file to --compare
+prints the change in files/s per mode, e.g. between two commits:
+
+    python -m benchmarks.suite --files 5000 --output before.json
+    git checkout other-branch
+    python -m benchmarks.suite --files 5000 --compare before.json
+
+Example:
+    python -m benchmarks.suite --files 2000 --jobs 4 --modes csv sqlite
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus
+import convert
+import percentiles
+
+# convert imports these on first use, they are imported up front so that no
+# mode is timed with its imports
+for _module in ("columnar", "concurrent.futures.process", "database",
+                "manifest", "timefmt"):
+    importlib.import_module(_module)
+
+_PROJECT_1 = os.path.join(os.path.dirname(corpus.DATA_DIRECTORY), os.pardir,
+                          "project_1", "convert.py")
+
+
+def _load_project_1():
+    """Imports project_1's convert module, which shares its name with ours.
+    """
+    spec = importlib.util.spec_from_file_location("project_1_convert",
+                                                  _PROJECT_1)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Loaded up front so that no mode is timed with its imports, like the modules
+# convert imports on first use above
+project_1_convert = _load_project_1()
+
+
+def _project_1(paths: list[str], directory: str, workers: int):
+    # project_1 writes each .csv into the working directory
+    os.chdir(directory)
+    for path in paths:
+        project_1_convert.convert(path)
+
+
+def _project_2(parallel: bool = False, **options):
+    def run(paths: list[str], directory: str, workers: int):
+        extension = {"columnar": ".fcol", "sqlite": ".db"}.get(
+            options.get("output_format"), ".csv")
+        output_filename = os.path.join(directory, "results" + extension)
+        if os.path.exists(output_filename):
+            os.remove(output_filename)
+        convert.convert(paths=paths, output_filename=output_filename,
+                        workers=workers if parallel else 1, **options)
+    return run
+
+
+def _manifest(paths: list[str], directory: str, workers: int):
+    convert.convert(paths=paths,
+                    output_filename=os.path.join(directory, "results.csv"),
+                    manifest=os.path.join(directory, "manifest.json"))
+
+
+def _percentiles(paths: list[str], directory: str, workers: int):
+    percentiles.convert(paths, os.path.join(directory, "percentiles.csv"))
+
+
+# Every mode as name -> function(paths, directory, workers)
+MODES = {"project_1": _project_1,
+         "csv": _project_2(),
+         "parallel": _project_2(parallel=True),
+         "columnar": _project_2(output_format="columnar"),
+         "sqlite": _project_2(output_format="sqlite"),
+         "job_rows": _project_2(job_rows="job"),
+         "group_rows": _project_2(job_rows="group"),
+         "manifest": _manifest,
+         "percentiles": _percentiles}
+
+
+def _measure(mode: str, paths: list[str], directory: str, workers: int):
+    """Runs one mode in this process and returns (seconds, peak RSS bytes).
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        MODES[mode](paths, directory, workers)
+        seconds = time.perf_counter() - start
+
+    # Worker processes of the parallel mode count as children
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return seconds, max(_peak_rss(), _bytes(children))
+
+
+def _peak_rss() -> int:
+    """Returns the peak RSS of this process in bytes.
+
+    ru_maxrss carries over the peak of the parent that forked this process
+    before it exec'd, so Linux's VmHWM, which starts afresh, is preferred.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return _bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def _bytes(maxrss: int) -> int:
+    """Converts a ru_maxrss value to bytes, Linux reports kilobytes.
+    """
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _child(writer, mode: str, paths: list[str], directory: str, workers: int):
+    """Sends the measurement of one mode to the parent process.
+    """
+    writer.send(_measure(mode, paths, directory, workers))
+    writer.close()
+
+
+def run(mode: str,
+        paths: list[str],
+        directory: str,
+        workers: int = 1,
+        repeat: int = 3) -> dict:
+    """Measures a mode over a corpus, each run in a fresh process.
+
+    Args:
+        mode: A key of MODES.
+        paths: The corpus paths returned by corpus.generate().
+        directory: A scratch directory for output files.
+        workers: The number of processes for the parallel mode.
+        repeat: The number of runs, the fastest is reported.
+
+    Returns:
+        A dict of the mode's seconds, files_per_second, mb_per_second and
+        peak_rss_bytes.
+    """
+    # A warm manifest is what a repeated conversion sees
+    if mode == "manifest":
+        with contextlib.redirect_stdout(io.StringIO()):
+            _manifest(paths, directory, workers)
+
+    # Pool workers are daemons and cannot start the parallel mode's pool, so
+    # every run gets a plain process and sends its measurement back
+    context = multiprocessing.get_context("spawn")
+    measurements = []
+    for _ in range(repeat):
+        reader, writer = context.Pipe(duplex=False)
+        process = context.Process(target=_child, args=(
+            writer, mode, paths, directory, workers))
+        process.start()
+        writer.close()
+        try:
+            measurement = reader.recv()
+        except EOFError:
+            measurement = None
+        process.join()
+        if measurement is None:
+            raise RuntimeError(f"Benchmark of {mode} failed")
+        measurements.append(measurement)
+    seconds = min(seconds for seconds, _ in measurements)
+    size = sum(os.path.getsize(path) for path in paths)
+    return {"mode": mode,
+            "seconds": seconds,
+            "files_per_second": len(paths) / seconds,
+            "mb_per_second": size / seconds / 1e6,
+            "peak_rss_bytes": max(peak for _, peak in measurements)}
+
+
+def _commit() -> str:
+    """Returns the current git commit, or an empty string outside a checkout.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(corpus.DATA_DIRECTORY)
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(args: list[str] = None):
+    """Parses command line input, runs the modes and prints a table.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--job_count", type=int, default=1,
+                        help="Entries in the jobs array of each file.")
+    parser.add_argument("--groups", type=int, default=1)
+    parser.add_argument("--bins", type=int, default=0,
+                        help="clat_ns bins per direction, as in json+.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for the parallel mode.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES),
+                        default=list(MODES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str,
+                        help="Write the results as .json to this path.")
+    parser.add_argument("--compare", type=str,
+                        help="Earlier results .json to compare against.")
+    parsed = parser.parse_args(args)
+
+    results = {"commit": _commit(),
+               "python": platform.python_version(),
+               "platform": platform.platform(),
+               "cpus": os.cpu_count(),
+               "corpus": {"files": parsed.files,
+                          "jobs": parsed.job_count,
+                          "groups": parsed.groups,
+                          "bins": parsed.bins,
+                          "seed": parsed.seed},
+               "workers": parsed.jobs,
+               "results": []}
+    previous = {}
+    if parsed.compare is not None:
+        with open(parsed.compare) as f:
+            earlier = json.load(f)
+        previous = {result["mode"]: result for result in earlier["results"]}
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus_directory = os.path.join(directory, "corpus")
+        os.mkdir(corpus_directory)
+        paths = corpus.generate(corpus_directory, parsed.files,
+                                parsed.job_count, parsed.groups, parsed.bins,
+                                parsed.seed)
+        results["corpus"]["bytes"] = sum(os.path.getsize(path)
+                                         for path in paths)
+        if previous and earlier["corpus"] != results["corpus"]:
+            print(f"Warning: {parsed.compare} was measured on another corpus "
+                  f"{earlier['corpus']}")
+
+        print(f"{'mode':>12} {'seconds':>9} {'files/s':>9} {'MB/s':>8} "
+              f"{'peak MB':>8} {'change':>8}")
+        for mode in parsed.modes:
+            result = run(mode, paths, directory, parsed.jobs, parsed.repeat)
+            results["results"].append(result)
+            change = ""
+            if mode in previous:
+                ratio = (result["files_per_second"]
+                         / previous[mode]["files_per_second"])
+                change = f"{ratio - 1:+.1%}"
+            print(f"{mode:>12} {result['seconds']:>9.3f} "
+                  f"{result['files_per_second']:>9.0f} "
+                  f"{result['mb_per_second']:>8.1f} "
+                  f"{result['peak_rss_bytes'] / 1e6:>8.1f} {change:>8}")
+
+    if parsed.output is not None:
+        with open(parsed.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measures how convert() throughput scales with the number of workers.
+
+Generates a synthetic corpus in a temporary directory, see benchmarks.corpus,
+then converts the whole corpus once per worker count and prints files per
+second along with the speedup over a single worker.
+
+Example:
+    python -m benchmarks.workers --files 4000 --jobs 1 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks import corpus
+import convert
+
+
+def run(paths: list[str], workers: int, output_filename: str) -> float:
+    """Returns the seconds taken to convert paths with the given workers.
+    """
+    # convert() prints the path of its output, keep it out of the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        convert.convert(paths=paths,
+                        output_filename=output_filename,
+                        workers=workers)
+        return time.perf_counter() - start
+
+
+def main(args: list[str] = None):
+    """Parses command line input and prints a throughput table.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=4000)
+    parser.add_argument("--jobs", type=int, nargs="+",
+                        default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--repeat", type=int, default=3)
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = corpus.generate(directory, parsed.files)
+        output_filename = os.path.join(directory, "results.csv")
+
+        print(f"{'jobs':>6} {'seconds':>10} {'files/s':>10} {'speedup':>8}")
+        baseline = None
+        for workers in sorted(set(parsed.jobs)):
+            best = min(run(paths, workers, output_filename)
+                       for _ in range(parsed.repeat))
+            if baseline is None:
+                baseline = best
+            print(f"{workers:>6} {best:>10.3f} {len(paths) / best:>10.0f} "
+                  f"{baseline / best:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
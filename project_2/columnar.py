@@ -0,0 +1,225 @@
+from array import array
+import json
+import mmap
+import struct
+
+_MAGIC = b"FIOCOL1\0"
+
+# Magic followed by the length of the json header
+_PREFIX = struct.Struct("<8sQ")
+
+# Column layout in the order of the .csv header. Numeric columns are fixed
+# width int64, low cardinality strings are dictionary encoded as uint32 codes
+# and logfile is stored as uint64 offsets into a utf-8 blob.
+COLUMNS = (("test_datetime", "int64"),
+           ("io_bs", "dictionary"),
+           ("io_rw", "dictionary"),
+           ("io_rwmixread", "dictionary"),
+           ("read_iops", "int64"),
+           ("read_bw_bytes", "int64"),
+           ("read_clat_ns_mean", "int64"),
+           ("write_iops", "int64"),
+           ("write_bw_bytes", "int64"),
+           ("write_clat_ns_mean", "int64"),
+           ("error", "int64"),
+           ("logfile", "string"))
+
+
+class Writer:
+    """Collects extracted fields into typed columns and writes them on close.
+
+    Columns are held as compact arrays of machine values rather than Python
+    objects while the rows are collected.
+    """
+    def __init__(self, path: str):
+        """Starts an empty table that will be written to path.
+        """
+        self.path = path
+        self._rows = 0
+        self._values = {}
+        for name, kind in COLUMNS:
+            if kind == "int64":
+                self._values[name] = array("q")
+            elif kind == "dictionary":
+                self._values[name] = (array("I"), {})
+            else:
+                self._values[name] = (array("Q", [0]), bytearray())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+
+    def write(self, fields: tuple, logfile: str):
+        """Appends the fields returned by extract.read() and the logfile name.
+        """
+        for (name, kind), value in zip(COLUMNS, (*fields, logfile)):
+            if kind == "int64":
+                self._values[name].append(int(value))
+            elif kind == "dictionary":
+                codes, dictionary = self._values[name]
+                code = dictionary.get(value)
+                if code is None:
+                    code = dictionary[value] = len(dictionary)
+                codes.append(code)
+            else:
+                offsets, blob = self._values[name]
+                blob += value.encode("utf-8", "surrogateescape")
+                offsets.append(len(blob))
+        self._rows += 1
+
+    def close(self):
+        """Writes the header and every column, each aligned to 8 bytes.
+        """
+        sections = []
+        columns = []
+        offset = 0
+        for name, kind in COLUMNS:
+            column = {"name": name, "type": kind}
+            if kind == "int64":
+                parts = [self._values[name]]
+            elif kind == "dictionary":
+                codes, dictionary = self._values[name]
+                column["dictionary"] = list(dictionary)
+                parts = [codes]
+            else:
+                offsets, blob = self._values[name]
+                parts = [offsets, blob]
+            column["offsets"] = []
+            for part in parts:
+                data = bytes(part)
+                column["offsets"].append([offset, len(data)])
+                sections.append(data + bytes(-len(data) % 8))
+                offset += len(sections[-1])
+            columns.append(column)
+
+        header = json.dumps({"rows": self._rows,
+                             "columns": columns}).encode()
+        header += b" " * (-(len(header) + _PREFIX.size) % 8)
+        with open(self.path, "wb") as f:
+            f.write(_PREFIX.pack(_MAGIC, len(header)))
+            f.write(header)
+            for section in sections:
+                f.write(section)
+
+
+class Table:
+    """A read-only, memory-mapped table written by Writer.
+
+    Numeric columns and dictionary codes are memoryviews cast straight from the
+    mapping, so loading costs the same however many rows there are and no
+    value is copied until it is read. They can also be handed to
+    numpy.frombuffer without a copy.
+    """
+    def __init__(self, path: str):
+        """Maps the table file at path.
+
+        Raises:
+            ValueError: Not a valid columnar file
+        """
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, header_length = (None, 0)
+        if len(view) >= _PREFIX.size:
+            magic, header_length = _PREFIX.unpack_from(view)
+        if magic != _MAGIC:
+            view.release()
+            self._map.close()
+            raise ValueError(f"Not a valid columnar file: {path}")
+        header = json.loads(bytes(view[_PREFIX.size:
+                                       _PREFIX.size + header_length]))
+        data_start = _PREFIX.size + header_length
+
+        self.rows = header["rows"]
+        self.columns = [column["name"] for column in header["columns"]]
+        self._views = [view]
+        self._columns = {}
+        for column in header["columns"]:
+            formats = {"int64": ["q"], "dictionary": ["I"],
+                       "string": ["Q", "B"]}[column["type"]]
+            parts = []
+            for item_format, (offset, length) in zip(formats,
+                                                     column["offsets"]):
+                start = data_start + offset
+                part = view[start:start + length].cast(item_format)
+                self._views.append(part)
+                parts.append(part)
+            self._columns[column["name"]] = (column["type"], parts,
+                                             column.get("dictionary"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, name: str):
+        """Returns a column by name.
+
+        Returns:
+            A memoryview of int64 values for numeric columns, or a list of
+            decoded strings for dictionary and string columns.
+        """
+        kind, parts, dictionary = self._columns[name]
+        if kind == "int64":
+            return parts[0]
+        if kind == "dictionary":
+            return [dictionary[code] for code in parts[0]]
+        offsets, blob = parts
+        return [bytes(blob[offsets[i]:offsets[i + 1]]).decode(
+                    "utf-8", "surrogateescape") for i in range(self.rows)]
+
+    def codes(self, name: str) -> memoryview:
+        """Returns the uint32 codes of a dictionary encoded column.
+        """
+        return self._columns[name][1][0]
+
+    def dictionary(self, name: str) -> list[str]:
+        """Returns the values the codes of a dictionary encoded column index.
+        """
+        return self._columns[name][2]
+
+    def row(self, i: int) -> tuple:
+        """Returns row i as a tuple in the column order of the .csv header.
+        """
+        values = []
+        for name in self.columns:
+            kind, parts, dictionary = self._columns[name]
+            if kind == "int64":
+                values.append(parts[0][i])
+            elif kind == "dictionary":
+                values.append(dictionary[parts[0][i]])
+            else:
+                offsets, blob = parts
+                values.append(bytes(blob[offsets[i]:offsets[i + 1]]).decode(
+                    "utf-8", "surrogateescape"))
+        return tuple(values)
+
+    def close(self):
+        """Releases the columns and unmaps the file.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+
+def load(path: str) -> Table:
+    """Memory-maps a file written with --output_format columnar.
+
+    Args:
+        path: A string path to an existing columnar file.
+
+    Returns:
+        A Table whose columns are read lazily from the mapping.
+
+    Raises:
+        ValueError: Not a valid columnar file
+    """
+    return Table(path)
@@ -0,0 +1,162 @@
+import argparse
+import csv
+from math import floor
+import os
+
+import extract
+
+_KEY = ("io_bs", "io_rw", "io_rwmixread")
+
+# Metrics as (column, True when a larger value is better)
+_METRICS = (("read_iops", True),
+            ("read_bw_bytes", True),
+            ("read_clat_ns_mean", False),
+            ("write_iops", True),
+            ("write_bw_bytes", True),
+            ("write_clat_ns_mean", False))
+
+# Positions of the key and metrics in the fields returned by extract.read()
+_KEY_FIELDS = tuple(extract.COLUMNS.index(name) for name in _KEY)
+_METRIC_FIELDS = tuple(extract.COLUMNS.index(name) for name, _ in _METRICS)
+
+
+def load(paths: list[str]) -> dict[tuple, list]:
+    """Reads runs from fio .json files and summary .csv files into groups.
+
+    Every run is added to the running totals of its (io_bs, io_rw,
+    io_rwmixread) group in a dict, so a side of tens of thousands of runs is
+    read in one pass and joined with a lookup per group.
+
+    Args:
+        paths: A list of string paths to fio .json files, or .csv files
+            written by convert(). Both sides of a comparison should use the
+            same bw_bytes units.
+
+    Returns:
+        A dict from group key to [run count, sum of each metric].
+
+    Raises:
+        ValueError: Not a valid path
+        ValueError: Not a valid summary .csv
+    """
+    groups = {}
+    for path in paths:
+        if not os.path.exists(path):
+            raise ValueError(f"Not a valid path: {path}")
+        for key, values in _runs(path):
+            totals = groups.get(key)
+            if totals is None:
+                totals = groups[key] = [0] + [0] * len(_METRICS)
+            totals[0] += 1
+            for i, value in enumerate(values, 1):
+                totals[i] += value
+    return groups
+
+
+def _runs(path: str):
+    """Yields (group key, metric values) for each run in a file.
+    """
+    if not path.endswith(".csv"):
+        fields = extract.read(path)
+        yield (tuple(str(fields[i]) for i in _KEY_FIELDS),
+               [fields[i] for i in _METRIC_FIELDS])
+        return
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = [name for name, _ in _METRICS]
+        if not set(_KEY + tuple(columns)) <= set(reader.fieldnames or ()):
+            raise ValueError(f"Not a valid summary .csv: {path}")
+        for row in reader:
+            yield (tuple(row[name] for name in _KEY),
+                   [float(row[name]) for name in columns])
+
+
+def compare(baseline: list[str],
+            candidate: list[str],
+            output_filename: str,
+            threshold: float = 0.05) -> str:
+    """Compares two sets of runs per (io_bs, io_rw, io_rwmixread).
+
+    Runs of the same group on one side are averaged. Each group found on both
+    sides gets a row with the baseline and candidate means, their delta and
+    their ratio for every metric. A metric regressed when iops or bw_bytes
+    dropped, or clat_ns mean rose, by more than threshold.
+
+    Args:
+        baseline: A list of paths to the .json or .csv files of the old runs.
+        candidate: A list of paths to the .json or .csv files of the new runs.
+        output_filename: A string filename for the new .csv file.
+        threshold: The relative change, e.g. 0.05 for 5%, beyond which a
+            metric is flagged.
+
+    Returns:
+        The path of the new .csv file.
+
+    Raises:
+        ValueError: Not a valid path
+        ValueError: Not a valid summary .csv
+        ValueError: Not a valid threshold
+    """
+    if threshold < 0:
+        raise ValueError(f"Not a valid threshold: {threshold}")
+    old = load(baseline)
+    new = load(candidate)
+
+    header = [*_KEY, "baseline_runs", "candidate_runs"]
+    for name, _ in _METRICS:
+        header += [f"{name}_baseline", f"{name}_candidate", f"{name}_delta",
+                   f"{name}_ratio"]
+    header.append("regressions")
+
+    rows = []
+    regressed = 0
+    for key in sorted(old.keys() & new.keys()):
+        old_totals = old[key]
+        new_totals = new[key]
+        row = [*key, str(old_totals[0]), str(new_totals[0])]
+        regressions = []
+        for i, (name, higher_is_better) in enumerate(_METRICS, 1):
+            before = floor(old_totals[i] / old_totals[0])
+            after = floor(new_totals[i] / new_totals[0])
+            ratio = after / before if before else None
+            row += [str(before), str(after), str(after - before),
+                    "" if ratio is None else f"{ratio:.4f}"]
+            if ratio is not None and (ratio < 1 - threshold if higher_is_better
+                                      else ratio > 1 + threshold):
+                regressions.append(name)
+        row.append(";".join(regressions))
+        regressed += bool(regressions)
+        rows.append(row)
+
+    new_file_path = os.path.join(os.getcwd(), output_filename)
+    with open(new_file_path, "w") as f:
+        f.write("\n".join([",".join(header)] + [",".join(row)
+                                                for row in rows]))
+    print(f"Compared {len(rows)} groups, {regressed} regressed, "
+          f"{len(old.keys() - new.keys())} only in baseline, "
+          f"{len(new.keys() - old.keys())} only in candidate")
+    print("Results: {new_file_path}".format(new_file_path=new_file_path))
+    return new_file_path
+
+
+def main(args: list[str] = None):
+    """Parses command line input and compares two sets of runs.
+    """
+    # Create parser
+    parser = argparse.ArgumentParser(prog="convert.py compare")
+    parser.add_argument("--baseline", type=str, action="extend", nargs="+",
+                        required=True)
+    parser.add_argument("--candidate", type=str, action="extend", nargs="+",
+                        required=True)
+    parser.add_argument("--output_filename", type=str, required=True)
+    parser.add_argument("--threshold", type=float, default=0.05)
+
+    # Parse command line args
+    parsed = parser.parse_args(args)
+    if parsed.threshold < 0:
+        parser.error(f"--threshold must not be negative: {parsed.threshold}")
+
+    return compare(baseline=parsed.baseline,
+                   candidate=parsed.candidate,
+                   output_filename=parsed.output_filename,
+                   threshold=parsed.threshold)
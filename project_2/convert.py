@@ -1,16 +1,46 @@
-import argparse
-from datetime import datetime
-import json
-from math import floor
+from collections import deque
+from contextlib import nullcontext
+from itertools import islice
 import os
+import sys
 
-_HEADER = "test_datetime,io_bs,io_rw,io_rwmixread,read_iops,read_bw_bytes,read_clat_ns_mean,write_iops,write_bw_bytes,write_clat_ns_mean,error,logfile"
+import archive
+import extract
+
+# Modules only needed by optional flags, such as asyncio for --watch, numpy
+# for --percentiles or sqlite3 for --output_format sqlite, are imported where
+# they are used so that a plain conversion does not pay for them at startup,
+# see benchmarks/startup.py
+
+# Rows are small, so a larger buffer batches many of them per write syscall
+_WRITE_BUFFER_SIZE = 1024 * 1024
+
+_OUTPUT_FORMATS = ("csv", "columnar", "sqlite")
+
+_JOB_ROWS = ("first", "job", "group")
+
+# Upper bound on .JSON files handed to a worker process per task
+_MAX_CHUNK_SIZE = 64
+
+# .JSON files per task when paths are still being discovered
+_STREAM_CHUNK_SIZE = 8
+
+# Bytes of .JSON files below which a list is parsed in this process. Starting
+# a pool and sending it chunks costs tens of milliseconds, about the time
+# serial parsing takes for this much data.
+_PARALLEL_MIN_BYTES = 8 * 1024 * 1024
 
 
 def convert(paths: list[str],
             output_filename: str,
             time_format: str = None,
-            human_readable: bool = False):
+            human_readable: bool = False,
+            workers: int = 1,
+            manifest: str = None,
+            rebuild: bool = False,
+            output_format: str = "csv",
+            job_rows: str = "first",
+            stats=None):
     """Extracts data from .JSON files and write all extracted data to new file.
 
     Extracts data from the .JSON files given in the paths list and writes the
@@ -18,13 +48,40 @@ def convert(paths: list[str],
     is the 'output_filename'.
 
     Args:
-        paths: A list of string paths to existing .JSON files.
+        paths: A list of string paths to existing .JSON files. Files
+            compressed with gzip, bzip2, xz or zstd, e.g. .json.gz, are
+            decompressed as they are read, and tar archives, compressed or
+            not, are replaced by the .JSON files inside them, see
+            archive.expand().
         output_filename: A string filename that will be used as the filename for
             the new .csv file with extracted data.
         time_format: A string pattern to specify how the extracted time data
             should be formatted.
         human_readable: A flag that determines how bw_bytes should be written.
             If true then the bw_bytes will be written in power of 1024.
+        workers: The number of processes used to parse the .JSON files. Rows
+            are always written in the same order as paths.
+        manifest: Optional, a string path to a manifest file that caches the
+            fields extracted from each .JSON file. Only files that are new or
+            changed since the last run are parsed, and entries for deleted
+            files are evicted.
+        rebuild: A flag that discards the cached manifest entries so that every
+            file is parsed again.
+        output_format: 'csv' for a .csv text file, or 'columnar' for a typed
+            binary table that columnar.load() memory-maps. The columnar table
+            stores raw values, so time_format and human_readable only apply to
+            'csv'. 'sqlite' inserts the rows into the results table of a
+            SQLite database, see database.Writer, skipping files whose logfile
+            is already in it.
+        job_rows: 'first' writes one row per file from its first job. 'job'
+            writes one row per element of the jobs array and 'group' one row
+            per groupid, with iops and bw_bytes summed and clat_ns mean
+            weighted by each job's N. Both add a job column holding the job
+            index or groupid, and only apply to 'csv' without a manifest.
+        stats: Optional, a Stats from project_3's stats.py that records the
+            time spent reading, extracting, parsing, formatting and writing,
+            and the files parsed, bytes read and rows written. Worker
+            processes send theirs back to be merged.
 
     Returns:
         New .csv with results for all .json files specified in paths. Will have
@@ -32,76 +89,583 @@ def convert(paths: list[str],
 
     Raises:
         ValueError: Not a valid path
+        ValueError: Not a valid path with a manifest
+        ValueError: Not a valid number of workers
+        ValueError: Not a valid output format
+        ValueError: Not a valid job rows mode
+        ValueError: Not a valid compressed file
+        ValueError: Not a valid tar archive
     """
     # Check for valid .JSON file
     for path in paths:
         if not os.path.exists(path):
             raise ValueError(f"Not a valid path: {path}")
+    tars = [path for path in paths if archive.is_tar(path)]
+    if tars and manifest is not None:
+        raise ValueError(f"Not a valid path with a manifest: {tars[0]}")
+    _check_options(time_format, human_readable, workers, manifest,
+                   output_format, job_rows)
 
-    # Load .JSON files and save filename
-    loaded_files = []
-    for path in paths:
-        with open(path) as f:
-            loaded_files.append((json.load(f), os.path.basename(path)))
-            f.close()
-
-    data = [_HEADER]
-    for loaded_file in loaded_files:
-
-        file_dict = loaded_file[0]
-        file_name = loaded_file[1]
-
-        # Get desired data from .JSON file
-        timestamp = file_dict["timestamp"]
-        bs = file_dict["jobs"][0]["job options"]["bs"]
-        rw = file_dict["global options"]["rw"]
-        rwmixread = file_dict["global options"].get("rwmixread", "")
-        read_dict = file_dict["jobs"][0]["read"]
-        write_dict = file_dict["jobs"][0]["write"]
-        read_iops = floor(read_dict["iops"])
-        read_bw_bytes = floor(read_dict["bw_bytes"])
-        read_clatnsmean = floor(read_dict["clat_ns"]["mean"])
-        write_iops = floor(write_dict["iops"])
-        write_bw_bytes = floor(write_dict["bw_bytes"])
-        write_clatnsmean = floor(write_dict["clat_ns"]["mean"])
-        err_num = file_dict["jobs"][0]["error"]
-        logfile = file_name
-
-        # Convert formatting
-        if time_format is not None:
-            timestamp = datetime.utcfromtimestamp(timestamp)
-            timestamp = timestamp.strftime(time_format)
-        if human_readable is True:
-            read_bw_bytes = round(read_bw_bytes/1024, 2)
-            write_bw_bytes = round(write_bw_bytes/1024, 2)
-
-        data.append(f"{timestamp},{bs},{rw},{rwmixread},{read_iops},"
-                    f"{read_bw_bytes},{read_clatnsmean},{write_iops},"
-                    f"{write_bw_bytes},{write_clatnsmean},{err_num},{logfile}")
-
-    # Write data to new file
+    # Parse only new or changed files when a manifest is given
+    cache = None
+    if manifest is not None:
+        from manifest import Manifest
+        cache = Manifest(manifest)
+        if rebuild is True:
+            cache.clear()
+        fields = cache.iter_fields(
+            paths, lambda misses: _iter_fields(misses, workers, stats=stats,
+                                               hashed=True))
+    elif tars:
+        # Archives are streamed and their members parsed as they are read,
+        # in the same pool as plain files
+        handed = deque()
+        fields = _iter_fields(_tracked(archive.expand(paths), handed),
+                              workers, job_rows, stats)
+        paths = iter(handed.popleft, None)
+    else:
+        fields = _iter_fields(paths, workers, job_rows, stats)
+
+    # Stream rows to the new file as each .JSON file is parsed, so only one
+    # loaded file is held in memory at a time
+    new_file_path = os.path.join(os.getcwd(), output_filename)
+    with _open_writer(new_file_path, time_format, human_readable,
+                      output_format, job_rows, stats) as writer:
+        _write_rows(writer, paths, fields, job_rows, stats)
+    print("Results: {new_file_path}".format(new_file_path=new_file_path))
+
+    if cache is not None:
+        cache.evict_missing()
+        cache.save()
+    return new_file_path
+
+
+def convert_found(root: str,
+                  name: str,
+                  output_filename: str,
+                  time_format: str = None,
+                  human_readable: bool = False,
+                  workers: int = 1,
+                  output_format: str = "csv",
+                  job_rows: str = "first",
+                  threads: int = 1,
+                  stats=None):
+    """Converts the .JSON files under root that match name as they are found.
+
+    The tree is walked by project_3's find in a background thread, which hands
+    matching files to the converter through a bounded queue, see
+    discover.discover(). The first file is parsed as soon as it is found,
+    while the walk goes on, and no list of paths is built up front. Rows are
+    written in the order the files are found. Compressed files and tar
+    archives that match name are read as in convert().
+
+    A tree may hold other .json files, such as a manifest or a --stats
+    report, so a file that cannot be parsed is reported on stderr and
+    skipped instead of ending the conversion.
+
+    Args:
+        root: A path to an existing directory.
+        name: A string regex pattern that file names must match.
+        output_filename: A string filename for the new file.
+        time_format: See convert().
+        human_readable: See convert().
+        workers: The number of processes used to parse the .JSON files.
+        output_format: See convert().
+        job_rows: See convert().
+        threads: The number of threads walking the tree.
+        stats: See convert(), the walk's directories and matches are also
+            recorded.
+
+    Returns:
+        The path of the new file.
+
+    Raises:
+        ValueError: Not a valid root path
+        ValueError: Not a valid string pattern
+        ValueError: Not a valid number of threads
+        ValueError: Not a valid number of workers
+        ValueError: Not a valid output format
+        ValueError: Not a valid job rows mode
+    """
+    _check_options(time_format, human_readable, workers, None, output_format,
+                   job_rows)
+    import discover
+    found = discover.discover(root, name, threads, stats=stats)
+
+    # Remember each path handed to the parsers, fields come back in order
+    paths = deque()
+    fields = _iter_fields(_tracked(archive.expand(found), paths), workers,
+                          job_rows, stats, skip_invalid=True)
+    new_file_path = os.path.join(os.getcwd(), output_filename)
+    with _open_writer(new_file_path, time_format, human_readable,
+                      output_format, job_rows, stats) as writer:
+        _write_rows(writer, iter(paths.popleft, None), fields, job_rows,
+                    stats)
+    print("Results: {new_file_path}".format(new_file_path=new_file_path))
+    return new_file_path
+
+
+def _check_options(time_format: str,
+                   human_readable: bool,
+                   workers: int,
+                   manifest: str,
+                   output_format: str,
+                   job_rows: str):
+    """Raises ValueError for options that are invalid or cannot be combined.
+    """
+    if workers < 1:
+        raise ValueError(f"Not a valid number of workers: {workers}")
+    if output_format not in _OUTPUT_FORMATS:
+        raise ValueError(f"Not a valid output format: {output_format}")
+    if output_format != "csv" and (time_format is not None
+                                   or human_readable is True):
+        raise ValueError(
+            f"Not a valid output format with time_format or human_readable: "
+            f"{output_format}")
+    if job_rows not in _JOB_ROWS:
+        raise ValueError(f"Not a valid job rows mode: {job_rows}")
+    if job_rows != "first" and (output_format != "csv"
+                                or manifest is not None):
+        raise ValueError(
+            f"Not a valid job rows mode with columnar output or a manifest: "
+            f"{job_rows}")
+
+
+def _check_arguments(parser, parsed, output_format: str):
+    """Exits with a usage error for command line options that are invalid or
+    cannot be combined, before anything is read or written.
+    """
+    if parsed.jobs < 1:
+        parser.error(f"--jobs must be at least 1: {parsed.jobs}")
+    if parsed.threads < 1:
+        parser.error(f"--threads must be at least 1: {parsed.threads}")
+    if output_format != "csv" and (parsed.time_str_format is not None
+                                   or parsed.human_readable is True):
+        parser.error("--time_str_format and --human-readable cannot be "
+                     "combined with --output_format or --sqlite")
+    if parsed.job_rows != "first" and (output_format != "csv"
+                                       or parsed.manifest is not None):
+        parser.error("--job_rows cannot be combined with --output_format, "
+                     "--sqlite or --manifest")
+    if parsed.watch is not None and (
+            parsed.json_file is not None or parsed.root is not None
+            or parsed.manifest is not None or parsed.job_rows != "first"
+            or output_format != "csv"):
+        parser.error("--watch cannot be combined with --json_file, --root, "
+                     "--manifest, --job_rows or --output_format")
+    if parsed.root is not None and (parsed.json_file is not None
+                                    or parsed.manifest is not None
+                                    or parsed.percentiles is not None):
+        parser.error("--root cannot be combined with --json_file, "
+                     "--manifest or --percentiles")
+    if parsed.percentiles is not None and (
+            parsed.manifest is not None or parsed.job_rows != "first"
+            or output_format != "csv" or parsed.time_str_format is not None
+            or parsed.human_readable is True):
+        parser.error("--percentiles cannot be combined with --manifest, "
+                     "--job_rows, --output_format, --time_str_format or "
+                     "--human-readable")
+    if parsed.manifest is not None and parsed.json_file is not None:
+        tars = [path for path in parsed.json_file if archive.is_tar(path)]
+        if tars:
+            parser.error(f"--manifest cannot be combined with tar archives: "
+                         f"{tars[0]}")
+
+
+def _open_writer(path: str,
+                 time_format: str,
+                 human_readable: bool,
+                 output_format: str,
+                 job_rows: str,
+                 stats=None):
+    """Returns the writer of an output format.
+    """
+    if output_format == "columnar":
+        import columnar
+        return columnar.Writer(path)
+    if output_format == "sqlite":
+        import database
+        return database.Writer(path)
+    return _CsvWriter(path, time_format, human_readable,
+                      job_column=job_rows != "first", stats=stats)
+
+
+def _tracked(sources, handed: deque):
+    """Yields sources, appending each one to handed as it is taken, so that
+    fields coming back in order can be paired with their source.
+    """
+    for source in sources:
+        handed.append(source)
+        yield source
+
+
+def _write_rows(writer, paths, fields, job_rows: str, stats=None):
+    """Writes the fields of each path or archive member, one row per job for
+    other job_rows. Skipped files, whose fields are None, have no row.
+    """
+    write = writer.write
+    if stats is not None:
+        write = stats.counted("rows written", stats.timed("write", write))
+
+    # Fields come first so that paths being discovered are taken after their
+    # fields were requested
+    for values, path in zip(fields, paths):
+        if values is None:
+            continue
+        logfile = _logfile(path)
+        if job_rows == "first":
+            write(values, logfile)
+            continue
+        for job, job_values in values:
+            write(job_values, logfile, job)
+
+
+def _logfile(source) -> str:
+    """Returns the logfile name of a path or of a tar archive member.
+    """
+    if isinstance(source, archive.Member):
+        return os.path.basename(source.name)
+    return os.path.basename(source)
+
+
+def watch(directory: str,
+          output_filename: str,
+          time_format: str = None,
+          human_readable: bool = False,
+          workers: int = 1):
+    """Appends a row to a .csv file for every .JSON file written to directory.
+
+    Runs until interrupted. New files are debounced until fio has finished
+    writing them and parsed in a process pool, see watcher.watch(). Each row is
+    flushed to the output file as soon as it is written. Rows already in the
+    output file are kept, and the files they name are not converted again, so
+    a restarted watch picks up where it stopped.
+
+    Args:
+        directory: A path to an existing directory to watch.
+        output_filename: A string filename for the .csv file rows are
+            appended to. It is created with a header if it does not exist.
+        time_format: A string pattern to specify how the extracted time data
+            should be formatted.
+        human_readable: A flag that determines how bw_bytes should be written.
+        workers: The number of processes used to parse the .JSON files.
+
+    Returns:
+        The path of the .csv file.
+
+    Raises:
+        ValueError: Not a valid directory
+        ValueError: Not a valid number of workers
+    """
+    if not os.path.isdir(directory):
+        raise ValueError(f"Not a valid directory: {directory}")
     new_file_path = os.path.join(os.getcwd(), output_filename)
-    with open(new_file_path, "w") as f:
-        f.write("\n".join(data))
-        print("Results: {new_file_path}".format(new_file_path=new_file_path))
+    converted = _logfiles(new_file_path)
+    with _CsvWriter(new_file_path, time_format, human_readable,
+                    append=True) as writer:
+        def write(fields: tuple, logfile: str):
+            writer.write(fields, logfile)
+            writer.flush()
+
+        print("Watching: {directory} -> {new_file_path}".format(
+            directory=directory, new_file_path=new_file_path))
+        import asyncio
+        import watcher
+        try:
+            asyncio.run(watcher.watch(directory, write, workers=workers,
+                                      skip=converted))
+        except KeyboardInterrupt:
+            pass
     return new_file_path
 
 
+def _logfiles(path: str) -> set[str]:
+    """Returns the logfile names already written to a .csv file.
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        next(f, None)
+        return {line.rstrip("\n").rsplit(",", 1)[-1] for line in f}
+
+
+def _iter_fields(paths: list[str],
+                 workers: int = 1,
+                 job_rows: str = "first",
+                 stats=None,
+                 hashed: bool = False,
+                 skip_invalid: bool = False):
+    """Lazily parses .JSON files and yields the extracted fields of each file.
+
+    Each file is loaded, reduced to its fields and dropped before the next file
+    is opened. With more than one worker the files are parsed in chunks by a
+    process pool, keeping only a few chunks in flight at a time.
+
+    Args:
+        paths: A list of string paths to existing .JSON files, or an iterator
+            of paths that are still being discovered. Tar archive members
+            may take the place of paths, they are sent to worker processes
+            still compressed and decompressed there.
+        workers: The number of processes used to parse the .JSON files.
+        job_rows: 'first', or 'job' or 'group' for extract.read_jobs().
+        stats: Optional, see convert().
+        hashed: A flag that yields (fields, sha256) pairs for the manifest
+            instead, see manifest.read().
+        skip_invalid: A flag that reports files that cannot be parsed on
+            stderr and yields None for them instead of raising.
+
+    Yields:
+        The tuple returned by extract.read() for each file, or the list
+        returned by extract.read_jobs() for other job_rows, in the same order
+        as paths.
+    """
+    if workers > 1 and _earns_pool(paths):
+        yield from _iter_fields_parallel(paths, workers, job_rows, stats,
+                                         hashed, skip_invalid)
+        return
+    for path in paths:
+        yield _read(path, job_rows, stats, hashed, skip_invalid)
+
+
+def _earns_pool(paths) -> bool:
+    """Returns True unless paths is a list of fewer than _PARALLEL_MIN_BYTES
+    bytes, too little to earn back starting a process pool.
+    """
+    if not isinstance(paths, list):
+        return True
+    size = 0
+    for path in paths:
+        size += os.path.getsize(path)
+        if size >= _PARALLEL_MIN_BYTES:
+            return True
+    return False
+
+
+def _iter_fields_parallel(paths, workers: int, job_rows: str, stats=None,
+                          hashed: bool = False, skip_invalid: bool = False):
+    """Parses chunks of .JSON files in a process pool, yielding in order.
+
+    With stats, each chunk is recorded in a Stats of its own in the worker,
+    which is merged into stats when the chunk comes back.
+    """
+    # Aim for a few chunks per worker so uneven files still balance out, a
+    # stream of paths of unknown length is sent in small chunks instead
+    if isinstance(paths, list):
+        chunk_size = max(1, min(_MAX_CHUNK_SIZE,
+                                len(paths) // (workers * 4)))
+    else:
+        chunk_size = _STREAM_CHUNK_SIZE
+    from concurrent.futures import ProcessPoolExecutor
+    paths = iter(paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        read_chunk = _read_chunk if stats is None else _read_chunk_stats
+        for chunk in iter(lambda: list(islice(paths, chunk_size)), []):
+            pending.append(executor.submit(read_chunk, chunk, job_rows,
+                                           hashed, skip_invalid))
+
+            # Bound the finished fields waiting on a slower, earlier chunk
+            if len(pending) >= workers * 2:
+                yield from _chunk_fields(pending.popleft(), stats)
+        while pending:
+            yield from _chunk_fields(pending.popleft(), stats)
+
+
+def _chunk_fields(future, stats=None) -> list:
+    """Waits for a chunk and returns its fields, merging its stats if any.
+    """
+    if stats is None:
+        return future.result()
+    fields, chunk_stats = future.result()
+    stats.merge(chunk_stats)
+    return fields
+
+
+def _read_chunk(paths: list[str], job_rows: str = "first",
+                hashed: bool = False, skip_invalid: bool = False) -> list:
+    """Returns the extracted fields for a chunk of .JSON files.
+    """
+    return [_read(path, job_rows, None, hashed, skip_invalid)
+            for path in paths]
+
+
+def _read_chunk_stats(paths: list[str], job_rows: str = "first",
+                      hashed: bool = False,
+                      skip_invalid: bool = False) -> tuple:
+    """Returns the extracted fields for a chunk of .JSON files, along with
+    the Stats of reading them.
+    """
+    chunk_stats = _stats().Stats()
+    return ([_read(path, job_rows, chunk_stats, hashed, skip_invalid)
+             for path in paths], chunk_stats)
+
+
+def _read(path, job_rows: str, stats=None, hashed: bool = False,
+          skip_invalid: bool = False):
+    """Extracts the first job of a .JSON file or tar archive member, or every
+    job or group. hashed returns the fields of a file with its sha256 for the
+    manifest, see manifest.read(). skip_invalid returns None for a file that
+    cannot be parsed, after reporting it on stderr.
+    """
+    if skip_invalid:
+        # Anything that is not a fio result fails in its own way, e.g. a
+        # KeyError for a .json without jobs
+        try:
+            return _read(path, job_rows, stats, hashed)
+        except Exception as error:
+            if isinstance(path, archive.Member):
+                path = os.path.join(path.archive, path.name)
+            print(f"Skipped: {path} ({error!r})", file=sys.stderr)
+            if stats is not None:
+                stats.add("files skipped")
+            return None
+    if hashed:
+        import manifest
+        return manifest.read(path, stats)
+    if isinstance(path, archive.Member):
+        return _read_member(path, job_rows, stats)
+    if job_rows == "first":
+        return extract.read(path, stats)
+    return extract.read_jobs(path, job_rows, stats)
+
+
+def _read_member(member: archive.Member, job_rows: str, stats=None):
+    """Same as _read() for a tar archive member.
+    """
+    if stats is None:
+        buf = member.read()
+    else:
+        with stats.stage("read"):
+            buf = member.read()
+        stats.add("bytes read", len(member.data))
+    if job_rows == "first":
+        return extract.parse(buf, stats)
+    return extract.parse_jobs(buf, job_rows, stats)
+
+
+def _stats():
+    """Imports the stats module shared with find in project_3.
+    """
+    import sibling
+    sibling.use("project_3")
+    import stats
+    return stats
+
+
+class _CsvWriter:
+    """Writes extracted fields as .csv rows through a large write buffer.
+    """
+    def __init__(self,
+                 path: str,
+                 time_format: str = None,
+                 human_readable: bool = False,
+                 job_column: bool = False,
+                 append: bool = False,
+                 stats=None):
+        # Appending to a file that already has a header adds rows only
+        resume = append and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a" if resume else "w",
+                          buffering=_WRITE_BUFFER_SIZE)
+        if not resume:
+            self._file.write(extract.HEADER + ",job" if job_column
+                             else extract.HEADER)
+        self._time_format = time_format
+        self._human_readable = human_readable
+        self._rows = 0
+        self._format_row = (_format_row if stats is None
+                            else stats.timed("format", _format_row))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, fields: tuple, logfile: str, job=None):
+        """Appends the row for the fields returned by extract.read().
+
+        The job index or groupid is appended as a last column when given.
+        """
+        self._file.write("\n")
+        self._file.write(self._format_row(fields, logfile, self._time_format,
+                                          self._human_readable))
+        if job is not None:
+            self._file.write(f",{job}")
+
+        # Get the first row to disk right away, later rows are batched
+        if self._rows == 0:
+            self._file.flush()
+        self._rows += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _format_row(fields: tuple,
+                file_name: str,
+                time_format: str = None,
+                human_readable: bool = False) -> str:
+    """Formats the fields extracted from a .JSON file as a .csv row.
+
+    Args:
+        fields: The tuple of fields returned by extract.read().
+        file_name: The base name of the .JSON file, written as the logfile.
+        time_format: A string pattern to specify how the extracted time data
+            should be formatted.
+        human_readable: A flag that determines how bw_bytes should be written.
+
+    Returns:
+        A .csv formatted row string without a trailing newline.
+    """
+    (timestamp, bs, rw, rwmixread, read_iops, read_bw_bytes, read_clatnsmean,
+     write_iops, write_bw_bytes, write_clatnsmean, err_num) = fields
+    logfile = file_name
+
+    # Convert formatting
+    if time_format is not None:
+        import timefmt
+        timestamp = timefmt.formatter(time_format)(timestamp)
+    if human_readable is True:
+        read_bw_bytes = round(read_bw_bytes/1024, 2)
+        write_bw_bytes = round(write_bw_bytes/1024, 2)
+
+    return f"{timestamp},{bs},{rw},{rwmixread},{read_iops}," \
+           f"{read_bw_bytes},{read_clatnsmean},{write_iops}," \
+           f"{write_bw_bytes},{write_clatnsmean},{err_num},{logfile}"
+
+
 def main(args: list[str] = None):
+    """Parses command line input and calls convert with parsed arguments.
+
+    'convert.py compare --baseline ... --candidate ...' compares two sets of
+    runs instead, see compare.compare(), and 'convert.py rollup --database
+    ...' adds runs to or queries time series rollups, see rollup.Store.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "compare":
+        import compare
+        return compare.main(args[1:])
+    if args and args[0] == "rollup":
+        import rollup
+        return rollup.main(args[1:])
+
     # Create parser and add arguments
+    import argparse
     parser = argparse.ArgumentParser(conflict_handler="resolve")
     parser.add_argument(
         "--json_file",
         action='extend',
         nargs="+",
         type=str,
-        required=True,
         help="Name of input json file to parse data, this could be multiple."
     )
     parser.add_argument(
         "--output_filename",
         type=str,
-        required=True,
         help="Name of output filename."
     )
     parser.add_argument(
@@ -114,21 +678,168 @@ def main(args: list[str] = None):
         action="store_true",
         help="Convert size bw_bytes into human readable format."
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes used to parse the json files."
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="Manifest file caching the data extracted from each json file."
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Parse every json file again instead of using the manifest."
+    )
+    parser.add_argument(
+        "--output_format",
+        choices=_OUTPUT_FORMATS,
+        default="csv",
+        help="Write a .csv file, a typed, memory-mappable columnar file or "
+             "a SQLite database."
+    )
+    parser.add_argument(
+        "--sqlite",
+        type=str,
+        help="Insert the results into the SQLite database at this path "
+             "instead of writing an output file."
+    )
+    parser.add_argument(
+        "--root",
+        type=str,
+        help="Directory to search for json files instead of --json_file, "
+             "converting them as they are found."
+    )
+    parser.add_argument(
+        "--name",
+        type=str,
+        default=r".*\.json$",
+        help="Regex pattern of the json file names to convert under --root."
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of threads searching --root."
+    )
+    parser.add_argument(
+        "--job_rows",
+        choices=_JOB_ROWS,
+        default="first",
+        help="Write the first job of each file, a row per job, or a row per "
+             "groupid."
+    )
+    parser.add_argument(
+        "--watch",
+        type=str,
+        help="Directory to watch, appending a row for each new json file "
+             "until interrupted."
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="",
+        help="Print timings of each stage and counters to stderr, and write "
+             "them as .json to the given path."
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="Write a cProfile of the conversion to this path. Worker "
+             "processes are not profiled."
+    )
+    parser.add_argument(
+        "--percentiles",
+        choices=("run", "group"),
+        help="Write clat_ns percentiles per run, or aggregated per io_bs, "
+             "io_rw and io_rwmixread, instead of the summary."
+    )
 
-    # Parse command line args
-    if args is not None:
-        parsed = parser.parse_args(args)
-    else:
-        parsed = parser.parse_args()
+    # Parse command line args. A subcommand is only recognized as the first
+    # argument, name it when it was given after conversion options instead.
+    # Option values, e.g. a --json_file named rollup, are never subcommands.
+    parsed, unknown = parser.parse_known_args(args)
+    positionals = [arg for arg in unknown if not arg.startswith("-")]
+    if positionals and positionals[0] in ("compare", "rollup"):
+        parser.error(f"{positionals[0]} must come before the other options")
+    if unknown:
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
     paths = parsed.json_file
     output_filename = parsed.output_filename
     time_str_format = parsed.time_str_format
     human_readable = parsed.human_readable
+    workers = parsed.jobs
+    manifest = parsed.manifest
+    rebuild = parsed.rebuild
+    output_format = parsed.output_format
+    job_rows = parsed.job_rows
 
-    return convert(paths=paths,
-                   output_filename=output_filename,
-                   time_format=time_str_format,
-                   human_readable=human_readable)
+    if parsed.sqlite is not None:
+        if (parsed.watch is not None or parsed.percentiles is not None
+                or output_format != "csv"):
+            parser.error("--sqlite cannot be combined with --watch, "
+                         "--percentiles or --output_format")
+        output_filename = parsed.sqlite
+        output_format = "sqlite"
+    elif output_filename is None:
+        parser.error("the following arguments are required: --output_filename")
+
+    run_stats = None
+    if parsed.stats is not None:
+        if parsed.watch is not None or parsed.percentiles is not None:
+            parser.error("--stats cannot be combined with --watch or "
+                         "--percentiles")
+        run_stats = _stats().Stats()
+    _check_arguments(parser, parsed, output_format)
+
+    def run():
+        if parsed.watch is not None:
+            return watch(directory=parsed.watch,
+                         output_filename=output_filename,
+                         time_format=time_str_format,
+                         human_readable=human_readable,
+                         workers=workers)
+        if parsed.root is not None:
+            return convert_found(root=parsed.root,
+                                 name=parsed.name,
+                                 output_filename=output_filename,
+                                 time_format=time_str_format,
+                                 human_readable=human_readable,
+                                 workers=workers,
+                                 output_format=output_format,
+                                 job_rows=job_rows,
+                                 threads=parsed.threads,
+                                 stats=run_stats)
+        if paths is None:
+            parser.error(
+                "the following arguments are required: --json_file")
+
+        if parsed.percentiles is not None:
+            import percentiles
+            return percentiles.convert(paths=paths,
+                                       output_filename=output_filename,
+                                       mode=parsed.percentiles)
+        return convert(paths=paths,
+                       output_filename=output_filename,
+                       time_format=time_str_format,
+                       human_readable=human_readable,
+                       workers=workers,
+                       manifest=manifest,
+                       rebuild=rebuild,
+                       output_format=output_format,
+                       job_rows=job_rows,
+                       stats=run_stats)
+
+    capture = (_stats().profile(parsed.profile) if parsed.profile is not None
+               else nullcontext())
+    with capture:
+        new_file_path = run()
+    if run_stats is not None:
+        run_stats.write(parsed.stats)
+    return new_file_path
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import sqlite3
+
+_TABLE = "results"
+
+# Column names and types in the order of the .csv header
+COLUMNS = (("test_datetime", "INTEGER NOT NULL"),
+           ("io_bs", "TEXT NOT NULL"),
+           ("io_rw", "TEXT NOT NULL"),
+           ("io_rwmixread", "TEXT NOT NULL"),
+           ("read_iops", "INTEGER NOT NULL"),
+           ("read_bw_bytes", "INTEGER NOT NULL"),
+           ("read_clat_ns_mean", "INTEGER NOT NULL"),
+           ("write_iops", "INTEGER NOT NULL"),
+           ("write_bw_bytes", "INTEGER NOT NULL"),
+           ("write_clat_ns_mean", "INTEGER NOT NULL"),
+           ("error", "INTEGER NOT NULL"),
+           ("logfile", "TEXT NOT NULL UNIQUE"))
+
+_INDEXED = ("io_bs", "io_rw", "test_datetime")
+
+# Rows inserted per transaction
+_BATCH_SIZE = 10000
+
+
+class Writer:
+    """Inserts extracted fields into a SQLite table in large transactions.
+
+    Rows are buffered and inserted with executemany, one transaction per
+    batch, so the cost of a commit is shared by many rows. The logfile column
+    is unique and a row whose logfile is already in the table is skipped, so
+    converting the same files again adds nothing.
+    """
+    def __init__(self, path: str, batch_size: int = _BATCH_SIZE):
+        """Opens the database at path, creating the table and indexes if new.
+        """
+        self.path = path
+        self.inserted = 0
+        self._batch_size = batch_size
+        self._rows = []
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        columns = ", ".join(f"{name} {kind}" for name, kind in COLUMNS)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_TABLE} ({columns})")
+            for name in _INDEXED:
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_TABLE}_{name} "
+                    f"ON {_TABLE} ({name})")
+        self._insert = (f"INSERT OR IGNORE INTO {_TABLE} VALUES "
+                        f"({', '.join('?' for _ in COLUMNS)})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._connection.close()
+
+    def write(self, fields: tuple, logfile: str):
+        """Buffers the fields returned by extract.read() and the logfile name.
+        """
+        self._rows.append((*fields, logfile))
+        if len(self._rows) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """Inserts the buffered rows in one transaction.
+        """
+        if not self._rows:
+            return
+        with self._connection:
+            before = self._connection.total_changes
+            self._connection.executemany(self._insert, self._rows)
+            self.inserted += self._connection.total_changes - before
+        self._rows = []
+
+    def close(self):
+        """Inserts the remaining rows and closes the database.
+        """
+        self.flush()
+        self._connection.close()
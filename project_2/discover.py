@@ -0,0 +1,89 @@
+import queue
+import threading
+
+from typing import Iterator
+
+import sibling
+
+# File discovery is shared with the find utility in project_3
+sibling.use("project_3")
+import find  # noqa: E402
+
+# Found paths waiting for the converter before the walk pauses
+_QUEUE_SIZE = 1024
+
+# Seconds between checks for a consumer that stopped reading
+_PUT_TIMEOUT = 0.1
+
+_DONE = object()
+
+
+def discover(root: str,
+             name: str,
+             threads: int = 1,
+             queue_size: int = _QUEUE_SIZE,
+             stats=None) -> Iterator[str]:
+    """Yields files under root that match name while the walk goes on.
+
+    find.ifind() walks the tree in a background thread and puts every match on
+    a bounded queue, so the caller can start on the first match while the
+    rest of the tree is listed. When the caller falls behind, the walk waits
+    for room in the queue rather than holding every path.
+
+    Args:
+        root: A path to an existing directory.
+        name: A string regex pattern that file names must match.
+        threads: The number of threads listing directories.
+        queue_size: The number of found paths that may wait for the caller.
+        stats: Optional, a stats.Stats passed on to find.ifind().
+
+    Returns:
+        An iterator of matching file paths in the order they are found.
+
+    Raises:
+        ValueError: Not a valid root path
+        ValueError: Not a valid string pattern
+        ValueError: Not a valid number of threads
+    """
+    # Created here so that invalid arguments raise to the caller right away
+    found = find.ifind(root=root, name=name, search_type="f", threads=threads,
+                       stats=stats)
+    paths = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                paths.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def walk():
+        try:
+            for path in found:
+                if not put(path):
+                    return
+        except Exception as error:
+            put(error)
+            return
+        finally:
+            found.close()
+        put(_DONE)
+
+    def results():
+        thread = threading.Thread(target=walk, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = paths.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    return results()
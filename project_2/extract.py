@@ -0,0 +1,414 @@
+import json
+from math import floor
+import mmap
+import os
+import re
+
+import archive
+
+# The summary fields of a row in .csv column order, as (column, section, keys,
+# kind). A value is looked up by keys in the document itself, its
+# 'global options', or the job and its 'job options', 'read' and 'write'
+# sections. Kind 'floor' rounds a number down, 'optional' reads a missing key
+# as '' and 'value' takes the value as it is.
+FIELDS = (("test_datetime", "document", ("timestamp",), "value"),
+          ("io_bs", "job options", ("bs",), "value"),
+          ("io_rw", "global options", ("rw",), "value"),
+          ("io_rwmixread", "global options", ("rwmixread",), "optional"),
+          ("read_iops", "read", ("iops",), "floor"),
+          ("read_bw_bytes", "read", ("bw_bytes",), "floor"),
+          ("read_clat_ns_mean", "read", ("clat_ns", "mean"), "floor"),
+          ("write_iops", "write", ("iops",), "floor"),
+          ("write_bw_bytes", "write", ("bw_bytes",), "floor"),
+          ("write_clat_ns_mean", "write", ("clat_ns", "mean"), "floor"),
+          ("error", "job", ("error",), "value"))
+
+COLUMNS = tuple(column for column, _, _, _ in FIELDS)
+
+# The .csv header, with the logfile column that converters add to each row
+HEADER = ",".join(COLUMNS + ("logfile",))
+
+_NUMBER = rb"(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+
+_JOBS = re.compile(rb'"jobs"\s*:\s*\[\s*\{')
+_TIMESTAMP = re.compile(rb'"timestamp"\s*:\s*' + _NUMBER)
+_GLOBAL_OPTIONS = re.compile(rb'"global options"\s*:\s*(\{[^{}]*\})')
+_ERROR = re.compile(rb'"error"\s*:\s*' + _NUMBER)
+_JOB_OPTIONS = re.compile(rb'"job options"\s*:\s*(\{[^{}]*\})')
+_READ = re.compile(rb'"read"\s*:\s*\{')
+_WRITE = re.compile(rb'"write"\s*:\s*\{')
+_TRIM = re.compile(rb'"trim"\s*:\s*\{')
+_IOPS = re.compile(rb'"iops"\s*:\s*' + _NUMBER)
+_BW_BYTES = re.compile(rb'"bw_bytes"\s*:\s*' + _NUMBER)
+_CLAT_MEAN = re.compile(rb'"clat_ns"\s*:\s*\{[^{}]*?"mean"\s*:\s*' + _NUMBER)
+
+# Histogram buckets, which json+ output and latency logging make the bulk of a
+# document while none of the extracted fields come from them
+_BUCKETS = re.compile(rb'"(?:bins|latency_(?:ns|us|ms))"\s*:\s*\{')
+
+# Files at least this large are memory-mapped and pruned instead of read
+_MMAP_THRESHOLD = 1024 * 1024
+
+# Bytes of the mapping searched before the pages behind are released, and the
+# overlap that keeps a bucket key split across two windows from being missed
+_WINDOW = 4 * 1024 * 1024
+_OVERLAP = 256
+
+
+def read(path: str, stats=None, digest=None) -> tuple:
+    """Reads the summary fields of a fio .json file.
+
+    Args:
+        path: A string path to an existing fio .json file, or to one
+            compressed with gzip, bzip2, xz or zstd, see load().
+        stats: Optional, a Stats from project_3's stats.py that records the
+            time spent in the 'read', 'extract' and 'json' stages, and the
+            files parsed, bytes read and full json parses.
+        digest: Optional, see load().
+
+    Returns:
+        A tuple of (timestamp, bs, rw, rwmixread, read_iops, read_bw_bytes,
+        read_clat_ns_mean, write_iops, write_bw_bytes, write_clat_ns_mean,
+        error), in the order of COLUMNS.
+
+    Raises:
+        ValueError: Not a valid compressed file
+    """
+    if stats is None:
+        return parse(load(path, digest))
+    with stats.stage("read"):
+        buf = load(path, digest)
+    stats.add("bytes read", os.path.getsize(path))
+    return parse(buf, stats)
+
+
+def parse(buf: bytes, stats=None) -> tuple:
+    """Returns the summary fields of a fio .json document, see read().
+
+    Args:
+        buf: The bytes of a fio .json document.
+        stats: Optional, see read().
+    """
+    if stats is not None:
+        return _parse_measured(buf, stats)
+    fields = scan(buf)
+    if fields is None:
+        fields = from_document(json.loads(buf))
+    return fields
+
+
+def _parse_measured(buf: bytes, stats) -> tuple:
+    """Same as parse(), recording each stage in stats.
+    """
+    stats.add("files parsed")
+    with stats.stage("extract"):
+        fields = scan(buf)
+    if fields is None:
+        stats.add("full json parses")
+        with stats.stage("json"):
+            document = json.loads(buf)
+        with stats.stage("extract"):
+            fields = from_document(document)
+    return fields
+
+
+def read_jobs(path: str, job_rows: str = "job", stats=None) -> list[tuple]:
+    """Reads the summary fields of every job, or of every group of jobs.
+
+    Args:
+        path: A string path to an existing fio .json file, compressed or not.
+        job_rows: 'job' for one entry per element of the jobs array, or
+            'group' for one entry per groupid. See jobs_from_document().
+        stats: Optional, see read().
+
+    Returns:
+        A list of (job, fields) pairs, where job is the index into the jobs
+        array or the groupid, and fields is the same tuple as read().
+
+    Raises:
+        ValueError: Not a valid job rows mode
+    """
+    if stats is None:
+        return parse_jobs(load(path), job_rows)
+    with stats.stage("read"):
+        buf = load(path)
+    stats.add("bytes read", os.path.getsize(path))
+    return parse_jobs(buf, job_rows, stats)
+
+
+def parse_jobs(buf: bytes, job_rows: str = "job",
+               stats=None) -> list[tuple]:
+    """Returns the summary fields of every job or group of a fio .json
+    document, see read_jobs().
+
+    Raises:
+        ValueError: Not a valid job rows mode
+    """
+    if stats is None:
+        return jobs_from_document(json.loads(buf), job_rows)
+    stats.add("files parsed")
+    with stats.stage("json"):
+        document = json.loads(buf)
+    with stats.stage("extract"):
+        return jobs_from_document(document, job_rows)
+
+
+def load(path: str, digest=None) -> bytes:
+    """Returns the contents of a fio .json file, pruned when it is large.
+
+    Small files are read whole. Files of _MMAP_THRESHOLD bytes or more, such
+    as json+ output with clat_ns bins, are memory-mapped and returned without
+    their histogram buckets, see prune(). Compressed files, e.g. .json.gz,
+    are decompressed as a stream, see archive.read().
+
+    Args:
+        path: A string path to an existing fio .json file.
+        digest: Optional, a hashlib object updated with the bytes of the file
+            as it is on disk, so that hashing it costs no second read.
+
+    Returns:
+        The bytes of a fio .json document.
+
+    Raises:
+        ValueError: Not a valid compressed file
+    """
+    if archive.is_compressed(path):
+        return archive.read(path, digest)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_THRESHOLD:
+            buf = f.read()
+            if digest is not None:
+                digest.update(buf)
+            return buf
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return prune(mapped, digest)
+
+
+def prune(mapped: mmap.mmap, digest=None) -> bytes:
+    """Copies a mapped fio .json document, emptying its histogram buckets.
+
+    Every 'bins', 'latency_ns', 'latency_us' and 'latency_ms' object is
+    replaced by {} without being decoded or copied. fio writes them as flat
+    objects of numbers, so each one ends at the next closing brace, which is
+    found with a single search of the mapping. Buckets that hold a nested
+    object are copied as they are.
+
+    The mapping is searched one window at a time, and the pages behind each
+    window are released once copied, so memory use stays near the size of the
+    pruned document rather than the file. Hashing the mapping goes window by
+    window too, right before the pages are released.
+
+    Args:
+        mapped: A read-only mmap of a fio .json file.
+        digest: Optional, a hashlib object updated with every byte of the
+            mapping.
+
+    Returns:
+        The document as bytes, still valid json and in the same layout.
+    """
+    release = getattr(mmap, "MADV_DONTNEED", None)
+    size = len(mapped)
+    parts = []
+    position = 0
+    released = 0
+    while position < size:
+        end = min(position + _WINDOW, size)
+        match = _BUCKETS.search(mapped, position, min(end + _OVERLAP, size))
+        if match is not None and match.start() < end:
+            opening = match.end() - 1
+            closing = mapped.find(b"}", opening)
+            if closing == -1 or mapped.find(b"{", opening + 1, closing) != -1:
+                parts.append(mapped[position:match.end()])
+                position = match.end()
+                continue
+            parts.append(mapped[position:opening + 1])
+            position = closing
+        else:
+            parts.append(mapped[position:end])
+            position = end
+
+        # Everything before position is copied, hash it and drop it from this
+        # process
+        boundary = position - position % mmap.PAGESIZE
+        if boundary > released:
+            if digest is not None:
+                _update(digest, mapped, released, boundary)
+            if release is not None:
+                mapped.madvise(release, released, boundary - released)
+            released = boundary
+    if digest is not None:
+        _update(digest, mapped, released, size)
+    return b"".join(parts)
+
+
+def _update(digest, mapped: mmap.mmap, start: int, end: int):
+    """Updates digest with mapped[start:end], copying a window at a time.
+    """
+    for window in range(start, end, _WINDOW):
+        digest.update(mapped[window:min(window + _WINDOW, end)])
+
+
+def jobs_from_document(file_dict: dict, job_rows: str = "job") -> list[tuple]:
+    """Returns the summary fields of every job or group in a single pass.
+
+    In 'group' mode jobs are combined per groupid, as fio does with
+    group_reporting: iops and bw_bytes are summed, clat_ns mean is the mean
+    weighted by each job's clat_ns N, bs is taken from the first job of the
+    group and error is the first non-zero error.
+
+    Raises:
+        ValueError: Not a valid job rows mode
+    """
+    if job_rows not in ("job", "group"):
+        raise ValueError(f"Not a valid job rows mode: {job_rows}")
+    if job_rows == "job":
+        return [(i, _job_fields(file_dict, job))
+                for i, job in enumerate(file_dict["jobs"])]
+
+    # Running totals per groupid: bs, error, then for read and write the iops,
+    # bw_bytes, clat_ns mean * N and clat_ns N
+    groups = {}
+    for job in file_dict["jobs"]:
+        totals = groups.get(job["groupid"])
+        if totals is None:
+            totals = groups[job["groupid"]] = [job["job options"]["bs"], 0,
+                                               0, 0, 0, 0, 0, 0, 0, 0]
+        if totals[1] == 0:
+            totals[1] = job["error"]
+        for offset, direction in ((2, "read"), (6, "write")):
+            stats = job[direction]
+            clat = stats["clat_ns"]
+            totals[offset] += stats["iops"]
+            totals[offset + 1] += stats["bw_bytes"]
+            totals[offset + 2] += clat["mean"] * clat.get("N", 0)
+            totals[offset + 3] += clat.get("N", 0)
+
+    timestamp = file_dict["timestamp"]
+    rw = file_dict["global options"]["rw"]
+    rwmixread = file_dict["global options"].get("rwmixread", "")
+    rows = []
+    for groupid, totals in groups.items():
+        bs, error = totals[0], totals[1]
+        values = []
+        for offset in (2, 6):
+            iops, bw_bytes, weighted_clat, count = totals[offset:offset + 4]
+            clat_mean = weighted_clat / count if count else 0
+            values += [floor(iops), floor(bw_bytes), floor(clat_mean)]
+        rows.append((groupid, (timestamp, bs, rw, rwmixread, *values, error)))
+    return rows
+
+
+def from_document(file_dict: dict) -> tuple:
+    """Returns the summary fields of a fully loaded fio .json document.
+    """
+    return _job_fields(file_dict, file_dict["jobs"][0])
+
+
+def _job_fields(file_dict: dict, job: dict) -> tuple:
+    """Returns the summary fields of one element of the jobs array, as
+    described by FIELDS.
+    """
+    sections = {"document": file_dict,
+                "global options": file_dict["global options"],
+                "job": job,
+                "job options": job["job options"],
+                "read": job["read"],
+                "write": job["write"]}
+    fields = []
+    for _, section, keys, kind in FIELDS:
+        value = sections[section]
+        for key in keys:
+            if kind == "optional" and key not in value:
+                value = ""
+                break
+            value = value[key]
+        fields.append(floor(value) if kind == "floor" else value)
+    return tuple(fields)
+
+
+def scan(buf: bytes) -> tuple:
+    """Extracts the summary fields from raw fio .json bytes without a full parse.
+
+    Only about a dozen scalars are needed for a .csv row, while most of a fio
+    document is percentile tables, trim/sync sections and latency buckets. The
+    needed keys are located with targeted byte searches and only their values
+    are decoded.
+
+    The keys of the first job are expected in fio's order: error, job options,
+    read and then write. Anything else, such as a missing key or braces inside
+    an options string, makes the scan give up rather than guess.
+
+    Args:
+        buf: The contents of a fio .json file.
+
+    Returns:
+        The same tuple as from_document(), or None if buf does not have the
+        usual fio layout and should be parsed in full instead.
+    """
+    jobs = _JOBS.search(buf)
+    if jobs is None:
+        return None
+    job_start = jobs.end() - 1
+
+    # Top level keys come before the jobs array
+    timestamp = _TIMESTAMP.search(buf, 0, job_start)
+    global_options = _GLOBAL_OPTIONS.search(buf, 0, job_start)
+    if timestamp is None or global_options is None:
+        return None
+
+    # First job keys, which must appear in order so that a key missing from
+    # the first job is never taken from a later one
+    error = _ERROR.search(buf, job_start)
+    job_options = _JOB_OPTIONS.search(buf, job_start)
+    read_start = _READ.search(buf, job_start)
+    write_start = _WRITE.search(buf, job_start)
+    if (error is None or job_options is None or read_start is None
+            or write_start is None):
+        return None
+    if not (error.end() <= job_options.start()
+            and job_options.end() <= read_start.start()
+            and read_start.end() <= write_start.start()):
+        return None
+    write_end = _TRIM.search(buf, write_start.end())
+    write_end = len(buf) if write_end is None else write_end.start()
+
+    read_values = _scan_direction(buf, read_start.end(), write_start.start())
+    write_values = _scan_direction(buf, write_start.end(), write_end)
+    if read_values is None or write_values is None:
+        return None
+
+    try:
+        global_dict = json.loads(global_options.group(1))
+        bs = json.loads(job_options.group(1))["bs"]
+        rw = global_dict["rw"]
+    except (ValueError, KeyError):
+        return None
+
+    return (_number(timestamp.group(1)),
+            bs,
+            rw,
+            global_dict.get("rwmixread", ""),
+            *read_values,
+            *write_values,
+            _number(error.group(1)))
+
+
+def _scan_direction(buf: bytes, start: int, end: int) -> tuple:
+    """Returns floored (iops, bw_bytes, clat_ns mean) from a read/write section.
+    """
+    iops = _IOPS.search(buf, start, end)
+    bw_bytes = _BW_BYTES.search(buf, start, end)
+    clat_mean = _CLAT_MEAN.search(buf, start, end)
+    if iops is None or bw_bytes is None or clat_mean is None:
+        return None
+    return (floor(_number(iops.group(1))),
+            floor(_number(bw_bytes.group(1))),
+            floor(_number(clat_mean.group(1))))
+
+
+def _number(token: bytes):
+    """Converts a json number token to an int or float like json.loads does.
+    """
+    if b"." in token or b"e" in token or b"E" in token:
+        return float(token)
+    return int(token)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+
+import extract
+
+_VERSION = 1
+
+
+class Manifest:
+    """On-disk cache of the fields extracted from each .JSON file.
+
+    Entries are keyed by absolute path and record the file's mtime, size and
+    sha256 content hash along with its extracted fields. A file whose mtime and
+    size are unchanged is trusted without reading it. A file whose size is
+    unchanged but whose mtime moved, e.g. after a copy or touch, is hashed and
+    reused when the content still matches.
+    """
+    def __init__(self, path: str):
+        """Loads the manifest at path, or starts an empty one.
+
+        Args:
+            path: A string path to the manifest file. It does not need to exist
+                yet.
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") == _VERSION:
+                self.entries = data["entries"]
+
+    def clear(self):
+        """Drops every entry so that all files are parsed again.
+        """
+        self.entries = {}
+
+    def lookup(self, path: str):
+        """Returns the cached fields for path, or None if it must be parsed.
+        """
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None:
+            return None
+        stat = os.stat(path)
+        if stat.st_size != entry["size"]:
+            return None
+        if stat.st_mtime_ns != entry["mtime_ns"]:
+            if _hash_file(path) != entry["sha256"]:
+                return None
+            entry["mtime_ns"] = stat.st_mtime_ns
+        return tuple(entry["fields"])
+
+    def store(self, path: str, fields: tuple, sha256: str):
+        """Records the fields extracted from path and the hex sha256 digest
+        of the bytes they were extracted from.
+        """
+        stat = os.stat(path)
+        self.entries[os.path.abspath(path)] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "fields": list(fields),
+        }
+
+    def iter_fields(self, paths: list[str], parse):
+        """Yields the fields for every path, parsing only cache misses.
+
+        Args:
+            paths: A list of string paths to existing .JSON files.
+            parse: A callable that takes the list of paths missing from the
+                manifest and returns an iterator of their (fields, sha256)
+                pairs in order, as returned by read().
+
+        Yields:
+            The fields of each file in the same order as paths. Newly parsed
+            fields are stored in the manifest as they are yielded.
+        """
+        cached = [self.lookup(path) for path in paths]
+        misses = [path for path, fields in zip(paths, cached) if fields is None]
+        parsed = parse(misses)
+        for path, fields in zip(paths, cached):
+            if fields is None:
+                fields, sha256 = next(parsed)
+                self.store(path, fields, sha256)
+            yield fields
+
+    def evict_missing(self):
+        """Drops the entries of files that no longer exist.
+        """
+        self.entries = {path: entry for path, entry in self.entries.items()
+                        if os.path.exists(path)}
+
+    def save(self):
+        """Atomically writes the manifest back to its path.
+        """
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": _VERSION, "entries": self.entries}, f)
+        os.replace(temp_path, self.path)
+
+
+def read(path: str, stats=None) -> tuple:
+    """Reads the fields of a fio .json file along with its hash.
+
+    The file is hashed as it is read for parsing, so a file missing from the
+    manifest is read once.
+
+    Args:
+        path: A string path to an existing fio .json file.
+        stats: Optional, see extract.read().
+
+    Returns:
+        A tuple of (fields, sha256), where fields is the tuple returned by
+        extract.read() and sha256 the hex digest of the file's content.
+    """
+    digest = hashlib.sha256()
+    fields = extract.read(path, stats, digest)
+    return fields, digest.hexdigest()
+
+
+def _hash_file(path: str) -> str:
+    """Returns the hex sha256 digest of a file's content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,208 @@
+import io
+import json
+import os
+
+import extract
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MODES = ("run", "group")
+_DIRECTIONS = ("read", "write")
+_KEY_HEADER = "io_bs,io_rw,io_rwmixread"
+_STATISTICS = ("mean", "min", "max")
+
+# Joins the parts of a group key into one label, numpy strings drop trailing
+# NUL characters so an empty io_rwmixread would be lost with "\0"
+_KEY_SEPARATOR = "\x1f"
+
+
+class Runs:
+    """Percentile tables of many fio runs as (runs x percentile points) arrays.
+
+    Attributes:
+        keys: A list of (io_bs, io_rw, io_rwmixread) tuples, one per run.
+        logfiles: A list of the .json file names, one per run.
+        points: A 1-D array of the percentile points, e.g. 50.0 or 99.9, that
+            appear in any run, in increasing order.
+        values: A dict from 'read' and 'write' to a 2-D float array of clat_ns
+            percentiles. Runs without a table for a point, such as the read
+            side of a write-only run, hold NaN.
+    """
+    def __init__(self, keys, logfiles, points, values):
+        self.keys = keys
+        self.logfiles = logfiles
+        self.points = points
+        self.values = values
+
+
+def load(paths: list[str]) -> Runs:
+    """Reads the clat_ns percentile tables of the first job of each file.
+
+    Args:
+        paths: A list of string paths to existing .JSON files.
+
+    Returns:
+        A Runs holding every file's tables in one array per direction.
+
+    Raises:
+        ImportError: numpy is required for percentiles
+    """
+    _require_numpy()
+    keys = []
+    logfiles = []
+
+    # The points and values of each run's table as two arrays per direction
+    tables = {direction: [] for direction in _DIRECTIONS}
+    for path in paths:
+        file_dict = json.loads(extract.load(path))
+        job = file_dict["jobs"][0]
+        keys.append((job["job options"]["bs"],
+                     file_dict["global options"]["rw"],
+                     file_dict["global options"].get("rwmixread", "")))
+        logfiles.append(os.path.basename(path))
+        for direction in _DIRECTIONS:
+            table = job[direction]["clat_ns"].get("percentile", {})
+            tables[direction].append(
+                (np.fromiter(table.keys(), dtype=float, count=len(table)),
+                 np.fromiter(table.values(), dtype=float, count=len(table))))
+
+    # Each run's table lands in its row with one assignment to the columns
+    # of its points, found by a binary search of all the points
+    points = np.unique(np.concatenate(
+        [np.zeros(0)] + [run_points for direction in _DIRECTIONS
+                         for run_points, _ in tables[direction]]))
+    values = {}
+    for direction in _DIRECTIONS:
+        array = np.full((len(paths), len(points)), np.nan)
+        for row, (run_points, run_values) in enumerate(tables[direction]):
+            array[row, np.searchsorted(points, run_points)] = run_values
+        values[direction] = array
+    return Runs(keys, logfiles, points, values)
+
+
+def aggregate(runs: Runs):
+    """Groups runs by (io_bs, io_rw, io_rwmixread) and aggregates each point.
+
+    Runs are sorted by group once, and every statistic is then computed for
+    all groups and points at once with ufunc reductions over the group
+    boundaries. NaN entries are left out of every statistic.
+
+    Args:
+        runs: A Runs returned by load().
+
+    Returns:
+        A tuple of (group keys, run counts per group, statistics), where
+        statistics maps (direction, statistic) to a (groups x points) array
+        for the statistics 'mean', 'min' and 'max'.
+    """
+    _require_numpy()
+    if not runs.keys:
+        return [], np.zeros(0, dtype=int), {
+            (direction, statistic): np.zeros((0, len(runs.points)))
+            for direction in _DIRECTIONS
+            for statistic in _STATISTICS}
+    labels = np.array([_KEY_SEPARATOR.join(key) for key in runs.keys])
+    unique, inverse = np.unique(labels, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    sorted_groups = inverse[order]
+    starts = np.flatnonzero(
+        np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    run_counts = np.diff(np.r_[starts, len(order)])
+
+    statistics = {}
+    for direction in _DIRECTIONS:
+        values = runs.values[direction][order]
+        valid = ~np.isnan(values)
+        counts = np.add.reduceat(valid, starts, axis=0)
+        sums = np.add.reduceat(np.where(valid, values, 0), starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            statistics[(direction, "mean")] = np.where(counts > 0,
+                                                       sums / counts, np.nan)
+        statistics[(direction, "min")] = np.fmin.reduceat(values, starts,
+                                                          axis=0)
+        statistics[(direction, "max")] = np.fmax.reduceat(values, starts,
+                                                          axis=0)
+    group_keys = [tuple(label.split(_KEY_SEPARATOR))
+                  for label in unique.tolist()]
+    return group_keys, run_counts, statistics
+
+
+def convert(paths: list[str], output_filename: str, mode: str = "group"):
+    """Writes clat_ns percentiles per run or per group as a wide .csv file.
+
+    Args:
+        paths: A list of string paths to existing .JSON files.
+        output_filename: A string filename for the new .csv file.
+        mode: 'run' writes one row per file with a column per direction and
+            percentile point. 'group' writes one row per (io_bs, io_rw,
+            io_rwmixread) with the mean, min and max of every point across
+            the group's runs.
+
+    Returns:
+        The path of the new .csv file.
+
+    Raises:
+        ValueError: Not a valid path
+        ValueError: Not a valid percentile mode
+        ImportError: numpy is required for percentiles
+    """
+    for path in paths:
+        if not os.path.exists(path):
+            raise ValueError(f"Not a valid path: {path}")
+    if mode not in _MODES:
+        raise ValueError(f"Not a valid percentile mode: {mode}")
+
+    runs = load(paths)
+    labels = [f"p{point:g}" for point in runs.points.tolist()]
+    new_file_path = os.path.join(os.getcwd(), output_filename)
+    if mode == "run":
+        header = [_KEY_HEADER, "logfile"]
+        header += [f"{direction}_clat_ns_{label}"
+                   for direction in _DIRECTIONS for label in labels]
+        columns = [[",".join(key) for key in runs.keys], runs.logfiles]
+        numbers = np.hstack([runs.values[direction]
+                             for direction in _DIRECTIONS])
+    else:
+        group_keys, run_counts, statistics = aggregate(runs)
+        header = [_KEY_HEADER, "runs"]
+        header += [f"{direction}_clat_ns_{label}_{statistic}"
+                   for direction in _DIRECTIONS for label in labels
+                   for statistic in _STATISTICS]
+        columns = [[",".join(key) for key in group_keys],
+                   run_counts.astype(str)]
+
+        # (groups x points x statistics) per direction, flattened to the
+        # column order of the header
+        numbers = np.hstack([
+            np.stack([statistics[(direction, statistic)]
+                      for statistic in _STATISTICS], axis=2).reshape(
+                          len(group_keys), len(labels) * len(_STATISTICS))
+            for direction in _DIRECTIONS])
+
+    # Every number is formatted in one pass, then written a row per line
+    table = np.column_stack([*columns, _format(numbers)])
+    buffer = io.StringIO()
+    np.savetxt(buffer, table, fmt="%s", delimiter=",",
+               header=",".join(header), comments="")
+    with open(new_file_path, "w") as f:
+        f.write(buffer.getvalue().rstrip("\n"))
+    print("Results: {new_file_path}".format(new_file_path=new_file_path))
+    return new_file_path
+
+
+def _format(values):
+    """Formats a float array as floored integer strings, with NaN left empty.
+    """
+    valid = ~np.isnan(values)
+    floored = np.floor(np.where(valid, values, 0)).astype(np.int64)
+    return np.where(valid, floored.astype(str), "")
+
+
+def _require_numpy():
+    """Raises ImportError when numpy is not installed.
+    """
+    if np is None:
+        raise ImportError("numpy is required for percentiles")
@@ -0,0 +1,337 @@
+import argparse
+import json
+from math import sqrt
+import os
+import sqlite3
+
+import extract
+
+# Bucket lengths in seconds. Weeks start on Monday 00:00 UTC, and the epoch
+# was a Thursday, four days after the Monday before it
+PERIODS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+_WEEK_OFFSET = 4 * 86400
+
+_DIRECTIONS = ("read", "write")
+
+# Sample statistics of each direction, as (metric, key prefix, stddev key)
+_METRICS = (("bw", "bw", "bw_dev"), ("iops", "iops", "iops_stddev"))
+
+_TABLE = "rollup"
+_FILES_TABLE = "rollup_files"
+
+# Files whose buffered runs are merged per transaction
+_BATCH_SIZE = 1000
+
+# Running aggregates of a bucket, merged in place with those of new runs. The
+# mean is weighted by sample count and m2, the sum of squared deviations from
+# the mean, is merged with Chan's parallel variance formula, so a bucket never
+# needs the runs it was built from.
+_UPSERT = f"""
+INSERT INTO {_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (period, io_bs, io_rw, direction, metric, start) DO UPDATE SET
+    runs = runs + excluded.runs,
+    samples = samples + excluded.samples,
+    mean = (mean * samples + excluded.mean * excluded.samples)
+        / (samples + excluded.samples),
+    m2 = m2 + excluded.m2 + (excluded.mean - mean) * (excluded.mean - mean)
+        * samples * excluded.samples / (samples + excluded.samples),
+    minimum = min(minimum, excluded.minimum),
+    maximum = max(maximum, excluded.maximum)
+"""
+
+
+def read_runs(path: str) -> list[tuple]:
+    """Reads the bandwidth and iops sample statistics of every job.
+
+    Args:
+        path: A string path to an existing fio .json file.
+
+    Returns:
+        A list of (timestamp, io_bs, io_rw, direction, metric, samples, mean,
+        m2, minimum, maximum) tuples, one per job, direction and metric with
+        samples. m2 is the sum of squared deviations, rebuilt from fio's
+        sample standard deviation.
+
+    Raises:
+        ValueError: Not a valid fio .json file
+    """
+    document = json.loads(extract.load(path))
+    runs = []
+    try:
+        timestamp = document["timestamp"]
+        rw = document["global options"]["rw"]
+        for job in document["jobs"]:
+            bs = job["job options"]["bs"]
+            for direction in _DIRECTIONS:
+                stats = job[direction]
+                for metric, prefix, stddev in _METRICS:
+                    samples = stats[f"{prefix}_samples"]
+                    if samples < 1:
+                        continue
+                    runs.append((timestamp, bs, rw, direction, metric,
+                                 samples, stats[f"{prefix}_mean"],
+                                 stats[stddev] ** 2 * (samples - 1),
+                                 stats[f"{prefix}_min"],
+                                 stats[f"{prefix}_max"]))
+    except (KeyError, TypeError):
+        raise ValueError(f"Not a valid fio .json file: {path}")
+    return runs
+
+
+def bucket(timestamp: int, period: str) -> int:
+    """Returns the start, in seconds since the epoch, of the bucket of period
+    that holds timestamp.
+
+    Raises:
+        ValueError: Not a valid period
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Not a valid period: {period}")
+    offset = _WEEK_OFFSET if period == "week" else 0
+    return timestamp - (timestamp - offset) % PERIODS[period]
+
+
+class Store:
+    """Hour, day and week rollups of fio runs in a SQLite database.
+
+    Every run is added to one bucket per period, keyed by io_bs, io_rw,
+    direction and metric, as a count of runs and samples, the sample weighted
+    mean, m2, the minimum and the maximum. Adding runs merges them into the
+    stored buckets with an upsert, so new files update the rollup without
+    reading the history again, and the absolute paths of added files are kept
+    so that a file is never counted twice. Trend queries read one bucket per
+    period from the primary key instead of scanning runs.
+
+    Attributes:
+        logfiles: The set of absolute logfile paths whose runs were added.
+        added: The number of files added since the store was opened.
+    """
+    def __init__(self, path: str, batch_size: int = _BATCH_SIZE):
+        """Opens the database at path, creating its tables if new.
+        """
+        self.path = path
+        self.added = 0
+        self._batch_size = batch_size
+        self._rows = []
+        self._pending = []
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_TABLE} ("
+                f"period TEXT NOT NULL, io_bs TEXT NOT NULL, "
+                f"io_rw TEXT NOT NULL, direction TEXT NOT NULL, "
+                f"metric TEXT NOT NULL, start INTEGER NOT NULL, "
+                f"runs INTEGER NOT NULL, samples INTEGER NOT NULL, "
+                f"mean REAL NOT NULL, m2 REAL NOT NULL, "
+                f"minimum REAL NOT NULL, maximum REAL NOT NULL, "
+                f"PRIMARY KEY (period, io_bs, io_rw, direction, metric, "
+                f"start)) WITHOUT ROWID")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_FILES_TABLE} ("
+                f"logfile TEXT PRIMARY KEY) WITHOUT ROWID")
+        self.logfiles = {row[0] for row in self._connection.execute(
+            f"SELECT logfile FROM {_FILES_TABLE}")}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._connection.close()
+
+    def __contains__(self, logfile: str) -> bool:
+        """Returns True if the runs of logfile were already added.
+        """
+        return logfile in self.logfiles
+
+    def add(self, runs: list[tuple], logfile: str) -> bool:
+        """Buffers the runs returned by read_runs() for a logfile path.
+
+        Returns:
+            False if the logfile was already added and its runs are ignored.
+        """
+        if logfile in self.logfiles:
+            return False
+        self.logfiles.add(logfile)
+        self._pending.append((logfile,))
+        for (timestamp, bs, rw, direction, metric, samples, mean, m2,
+             minimum, maximum) in runs:
+            for period in PERIODS:
+                self._rows.append((period, bs, rw, direction, metric,
+                                   bucket(timestamp, period), 1, samples,
+                                   mean, m2, minimum, maximum))
+        self.added += 1
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Merges the buffered runs into the stored buckets in one
+        transaction.
+        """
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(_UPSERT, self._rows)
+            self._connection.executemany(
+                f"INSERT OR IGNORE INTO {_FILES_TABLE} VALUES (?)",
+                self._pending)
+        self._rows = []
+        self._pending = []
+
+    def trend(self,
+              io_bs: str,
+              io_rw: str,
+              period: str = "day",
+              direction: str = "read",
+              metric: str = "bw",
+              since: int = None,
+              until: int = None) -> list[tuple]:
+        """Returns the buckets of one configuration in time order.
+
+        Runs that are still buffered are merged first.
+
+        Args:
+            io_bs: The block size, e.g. '8k'.
+            io_rw: The rw mode, e.g. 'randrw'.
+            period: 'hour', 'day' or 'week'.
+            direction: 'read' or 'write'.
+            metric: 'bw' or 'iops'.
+            since: Optional, a timestamp in the first bucket to return.
+            until: Optional, a timestamp that no returned bucket starts at or
+                after.
+
+        Returns:
+            A list of (start, runs, samples, mean, stddev, minimum, maximum)
+            tuples, where stddev is the sample standard deviation of all the
+            samples in the bucket.
+
+        Raises:
+            ValueError: Not a valid period
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Not a valid period: {period}")
+        self.flush()
+        query = (f"SELECT start, runs, samples, mean, m2, minimum, maximum "
+                 f"FROM {_TABLE} WHERE period = ? AND io_bs = ? AND io_rw = ? "
+                 f"AND direction = ? AND metric = ? AND start >= ? "
+                 f"AND start < ? ORDER BY start")
+        first = -2 ** 63 if since is None else bucket(since, period)
+        last = 2 ** 63 - 1 if until is None else until
+        rows = self._connection.execute(
+            query, (period, io_bs, io_rw, direction, metric, first, last))
+        return [(start, runs, samples, mean,
+                 sqrt(m2 / (samples - 1)) if samples > 1 else 0.0,
+                 minimum, maximum)
+                for start, runs, samples, mean, m2, minimum, maximum in rows]
+
+    def close(self):
+        """Merges the remaining runs and closes the database.
+        """
+        self.flush()
+        self._connection.close()
+
+
+def add(store: Store, paths) -> int:
+    """Adds the runs of every file not already in store.
+
+    Args:
+        store: An open Store.
+        paths: An iterable of string paths to fio .json files.
+
+    Returns:
+        The number of files added.
+
+    Raises:
+        ValueError: Not a valid fio .json file
+    """
+    added = store.added
+    for path in paths:
+        # Runs of different directories often reuse the same file names
+        logfile = os.path.abspath(path)
+        if logfile not in store:
+            store.add(read_runs(path), logfile)
+    return store.added - added
+
+
+def watch(store: Store, directory: str, workers: int = 1):
+    """Adds the runs of every .JSON file written to directory until
+    interrupted, see watcher.watch(). Each file is merged as soon as it is
+    parsed.
+    """
+    import asyncio
+    import watcher
+
+    # The watcher works with the names of the files in directory
+    directory = os.path.abspath(directory)
+    skip = {os.path.basename(logfile) for logfile in store.logfiles
+            if os.path.dirname(logfile) == directory}
+
+    def write(runs: list[tuple], name: str):
+        store.add(runs, os.path.join(directory, name))
+        store.flush()
+
+    print(f"Watching: {directory} -> {store.path}")
+    try:
+        asyncio.run(watcher.watch(directory, write, workers=workers,
+                                  skip=skip, read=read_runs))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(args: list[str] = None):
+    """Parses command line input, then adds runs to a rollup database or
+    prints a trend from it.
+    """
+    # Create parser
+    parser = argparse.ArgumentParser(prog="convert.py rollup")
+    parser.add_argument("--database", type=str, required=True)
+    parser.add_argument("--json_file", type=str, action="extend", nargs="+")
+    parser.add_argument("--root", type=str)
+    parser.add_argument("--name", type=str, default=r".*\.json$")
+    parser.add_argument("--watch", type=str)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--trend", action="store_true")
+    parser.add_argument("--io_bs", type=str)
+    parser.add_argument("--io_rw", type=str)
+    parser.add_argument("--period", choices=tuple(PERIODS), default="day")
+    parser.add_argument("--direction", choices=_DIRECTIONS, default="read")
+    parser.add_argument("--metric", choices=("bw", "iops"), default="bw")
+    parser.add_argument("--since", type=int)
+    parser.add_argument("--until", type=int)
+
+    # Parse command line args
+    parsed = parser.parse_args(args)
+    if parsed.trend and (parsed.io_bs is None or parsed.io_rw is None):
+        parser.error("--trend requires --io_bs and --io_rw")
+    if not parsed.trend and any(
+            value is not None for value in (parsed.io_bs, parsed.io_rw,
+                                            parsed.since, parsed.until)):
+        parser.error("--io_bs, --io_rw, --since and --until require --trend")
+    if parsed.trend and parsed.watch is not None:
+        parser.error("--trend cannot be combined with --watch")
+    if parsed.jobs < 1:
+        parser.error(f"--jobs must be at least 1: {parsed.jobs}")
+
+    with Store(parsed.database) as store:
+        if parsed.json_file:
+            print(f"Added {add(store, parsed.json_file)} files")
+        if parsed.root is not None:
+            import discover
+            print(f"Added "
+                  f"{add(store, discover.discover(parsed.root, parsed.name))} "
+                  f"files")
+        if parsed.watch is not None:
+            watch(store, parsed.watch, parsed.jobs)
+        if parsed.trend:
+            rows = store.trend(parsed.io_bs, parsed.io_rw, parsed.period,
+                               parsed.direction, parsed.metric, parsed.since,
+                               parsed.until)
+            print("start,runs,samples,mean,stddev,min,max")
+            for row in rows:
+                print(",".join(str(value) for value in row))
+            return rows
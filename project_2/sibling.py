@@ -0,0 +1,17 @@
+import os
+import sys
+
+# The directory holding project_1, project_2 and project_3
+_REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def use(project: str):
+    """Makes the modules of a sibling project, e.g. 'project_3', importable.
+
+    The projects are plain directories rather than installed packages, so a
+    sibling is reached by adding its directory to the end of sys.path, once.
+    project_1 reaches this directory the same way, see its convert.py.
+    """
+    path = os.path.join(_REPOSITORY, project)
+    if path not in sys.path:
+        sys.path.append(path)
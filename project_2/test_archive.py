@@ -0,0 +1,168 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+
+import archive
+import convert
+import extract
+
+_FILES = ["write-8k.json",
+          "write-1M.json",
+          "read-8k.json",
+          "read-1M.json",
+          "rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "rw50-1M.json"]
+
+_COMPRESSORS = {".gz": gzip.compress, ".bz2": bz2.compress,
+                ".xz": lzma.compress}
+
+
+def _load(file: str) -> bytes:
+    """Returns the raw contents of a sample file from the data directory
+    """
+    with open(os.path.join(os.getcwd(), "data", file), "rb") as f:
+        return f.read()
+
+
+class TestArchive(unittest.TestCase):
+    """Unit tests for archive.py
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _write(self, name: str, data: bytes) -> str:
+        """Writes data to a file in the test directory and returns its path
+        """
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def _write_tar(self, name: str, members: dict[str, bytes],
+                   tar_format: int = tarfile.PAX_FORMAT) -> str:
+        """Writes a tar archive of members, compressed by its suffix
+        """
+        path = os.path.join(self.directory, name)
+        with tarfile.open(path, "w:" + {".tar": "", ".gz": "gz"}[
+                os.path.splitext(name)[1]], format=tar_format) as tar:
+            for member, data in members.items():
+                info = tarfile.TarInfo(member)
+                info.size = len(data)
+                tar.addfile(info, io.BytesIO(data))
+        return path
+
+    def test_read_compressed(self):
+        """Test that compressed files give the fields of the plain file
+        """
+        expected = extract.read(os.path.join(os.getcwd(), "data",
+                                             "rw70-8k.json"))
+        for suffix, compress in _COMPRESSORS.items():
+            path = self._write("rw70-8k.json" + suffix,
+                               compress(_load("rw70-8k.json")))
+            self.assertTrue(archive.is_compressed(path))
+            self.assertEqual(_load("rw70-8k.json"), archive.read(path))
+            self.assertEqual(expected, extract.read(path))
+
+    def test_read_concatenated(self):
+        """Test that concatenated gzip streams are read one after the other
+        """
+        buf = _load("rw70-8k.json")
+        path = self._write("rw70-8k.json.gz", gzip.compress(buf[:1000])
+                           + gzip.compress(buf[1000:]))
+        self.assertEqual(buf, archive.read(path))
+
+    def test_invalid_compressed(self):
+        """Test for correct error handling of a corrupt compressed file
+        """
+        path = self._write("rw70-8k.json.gz",
+                           gzip.compress(_load("rw70-8k.json"))[:100])
+        self.assertRaises(ValueError, lambda: extract.read(path))
+        self.assertRaises(ValueError,
+                          lambda: archive.decompress(b"not xz", "a.json.xz"))
+
+    def test_members(self):
+        """Test streaming .json members out of plain and compressed tars
+        """
+        members = {"run/rw70-8k.json": _load("rw70-8k.json"),
+                   "run/rw50-8k.json.gz": gzip.compress(_load("rw50-8k.json")),
+                   "run/notes.txt": b"not a run"}
+        for name in ("runs.tar", "runs.tar.gz"):
+            path = self._write_tar(name, members)
+            self.assertTrue(archive.is_tar(path))
+            self.assertFalse(archive.is_compressed(path))
+            found = list(archive.members(path))
+            self.assertEqual(["run/rw70-8k.json", "run/rw50-8k.json.gz"],
+                             [member.name for member in found])
+            self.assertEqual([_load("rw70-8k.json"), _load("rw50-8k.json")],
+                             [member.read() for member in found])
+
+    def test_member_names(self):
+        """Test long names of ustar, GNU and pax archives
+        """
+        names = ["short.json", "a" * 90 + "/" + "b" * 60 + ".json",
+                 "c" * 200 + ".json", "ünïcode.json"]
+        members = {name: _load("write-8k.json") for name in names}
+        for tar_format in (tarfile.USTAR_FORMAT, tarfile.GNU_FORMAT,
+                           tarfile.PAX_FORMAT):
+            if tar_format == tarfile.USTAR_FORMAT:
+                members = {name: data for name, data in members.items()
+                           if len(name) < 200}
+            path = self._write_tar("names.tar", members, tar_format)
+            self.assertEqual(list(members),
+                             [member.name
+                              for member in archive.members(path)])
+
+    def test_invalid_tar(self):
+        """Test for correct error handling of a file that is not a tar
+        """
+        path = self._write("runs.tar", b"not a tar archive" * 100)
+        self.assertRaises(ValueError, lambda: list(archive.members(path)))
+
+    def test_convert_tar(self):
+        """Test that converting an archive gives the rows of its files
+        """
+        with open(os.path.join(os.getcwd(), "data", "sumary-results.csv")) as f:
+            expected = f.read()
+        members = {file + ".gz" if index % 2 else file:
+                   gzip.compress(_load(file)) if index % 2 else _load(file)
+                   for index, file in enumerate(_FILES)}
+        path = self._write_tar("runs.tar.gz", members)
+        for workers in (1, 2):
+            results_path = convert.convert(
+                paths=[path],
+                output_filename=os.path.join(self.directory, "results.csv"),
+                workers=workers)
+            with open(results_path) as f:
+                rows = f.read().replace(".json.gz", ".json")
+            self.assertEqual(expected, rows)
+        self.assertRaises(
+            ValueError,
+            lambda: convert.convert(
+                paths=[path], output_filename="results.csv",
+                manifest=os.path.join(self.directory, "manifest.json")))
+
+    def test_zstandard_optional(self):
+        """Test that .zst files need the zstandard package
+        """
+        try:
+            import zstandard
+        except ImportError:
+            path = self._write("rw70-8k.json.zst", b"")
+            self.assertRaises(ValueError, lambda: archive.read(path))
+            return
+        path = self._write(
+            "rw70-8k.json.zst",
+            zstandard.ZstdCompressor().compress(_load("rw70-8k.json")))
+        self.assertEqual(_load("rw70-8k.json"), archive.read(path))
+
+if __name__ == '__main__':
+    unittest.main()
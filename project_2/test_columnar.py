@@ -0,0 +1,84 @@
+import os
+import unittest
+
+import columnar
+import convert
+
+_FILES = ["write-8k.json",
+          "write-1M.json",
+          "read-8k.json",
+          "read-1M.json",
+          "rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "rw50-1M.json"]
+
+
+class TestColumnar(unittest.TestCase):
+    """Unit tests for columnar.py
+    """
+    def setUp(self):
+        """Converts every sample into a columnar file
+        """
+        cwd = os.getcwd()
+        self.paths = [os.path.join(cwd, "data", file) for file in _FILES]
+        self.results_path = convert.convert(
+            paths=self.paths,
+            output_filename=os.path.join(cwd, "results.fcol"),
+            output_format="columnar"
+        )
+
+    def tearDown(self):
+        os.remove(self.results_path)
+
+    def test_rows_match_csv(self):
+        """Test that every row matches sumary-results.csv
+        """
+        with open(os.path.join(os.getcwd(), "data", "sumary-results.csv"),
+                  "r") as f:
+            lines = f.read().split("\n")
+        with columnar.load(self.results_path) as table:
+            self.assertEqual(lines[0].split(","), table.columns)
+            self.assertEqual(len(lines) - 1, len(table))
+            for i, line in enumerate(lines[1:]):
+                row = ",".join(str(value) for value in table.row(i))
+                self.assertEqual(line, row)
+
+    def test_columns(self):
+        """Test typed and dictionary encoded columns
+        """
+        with columnar.load(self.results_path) as table:
+            iops = table["write_iops"]
+            self.assertIsInstance(iops, memoryview)
+            self.assertEqual("q", iops.format)
+            self.assertTrue(iops.readonly)
+            self.assertEqual([46430, 827, 0, 0, 14951, 245, 24143, 508],
+                             iops.tolist())
+            self.assertEqual(["write", "read", "rw"],
+                             table.dictionary("io_rw"))
+            self.assertEqual([0, 0, 1, 1, 2, 2, 2, 2],
+                             table.codes("io_rw").tolist())
+            self.assertEqual(["", "", "", "", "70", "70", "50", "50"],
+                             table["io_rwmixread"])
+            self.assertEqual(_FILES, table["logfile"])
+
+    def test_invalid_file(self):
+        """Test loading a file that is not a columnar file
+        """
+        path = os.path.join(os.getcwd(), "data", "sumary-results.csv")
+        self.assertRaises(ValueError, lambda: columnar.load(path))
+
+    def test_formatting_is_csv_only(self):
+        """Test that formatting options are refused for columnar output
+        """
+        self.assertRaises(
+            ValueError,
+            lambda: convert.convert(paths=self.paths,
+                                    output_filename="failure.fcol",
+                                    human_readable=True,
+                                    output_format="columnar")
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
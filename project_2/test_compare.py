@@ -0,0 +1,110 @@
+import os
+import unittest
+
+import compare
+import convert
+
+_FILES = ["write-8k.json",
+          "write-1M.json",
+          "read-8k.json",
+          "read-1M.json",
+          "rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "rw50-1M.json"]
+
+
+def _data(file: str) -> str:
+    """Returns the path of a file in the data directory
+    """
+    return os.path.join(os.getcwd(), "data", file)
+
+
+class TestCompare(unittest.TestCase):
+    """Unit tests for compare.py
+    """
+    def setUp(self):
+        self.output = os.path.join(os.getcwd(), "compare.csv")
+
+    def tearDown(self):
+        for path in (self.output, _data("slower.csv")):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _rows(self) -> list[dict]:
+        """Returns the rows of the comparison keyed by column
+        """
+        with open(self.output) as f:
+            lines = f.read().split("\n")
+        header = lines[0].split(",")
+        return [dict(zip(header, line.split(","))) for line in lines[1:]]
+
+    def test_same_runs(self):
+        """Test that .json runs and their summary .csv compare as equal
+        """
+        arguments = ["compare", "--baseline",
+                     *[_data(file) for file in _FILES],
+                     "--candidate", _data("sumary-results.csv"),
+                     "--output_filename", self.output]
+        convert.main(args=arguments)
+        rows = self._rows()
+        self.assertEqual(8, len(rows))
+        for row in rows:
+            self.assertEqual("", row["regressions"])
+            self.assertEqual("0", row["write_iops_delta"])
+        row = next(row for row in rows if row["io_bs"] == "8k"
+                   and row["io_rw"] == "write")
+        self.assertEqual("1.0000", row["write_iops_ratio"])
+        self.assertEqual("", row["read_iops_ratio"])
+
+    def test_regressions(self):
+        """Test that slower runs beyond the threshold are flagged
+        """
+        with open(_data("sumary-results.csv")) as f:
+            lines = f.read().split("\n")
+
+        # write-8k.json: write_iops 46430 -> 40000, clat 13776938 -> 14000000
+        lines[1] = lines[1].replace(",46430,380370287,13776938,",
+                                    ",40000,380370287,14000000,")
+        with open(_data("slower.csv"), "w") as f:
+            f.write("\n".join(lines))
+
+        compare.compare(baseline=[_data("sumary-results.csv")],
+                        candidate=[_data("slower.csv")],
+                        output_filename=self.output,
+                        threshold=0.05)
+        regressions = {(row["io_bs"], row["io_rw"]): row["regressions"]
+                       for row in self._rows()}
+        self.assertEqual("write_iops", regressions[("8k", "write")])
+        self.assertEqual("", regressions[("1M", "write")])
+
+        compare.compare(baseline=[_data("sumary-results.csv")],
+                        candidate=[_data("slower.csv")],
+                        output_filename=self.output,
+                        threshold=0.01)
+        regressions = {(row["io_bs"], row["io_rw"]): row["regressions"]
+                       for row in self._rows()}
+        self.assertEqual("write_iops;write_clat_ns_mean",
+                         regressions[("8k", "write")])
+
+    def test_runs_are_averaged(self):
+        """Test that runs of the same group on one side are averaged
+        """
+        groups = compare.load([_data("write-8k.json"),
+                               _data("sumary-results.csv")])
+        self.assertEqual(2, groups[("8k", "write", "")][0])
+        self.assertEqual(2 * 46430, groups[("8k", "write", "")][4])
+
+    def test_invalid_csv(self):
+        """Test for correct error handling when passed an unrelated .csv
+        """
+        with open(_data("slower.csv"), "w") as f:
+            f.write("a,b\n1,2")
+        self.assertRaises(
+            ValueError,
+            lambda: compare.load([_data("slower.csv")])
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
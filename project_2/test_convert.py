@@ -1,5 +1,12 @@
+import contextlib
+import io
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
+from unittest import mock
 
 import convert
 
@@ -33,6 +40,17 @@ class TestConvert(unittest.TestCase):
             lambda: convert.convert(paths=[path], output_filename="failure.csv")
         )
 
+    def test_rows_are_lazy(self):
+        """Test that no .JSON file is parsed before its row is requested
+        """
+        cwd = os.getcwd()
+        paths = [os.path.join(cwd, "data", "write-8k.json"),
+                 os.path.join(cwd, "data", "not-a-valid-path")]
+        fields = convert._iter_fields(paths)
+        self.assertEqual(_DATA[0].split("\n")[1],
+                         convert._format_row(next(fields), "write-8k.json"))
+        self.assertRaises(FileNotFoundError, lambda: next(fields))
+
     def test_commandline_single_convert(self):
         """Test for successful run when passed a valid path from commandline
         """
@@ -181,6 +199,235 @@ class TestConvert(unittest.TestCase):
 
         self.assertEqual(correct_data, results_data)
 
+    def test_commandline_multiple_convert_parallel(self):
+        """Test that a process pool keeps rows in the order of the input files
+        """
+        cwd = os.getcwd()
+        files = ["write-8k.json",
+                 "write-1M.json",
+                 "read-8k.json",
+                 "read-1M.json",
+                 "rw70-8k.json",
+                 "rw70-1M.json",
+                 "rw50-8k.json",
+                 "rw50-1M.json"]
+
+        # Form arguments list
+        paths = []
+        for file in files:
+            paths.append(os.path.join(cwd, "data", file))
+        paths = " ".join(paths)
+        arguments = "--json_file {file_paths} " \
+                    "--output_filename results.csv " \
+                    "--jobs 3".format(file_paths=paths)
+
+        # Call convert with arguments
+        results_path = convert.main(
+            args=arguments.split()
+        )
+
+        # Get test results from convert
+        with open(results_path, "r") as f:
+            results_data = f.read()
+        os.remove(results_path)
+
+        # Get correct data from sumary-results.csv
+        with open(os.path.join(cwd, "data", "sumary-results.csv"), "r") as f:
+            correct_data = f.read()
+
+        self.assertEqual(correct_data, results_data)
+
+    def test_invalid_workers(self):
+        """Test for correct error handling when passed too few workers
+        """
+        path = os.path.join(os.getcwd(), "data", "write-8k.json")
+        self.assertRaises(
+            ValueError,
+            lambda: convert.convert(paths=[path],
+                                    output_filename="failure.csv",
+                                    workers=0)
+        )
+
+    def test_job_rows(self):
+        """Test a row per job and per groupid with a trailing job column
+        """
+        cwd = os.getcwd()
+        path = os.path.join(cwd, "data", "write-8k.json")
+        for job_rows in ("job", "group"):
+            results_path = convert.convert(
+                paths=[path],
+                output_filename=os.path.join(cwd, "results.csv"),
+                job_rows=job_rows
+            )
+            with open(results_path, "r") as f:
+                data = f.read()
+            os.remove(results_path)
+            self.assertEqual(_DATA[0].replace("\n", ",job\n") + ",0", data)
+
+    def test_invalid_job_rows(self):
+        """Test for correct error handling of job rows with columnar output
+        """
+        path = os.path.join(os.getcwd(), "data", "write-8k.json")
+        self.assertRaises(
+            ValueError,
+            lambda: convert.convert(paths=[path],
+                                    output_filename="failure.col",
+                                    output_format="columnar",
+                                    job_rows="job")
+        )
+
+    def test_commandline_invalid_options(self):
+        """Test that options that cannot be combined are usage errors
+        """
+        cwd = os.getcwd()
+        path = os.path.join(cwd, "data", "write-8k.json")
+        data = os.path.join(cwd, "data")
+        for arguments in (["--json_file", path, "--jobs", "0"],
+                          ["--json_file", path, "--output_format", "columnar",
+                           "-h"],
+                          ["--json_file", path, "--output_format", "columnar",
+                           "--job_rows", "job"],
+                          ["--json_file", path, "--manifest", "manifest.json",
+                           "--job_rows", "group"],
+                          ["--watch", data, "--manifest", "manifest.json"],
+                          ["--watch", data, "--json_file", path],
+                          ["--root", data, "--json_file", path],
+                          ["--json_file", path, "--percentiles", "run",
+                           "--job_rows", "job"],
+                          ["--json_file", "results.tar", "--manifest",
+                           "manifest.json"]):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    convert.main(args=[*arguments, "--output_filename",
+                                       "failure.csv"])
+            self.assertIn("usage:", stderr.getvalue())
+
+    def test_commandline_subcommand_names(self):
+        """Test that a subcommand is only recognized as the first argument
+        """
+        path = os.path.join(os.getcwd(), "data", "write-8k.json")
+        for arguments in (["--output_filename", "results.csv", "compare",
+                           "--baseline", path],
+                          ["--json_file", path, "--output_filename", "rollup",
+                           "rollup", "--database", "rollup.db"]):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    convert.main(args=arguments)
+            self.assertIn("must come before", stderr.getvalue())
+
+        # A --json_file or --output_filename may still be named like one
+        directory = tempfile.mkdtemp()
+        try:
+            named = os.path.join(directory, "rollup")
+            shutil.copyfile(path, named)
+            output = convert.main(args=["--json_file", named,
+                                        "--output_filename",
+                                        os.path.join(directory, "compare")])
+            with open(output) as f:
+                self.assertTrue(f.read().endswith(",rollup"))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_commandline_convert_found(self):
+        """Test converting the files found under a root as they are found
+        """
+        cwd = os.getcwd()
+        with open(os.path.join(cwd, "data", "sumary-results.csv")) as f:
+            header, *rows = f.read().split("\n")
+        expected = sorted(row for row in rows if row.endswith("-8k.json"))
+        for jobs in ("1", "2"):
+            results_path = convert.main(
+                args=["--root", os.path.join(cwd, "data"),
+                      "--name", r".*-8k\.json$",
+                      "--output_filename", "results.csv",
+                      "--jobs", jobs]
+            )
+            with open(results_path, "r") as f:
+                results_header, *results_rows = f.read().split("\n")
+            os.remove(results_path)
+            self.assertEqual(header, results_header)
+            self.assertEqual(expected, sorted(results_rows))
+
+    def test_convert_found_skips_foreign_files(self):
+        """Test that a .json file other than a fio result under the root is
+        reported and skipped
+        """
+        cwd = os.getcwd()
+        directory = tempfile.mkdtemp()
+        try:
+            shutil.copyfile(os.path.join(cwd, "data", "write-8k.json"),
+                            os.path.join(directory, "write-8k.json"))
+            foreign = os.path.join(directory, "manifest.json")
+            with open(foreign, "w") as f:
+                f.write('{"version": 1, "entries": {}}')
+            for workers in (1, 2):
+                with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                    results_path = convert.convert_found(
+                        root=directory, name=r".*\.json$",
+                        output_filename=os.path.join(directory, "results.csv"),
+                        workers=workers)
+                with open(results_path, "r") as f:
+                    self.assertEqual(_DATA[0], f.read())
+                # Worker processes report on their own stderr
+                if workers == 1:
+                    self.assertIn(foreign, stderr.getvalue())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_small_lists_skip_the_pool(self):
+        """Test that too few bytes for a process pool are parsed serially
+        """
+        paths = [os.path.join(os.getcwd(), "data", "write-8k.json")] * 4
+        expected = list(convert._iter_fields(paths, workers=1,
+                                             job_rows="first"))
+        with mock.patch("concurrent.futures.ProcessPoolExecutor",
+                        side_effect=AssertionError("pool started")):
+            self.assertEqual(expected,
+                             list(convert._iter_fields(paths, workers=4,
+                                                       job_rows="first")))
+        with mock.patch.object(convert, "_PARALLEL_MIN_BYTES", 0):
+            self.assertEqual(expected,
+                             list(convert._iter_fields(paths, workers=4,
+                                                       job_rows="first")))
+
+    def test_stats(self):
+        """Test that stats record every file and row, also from workers
+        """
+        cwd = os.getcwd()
+        paths = [os.path.join(cwd, "data", file)
+                 for file in ("write-8k.json", "read-1M.json", "rw50-8k.json")]
+        for workers in (1, 2):
+            run_stats = convert._stats().Stats()
+            with mock.patch.object(convert, "_PARALLEL_MIN_BYTES", 0):
+                results_path = convert.convert(
+                    paths=paths,
+                    output_filename=os.path.join(cwd, "results.csv"),
+                    time_format="%Y-%m-%d %H:%M:%S",
+                    workers=workers,
+                    stats=run_stats
+                )
+            os.remove(results_path)
+            self.assertEqual(3, run_stats.counters["files parsed"])
+            self.assertEqual(3, run_stats.counters["rows written"])
+            self.assertEqual(sum(os.path.getsize(path) for path in paths),
+                             run_stats.counters["bytes read"])
+            self.assertLessEqual({"read", "extract", "format", "write"},
+                                 set(run_stats.timings))
+
+    def test_lazy_imports(self):
+        """Test that a plain import does not load the modules of optional flags
+        """
+        optional = ("argparse", "asyncio", "bz2", "concurrent.futures.process",
+                    "datetime", "gzip", "lzma", "numpy", "sqlite3", "tarfile",
+                    "threading", "zlib")
+        loaded = subprocess.run(
+            [sys.executable, "-c",
+             f"import sys, convert; print([name for name in {optional!r} "
+             f"if name in sys.modules])"],
+            cwd=os.path.dirname(os.path.abspath(convert.__file__)),
+            capture_output=True, text=True, check=True).stdout
+        self.assertEqual("[]", loaded.strip())
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import unittest
+
+import convert
+import database
+
+_FILES = ["write-8k.json",
+          "write-1M.json",
+          "read-8k.json",
+          "read-1M.json",
+          "rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "rw50-1M.json"]
+
+
+class TestDatabase(unittest.TestCase):
+    """Unit tests for database.py
+    """
+    def setUp(self):
+        self.path = os.path.join(os.getcwd(), "results.db")
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def _rows(self) -> list[str]:
+        """Returns the rows of the results table formatted like .csv rows
+        """
+        connection = sqlite3.connect(self.path)
+        try:
+            rows = connection.execute(
+                "SELECT * FROM results ORDER BY rowid").fetchall()
+        finally:
+            connection.close()
+        return [",".join(str(value) for value in row) for row in rows]
+
+    def test_matches_csv(self):
+        """Test that the table holds the same rows as the sample .csv
+        """
+        paths = [os.path.join(os.getcwd(), "data", file) for file in _FILES]
+        arguments = ["--json_file", *paths, "--sqlite", self.path]
+        convert.main(args=arguments)
+        with open(os.path.join(os.getcwd(), "data", "sumary-results.csv")) as f:
+            expected = f.read().split("\n")[1:]
+        self.assertEqual(expected, self._rows())
+
+    def test_duplicates_are_skipped(self):
+        """Test that a logfile already in the table is not inserted again
+        """
+        path = os.path.join(os.getcwd(), "data", "write-8k.json")
+        convert.convert(paths=[path], output_filename=self.path,
+                        output_format="sqlite")
+        with database.Writer(self.path, batch_size=1) as writer:
+            for fields in convert._iter_fields([path, path]):
+                writer.write(fields, "write-8k.json")
+            writer.write(fields, "copy.json")
+        self.assertEqual(1, writer.inserted)
+        self.assertEqual(2, len(self._rows()))
+
+    def test_indexes(self):
+        """Test that the table is indexed on io_bs, io_rw and test_datetime
+        """
+        database.Writer(self.path).close()
+        connection = sqlite3.connect(self.path)
+        try:
+            indexed = {row[0] for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            connection.close()
+        self.assertLessEqual({"results_io_bs", "results_io_rw",
+                              "results_test_datetime"}, indexed)
+
+
+if __name__ == '__main__':
+    unittest.main()
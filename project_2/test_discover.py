@@ -0,0 +1,40 @@
+import os
+import threading
+import unittest
+
+import discover
+
+
+class TestDiscover(unittest.TestCase):
+    """Unit tests for discover.py
+    """
+    def test_discover(self):
+        """Test that matching files are found and directories are not
+        """
+        root = os.path.join(os.getcwd(), "data")
+        found = sorted(os.path.basename(path) for path in
+                       discover.discover(root, r".*\.csv$", threads=2))
+        self.assertEqual(["sumary-results-utctime.csv", "sumary-results.csv"],
+                         found)
+
+    def test_early_stop(self):
+        """Test that the walk stops when the caller stops reading
+        """
+        before = threading.active_count()
+        found = discover.discover(os.getcwd(), "", queue_size=1)
+        next(found)
+        found.close()
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and thread.daemon:
+                thread.join(timeout=5)
+        self.assertEqual(before, threading.active_count())
+
+    def test_invalid_root(self):
+        """Test that an invalid root raises before anything is read
+        """
+        path = os.path.join(os.getcwd(), "data", "not-a-valid-path")
+        self.assertRaises(ValueError, lambda: discover.discover(path, ""))
+
+
+if __name__ == '__main__':
+    unittest.main()
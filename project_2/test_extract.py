@@ -0,0 +1,183 @@
+import json
+import mmap
+import os
+import unittest
+
+import columnar
+import database
+import extract
+
+_FILES = ["write-8k.json",
+          "write-1M.json",
+          "read-8k.json",
+          "read-1M.json",
+          "rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "rw50-1M.json"]
+
+
+def _load(file: str) -> bytes:
+    """Returns the raw contents of a sample file from the data directory
+    """
+    with open(os.path.join(os.getcwd(), "data", file), "rb") as f:
+        return f.read()
+
+
+class TestExtract(unittest.TestCase):
+    """Unit tests for extract.py
+    """
+    def test_scan_matches_full_parse(self):
+        """Test that scanning gives the same fields as a full json parse
+        """
+        for file in _FILES:
+            buf = _load(file)
+            self.assertEqual(extract.from_document(json.loads(buf)),
+                             extract.scan(buf))
+
+    def test_read(self):
+        """Test reading the fields of a sample file
+        """
+        path = os.path.join(os.getcwd(), "data", "write-8k.json")
+        self.assertEqual(
+            (1636757030, "8k", "write", "", 0, 0, 0, 46430, 380370287,
+             13776938, 0),
+            extract.read(path))
+
+    def test_scan_unusual_layout(self):
+        """Test that unusual documents are left to the full parse
+        """
+        buf = _load("rw70-8k.json")
+        document = json.loads(buf)
+
+        # Braces inside an option value
+        document["global options"]["directory"] = "/data/{run}"
+        unusual = json.dumps(document).encode()
+        self.assertIsNone(extract.scan(unusual))
+
+        # First job without an error key must not borrow a later job's
+        del document["global options"]["directory"]
+        second_job = dict(document["jobs"][0])
+        del document["jobs"][0]["error"]
+        document["jobs"].append(second_job)
+        self.assertIsNone(extract.scan(json.dumps(document).encode()))
+
+    def test_read_falls_back(self):
+        """Test that reading an unusual document still returns its fields
+        """
+        document = json.loads(_load("rw70-8k.json"))
+        document["global options"]["directory"] = "/data/{run}"
+        path = os.path.join(os.getcwd(), "unusual.json")
+        with open(path, "w") as f:
+            json.dump(document, f)
+        try:
+            self.assertEqual(extract.from_document(document),
+                             extract.read(path))
+        finally:
+            os.remove(path)
+
+    def test_jobs_from_document(self):
+        """Test one entry per job and per groupid of a multi-job document
+        """
+        document = json.loads(_load("rw70-8k.json"))
+        first = document["jobs"][0]
+        second = json.loads(json.dumps(first))
+        second["read"]["iops"] = first["read"]["iops"] * 3
+        second["read"]["clat_ns"]["mean"] = 1000.0
+        second["read"]["clat_ns"]["N"] = first["read"]["clat_ns"]["N"] * 3
+        third = json.loads(json.dumps(first))
+        third["groupid"] = 1
+        third["error"] = 5
+        document["jobs"] = [first, second, third]
+
+        jobs = extract.jobs_from_document(document, "job")
+        self.assertEqual([0, 1, 2], [job for job, _ in jobs])
+        self.assertEqual(extract.from_document(document), jobs[0][1])
+        self.assertEqual(5, jobs[2][1][10])
+
+        groups = dict(extract.jobs_from_document(document, "group"))
+        self.assertEqual([0, 1], list(groups))
+        self.assertEqual(int(first["read"]["iops"] * 4), groups[0][4])
+        self.assertEqual(int(first["read"]["bw_bytes"] * 2), groups[0][5])
+        self.assertEqual(
+            int((first["read"]["clat_ns"]["mean"] + 3 * 1000.0) / 4),
+            groups[0][6])
+        self.assertEqual(jobs[2][1], groups[1])
+
+    def test_jobs_invalid_mode(self):
+        """Test for correct error handling when passed an unknown mode
+        """
+        document = json.loads(_load("rw70-8k.json"))
+        self.assertRaises(
+            ValueError,
+            lambda: extract.jobs_from_document(document, "first"))
+
+    def _write_json_plus(self, bins: int) -> str:
+        """Writes rw70-8k.json with clat_ns bins and returns its path
+        """
+        document = json.loads(_load("rw70-8k.json"))
+        for direction in ("read", "write"):
+            document["jobs"][0][direction]["clat_ns"]["bins"] = {
+                str(1000 + i): i for i in range(bins)}
+        path = os.path.join(os.getcwd(), "json-plus.json")
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2, separators=(",", " : "))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_load_prunes_large_files(self):
+        """Test that large files lose their buckets but keep their fields
+        """
+        path = self._write_json_plus(100000)
+        self.assertGreater(os.path.getsize(path), extract._MMAP_THRESHOLD)
+        pruned = extract.load(path)
+        self.assertLess(len(pruned), len(_load("rw70-8k.json")))
+        document = json.loads(pruned)
+        self.assertEqual({}, document["jobs"][0]["read"]["clat_ns"]["bins"])
+        self.assertEqual({}, document["jobs"][0]["latency_us"])
+        self.assertEqual(extract.read(os.path.join(os.getcwd(), "data",
+                                                   "rw70-8k.json")),
+                         extract.read(path))
+
+    def test_prune_windows(self):
+        """Test that pruning in small windows gives the same document
+        """
+        path = self._write_json_plus(1000)
+        window = extract._WINDOW
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                expected = extract.prune(mapped)
+                extract._WINDOW = 7
+                try:
+                    self.assertEqual(expected, extract.prune(mapped))
+                finally:
+                    extract._WINDOW = window
+
+    def test_prune_keeps_nested_buckets(self):
+        """Test that a bucket holding an object is copied as it is
+        """
+        document = json.loads(_load("rw70-8k.json"))
+        document["jobs"][0]["latency_ms"] = {"2": {"nested": 1}}
+        path = os.path.join(os.getcwd(), "nested.json")
+        with open(path, "w") as f:
+            json.dump(document, f)
+        self.addCleanup(os.remove, path)
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                pruned = json.loads(extract.prune(mapped))
+        self.assertEqual({"2": {"nested": 1}}, pruned["jobs"][0]["latency_ms"])
+        self.assertEqual({}, pruned["jobs"][0]["latency_us"])
+
+
+    def test_fields_match_output_columns(self):
+        """Test that the field table names the columns of every output format
+        """
+        columns = (*extract.COLUMNS, "logfile")
+        self.assertEqual(",".join(columns), extract.HEADER)
+        self.assertEqual(columns, tuple(name for name, _ in columnar.COLUMNS))
+        self.assertEqual(columns, tuple(name for name, _ in database.COLUMNS))
+        self.assertEqual(len(extract.COLUMNS),
+                         len(extract.scan(_load("rw50-8k.json"))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import convert
+import extract
+import manifest
+from manifest import Manifest, read as read_hashed
+
+_FILES = ["write-8k.json",
+          "read-8k.json",
+          "rw70-1M.json"]
+
+
+class TestManifest(unittest.TestCase):
+    """Unit tests for manifest.py
+    """
+    def setUp(self):
+        """Copies sample files into a temporary results directory
+        """
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for file in _FILES:
+            path = os.path.join(self.directory, file)
+            shutil.copyfile(os.path.join(os.getcwd(), "data", file), path)
+            self.paths.append(path)
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+        self.parsed = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _parse(self, paths: list[str]):
+        """Records which paths were parsed before extracting them
+        """
+        self.parsed.extend(paths)
+        return (read_hashed(path) for path in paths)
+
+    def _run(self) -> list[tuple]:
+        """Runs a pass over all paths with a freshly loaded manifest
+        """
+        self.parsed = []
+        manifest = Manifest(self.manifest_path)
+        fields = list(manifest.iter_fields(self.paths, self._parse))
+        manifest.evict_missing()
+        manifest.save()
+        return fields
+
+    def test_only_new_files_are_parsed(self):
+        """Test that a re-run parses nothing and a new file is parsed alone
+        """
+        first = self._run()
+        self.assertEqual(self.paths, self.parsed)
+        self.assertEqual(first, self._run())
+        self.assertEqual([], self.parsed)
+
+        new_path = os.path.join(self.directory, "rw50-8k.json")
+        shutil.copyfile(os.path.join(os.getcwd(), "data", "rw50-8k.json"),
+                        new_path)
+        self.paths.append(new_path)
+        fields = self._run()
+        self.assertEqual([new_path], self.parsed)
+        self.assertEqual(extract.read(new_path), fields[-1])
+
+    def test_new_files_are_read_once(self):
+        """Test that new files are hashed from the bytes read to parse them
+        """
+        with mock.patch("manifest._hash_file",
+                        side_effect=AssertionError("read twice")):
+            self._run()
+        entries = Manifest(self.manifest_path).entries
+        for path in self.paths:
+            self.assertEqual(manifest._hash_file(path),
+                             entries[path]["sha256"])
+
+    def test_large_files_are_hashed_in_windows(self):
+        """Test that hashing a large json+ file keeps memory below its size
+        """
+        # Many jobs, each with clat_ns bins, like fio's json+ output
+        with open(self.paths[2]) as f:
+            document = json.load(f)
+        job = document["jobs"][0]
+        job["read"]["clat_ns"]["bins"] = {str(i): 1 for i in range(20000)}
+        document["jobs"] = []
+        jobs = ",".join([json.dumps(job, indent=2)] * 200)
+        path = os.path.join(self.directory, "bins.json")
+        with open(path, "w") as f:
+            f.write(json.dumps(document, indent=2).replace(
+                '"jobs": []', f'"jobs": [{jobs}]'))
+
+        # Peak RSS of a fresh process in kB. ru_maxrss would start from this
+        # process's peak, VmHWM starts over with the new program.
+        status = subprocess.run(
+            [sys.executable, "-c",
+             f"import manifest; manifest.read({path!r}); "
+             f"print(open('/proc/self/status').read())"],
+            cwd=os.path.dirname(os.path.abspath(manifest.__file__)),
+            capture_output=True, text=True, check=True).stdout
+        peak = next(line.split()[1] for line in status.split("\n")
+                    if line.startswith("VmHWM:"))
+        self.assertLess(int(peak) * 1024, os.path.getsize(path))
+        self.assertEqual(manifest._hash_file(path), read_hashed(path)[1])
+
+    def test_touched_file_is_not_parsed(self):
+        """Test that a changed mtime with the same content reuses the entry
+        """
+        self._run()
+        stat = os.stat(self.paths[0])
+        os.utime(self.paths[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self._run()
+        self.assertEqual([], self.parsed)
+
+    def test_changed_file_is_parsed(self):
+        """Test that a file with new content is parsed again
+        """
+        self._run()
+        shutil.copyfile(os.path.join(os.getcwd(), "data", "write-1M.json"),
+                        self.paths[0])
+        fields = self._run()
+        self.assertEqual([self.paths[0]], self.parsed)
+        self.assertEqual("1M", fields[0][1])
+
+    def test_deleted_file_is_evicted(self):
+        """Test that entries for deleted files are dropped
+        """
+        self._run()
+        os.remove(self.paths[0])
+        del self.paths[0]
+        self._run()
+        manifest = Manifest(self.manifest_path)
+        self.assertEqual(sorted(self.paths), sorted(manifest.entries))
+
+    def test_convert_with_manifest(self):
+        """Test that cached and rebuilt conversions match a plain conversion
+        """
+        output = os.path.join(self.directory, "results.csv")
+        outputs = []
+        for arguments in ([],
+                          ["--manifest", self.manifest_path],
+                          ["--manifest", self.manifest_path],
+                          ["--manifest", self.manifest_path, "--rebuild"]):
+            results_path = convert.main(
+                args=["--json_file", *self.paths, "--output_filename", output,
+                      *arguments])
+            with open(results_path, "r") as f:
+                outputs.append(f.read())
+        self.assertEqual([outputs[0]] * 4, outputs)
+        self.assertTrue(os.path.exists(self.manifest_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
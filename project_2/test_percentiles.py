@@ -0,0 +1,96 @@
+import os
+import unittest
+
+import convert
+import percentiles
+
+_FILES = ["write-8k.json",
+          "read-8k.json",
+          "rw70-8k.json",
+          "rw50-8k.json"]
+
+
+@unittest.skipIf(percentiles.np is None, "numpy is not installed")
+class TestPercentiles(unittest.TestCase):
+    """Unit tests for percentiles.py
+    """
+    def setUp(self):
+        cwd = os.getcwd()
+        self.paths = [os.path.join(cwd, "data", file) for file in _FILES]
+
+    def test_load(self):
+        """Test that tables land in a (runs x points) array per direction
+        """
+        runs = percentiles.load(self.paths)
+        self.assertEqual((4, 17), runs.values["read"].shape)
+        self.assertEqual([50.0, 99.0, 99.9],
+                         [p for p in runs.points.tolist()
+                          if p in (50.0, 99.0, 99.9)])
+        column = runs.points.tolist().index(50.0)
+        read_p50 = runs.values["read"][:, column].tolist()
+        self.assertTrue(percentiles.np.isnan(read_p50[0]))
+        self.assertEqual([11468800, 12648448, 13041664], read_p50[1:])
+        self.assertEqual(("8k", "write", ""), runs.keys[0])
+
+    def test_aggregate(self):
+        """Test group statistics across repeated and single runs
+        """
+        runs = percentiles.load(self.paths[1:3] + self.paths[2:3])
+        group_keys, run_counts, statistics = percentiles.aggregate(runs)
+        self.assertEqual([("8k", "read", ""), ("8k", "rw", "70")], group_keys)
+        self.assertEqual([1, 2], run_counts.tolist())
+        column = runs.points.tolist().index(99.0)
+        for statistic in ("mean", "min", "max"):
+            self.assertEqual(
+                [12779520, 14090240],
+                statistics[("read", statistic)][:, column].tolist())
+
+    def test_commandline_group(self):
+        """Test writing the wide group .csv through main()
+        """
+        results_path = convert.main(
+            args=["--json_file", *self.paths,
+                  "--output_filename", "percentiles.csv",
+                  "--percentiles", "group"])
+        with open(results_path, "r") as f:
+            lines = f.read().split("\n")
+        os.remove(results_path)
+        header = lines[0].split(",")
+        self.assertEqual(["io_bs", "io_rw", "io_rwmixread", "runs"],
+                         header[:4])
+        self.assertEqual(4 + 2 * 17 * 3, len(header))
+        rows = {tuple(line.split(",")[:3]): line.split(",")
+                for line in lines[1:]}
+        write_row = rows[("8k", "write", "")]
+        self.assertEqual(
+            "", write_row[header.index("read_clat_ns_p99.9_mean")])
+        self.assertEqual(
+            "20840448", write_row[header.index("write_clat_ns_p99.9_max")])
+
+    def test_commandline_run(self):
+        """Test writing the wide per-run .csv through main()
+        """
+        results_path = convert.main(
+            args=["--json_file", *self.paths,
+                  "--output_filename", "percentiles.csv",
+                  "--percentiles", "run"])
+        with open(results_path, "r") as f:
+            lines = f.read().split("\n")
+        os.remove(results_path)
+        header = lines[0].split(",")
+        self.assertEqual(5, len(lines))
+        row = lines[3].split(",")
+        self.assertEqual("rw70-8k.json", row[header.index("logfile")])
+        self.assertEqual("12648448", row[header.index("read_clat_ns_p50")])
+
+    def test_invalid_mode(self):
+        """Test for correct error handling when passed an unknown mode
+        """
+        self.assertRaises(
+            ValueError,
+            lambda: percentiles.convert(self.paths, "failure.csv", "median")
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import unittest
+
+import convert
+import rollup
+
+_FILES = ["write-8k.json",
+          "write-1M.json",
+          "read-8k.json",
+          "read-1M.json",
+          "rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "rw50-1M.json"]
+
+# Raw samples of runs of one configuration, as (timestamp, samples)
+_RUNS = [(1636329600, [10.0, 12.0, 14.0]),
+         (1636333200, [20.0, 21.0]),
+         (1636416000, [5.0, 9.0, 7.0, 11.0]),
+         (1636934400, [30.0, 40.0])]
+
+
+def _run(timestamp: int, samples: list[float]) -> tuple:
+    """Returns the run read_runs() would give for raw samples
+    """
+    mean = statistics.fmean(samples)
+    m2 = sum((sample - mean) ** 2 for sample in samples)
+    return (timestamp, "8k", "randrw", "read", "bw", len(samples), mean, m2,
+            min(samples), max(samples))
+
+
+class TestRollup(unittest.TestCase):
+    """Unit tests for rollup.py
+    """
+    def setUp(self):
+        self.path = os.path.join(os.getcwd(), "rollup.db")
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def _assert_bucket(self, bucket: tuple, runs: list[tuple]):
+        """Checks a bucket against statistics of all the samples of runs
+        """
+        samples = [sample for _, run in runs for sample in run]
+        start, count, total, mean, stddev, minimum, maximum = bucket
+        self.assertEqual(len(runs), count)
+        self.assertEqual(len(samples), total)
+        self.assertAlmostEqual(statistics.fmean(samples), mean)
+        self.assertAlmostEqual(statistics.stdev(samples), stddev)
+        self.assertEqual((min(samples), max(samples)), (minimum, maximum))
+
+    def test_bucket(self):
+        """Test that buckets start on the hour, day and Monday
+        """
+        timestamp = 1636760701
+        self.assertEqual(1636758000, rollup.bucket(timestamp, "hour"))
+        self.assertEqual(1636675200, rollup.bucket(timestamp, "day"))
+        self.assertEqual(1636329600, rollup.bucket(timestamp, "week"))
+        self.assertRaises(ValueError, lambda: rollup.bucket(timestamp, "year"))
+
+    def test_incremental_merge(self):
+        """Test that runs added one at a time, across reopens, merge to the
+        statistics of all their samples
+        """
+        for i, (timestamp, samples) in enumerate(_RUNS):
+            with rollup.Store(self.path) as store:
+                store.add([_run(timestamp, samples)], f"run-{i}.json")
+
+        with rollup.Store(self.path) as store:
+            weeks = store.trend("8k", "randrw", "week")
+            days = store.trend("8k", "randrw", "day")
+            hours = store.trend("8k", "randrw", "hour", since=1636333200,
+                                until=1636416000)
+            self.assertEqual([], store.trend("8k", "randrw", "week",
+                                             direction="write"))
+        self.assertEqual([1636329600, 1636934400],
+                         [week[0] for week in weeks])
+        self._assert_bucket(weeks[0], _RUNS[:3])
+        self._assert_bucket(weeks[1], _RUNS[3:])
+        self.assertEqual(3, len(days))
+        self._assert_bucket(days[0], _RUNS[:2])
+        self.assertEqual([1636333200], [hour[0] for hour in hours])
+
+    def test_files_added_once(self):
+        """Test that a file already in the rollup is not counted again
+        """
+        paths = [os.path.join(os.getcwd(), "data", file) for file in _FILES]
+        with rollup.Store(self.path) as store:
+            self.assertEqual(len(_FILES), rollup.add(store, paths))
+        with rollup.Store(self.path) as store:
+            self.assertEqual(0, rollup.add(store, paths))
+            weeks = store.trend("8k", "rw", "week")
+        self.assertEqual(1, len(weeks))
+        self.assertEqual(2, weeks[0][1])
+
+    def test_same_names_in_different_directories(self):
+        """Test that files of the same name in different run directories are
+        each added
+        """
+        directory = tempfile.mkdtemp()
+        try:
+            paths = []
+            for run in ("run-1", "run-2"):
+                os.mkdir(os.path.join(directory, run))
+                paths.append(os.path.join(directory, run, "rw50-8k.json"))
+                shutil.copyfile(os.path.join(os.getcwd(), "data",
+                                             "rw50-8k.json"), paths[-1])
+            with rollup.Store(self.path) as store:
+                self.assertEqual(2, rollup.add(store, paths))
+                self.assertEqual(0, rollup.add(store, paths))
+                weeks = store.trend("8k", "rw", "week")
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(2, weeks[0][1])
+
+    def test_read_runs(self):
+        """Test that only directions with samples are read
+        """
+        path = os.path.join(os.getcwd(), "data", "write-8k.json")
+        runs = rollup.read_runs(path)
+        self.assertEqual({("write", "bw"), ("write", "iops")},
+                         {(run[3], run[4]) for run in runs})
+        self.assertRaises(
+            ValueError,
+            lambda: rollup.read_runs(os.path.join(os.getcwd(), "data",
+                                                  "sumary-results.csv")))
+
+    def test_commandline_trend(self):
+        """Test adding files and querying a trend through convert.py
+        """
+        data = os.path.join(os.getcwd(), "data")
+        convert.main(args=["rollup", "--database", self.path,
+                           "--root", data])
+        rows = convert.main(args=["rollup", "--database", self.path,
+                                  "--trend", "--io_bs", "8k", "--io_rw", "rw",
+                                  "--period", "day", "--metric", "iops"])
+        self.assertEqual(1, len(rows))
+        self.assertEqual(2, rows[0][1])
+
+    def test_commandline_invalid_options(self):
+        """Test that rollup options that cannot be combined are usage errors
+        """
+        data = os.path.join(os.getcwd(), "data")
+        for arguments in (["rollup", "--database", self.path, "--watch", data,
+                           "--jobs", "0"],
+                          ["rollup", "--database", self.path, "--watch", data,
+                           "--trend", "--io_bs", "8k", "--io_rw", "rw"],
+                          ["rollup", "--database", self.path, "--io_bs", "8k"],
+                          ["--output_filename", "failure.csv", "rollup",
+                           "--database", self.path]):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit):
+                    convert.main(args=arguments)
+            self.assertIn("usage:", stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+import random
+import unittest
+
+import timefmt
+
+_FORMATS = ["%d/%m/%y %H:%M:%S",
+            "%Y-%m-%dT%H:%M:%S",
+            "%a %b %d %I:%M:%S %Y",
+            "%j %U %W %w %u %G-%V %C%g %e %D %F %h",
+            "%H%%%M 100%% %S",
+            "%x %H",
+            "%I:%M %p",
+            "%H:%M:%S.%f %z%Z",
+            "no directives",
+            "trailing %"]
+
+
+def _strftime(timestamp: int, time_format: str) -> str:
+    """Formats like datetime.utcfromtimestamp(timestamp).strftime()
+    """
+    return (datetime(1970, 1, 1) + timedelta(seconds=timestamp)).strftime(
+        time_format)
+
+
+class TestTimefmt(unittest.TestCase):
+    """Unit tests for timefmt.py
+    """
+    def test_matches_strftime(self):
+        """Test that every format gives the same strings as strftime
+        """
+        rng = random.Random(0)
+        timestamps = [0, 1636757030, 1636757030, 86399, 86400, 43200, -1,
+                      951782400, 4102444799]
+        timestamps += [rng.randrange(0, 4102444800) for _ in range(500)]
+        for time_format in _FORMATS:
+            formatter = timefmt.Formatter(time_format)
+            for timestamp in timestamps:
+                self.assertEqual(_strftime(timestamp, time_format),
+                                 formatter(timestamp))
+
+    def test_fractional_timestamp(self):
+        """Test that timestamps with a fraction of a second use strftime
+        """
+        formatter = timefmt.Formatter("%H:%M:%S.%f")
+        self.assertEqual("00:00:01.500000", formatter(1.5))
+
+    def test_shared_formatter(self):
+        """Test that one Formatter is kept per pattern
+        """
+        self.assertIs(timefmt.formatter("%H"), timefmt.formatter("%H"))
+
+
+if __name__ == '__main__':
+    unittest.main()
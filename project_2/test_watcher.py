@@ -0,0 +1,155 @@
+import asyncio
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import convert
+import extract
+import rollup
+import watcher
+
+
+def _sample(file: str) -> str:
+    """Returns the path of a sample file from the data directory
+    """
+    return os.path.join(os.getcwd(), "data", file)
+
+
+class TestWatcher(unittest.TestCase):
+    """Unit tests for watcher.py
+    """
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _watch(self, scenario, **options):
+        """Runs scenario(rows) while watching the temporary directory
+
+        Returns:
+            A list of (file name, fields) pairs in the order they were written.
+        """
+        rows = []
+
+        async def run():
+            stop = asyncio.Event()
+            task = asyncio.create_task(watcher.watch(
+                self.directory, lambda fields, name: rows.append((name, fields)),
+                interval=0.02, settle=0.2, stop=stop, **options))
+            try:
+                await scenario(rows)
+            finally:
+                stop.set()
+                await task
+
+        asyncio.run(run())
+        return rows
+
+    async def _wait_for(self, rows, count, timeout=5.0):
+        """Waits until at least count rows have been written
+        """
+        deadline = time.monotonic() + timeout
+        while len(rows) < count and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+
+    def test_new_files(self):
+        """Test that files are parsed as they land, except skipped ones
+        """
+        shutil.copyfile(_sample("read-8k.json"),
+                        os.path.join(self.directory, "old.json"))
+
+        async def scenario(rows):
+            await asyncio.sleep(0.1)
+            shutil.copyfile(_sample("write-8k.json"),
+                            os.path.join(self.directory, "new.json"))
+            await self._wait_for(rows, 1)
+            await asyncio.sleep(0.3)
+
+        rows = self._watch(scenario, skip={"old.json"})
+        self.assertEqual([("new.json", extract.read(_sample("write-8k.json")))],
+                         rows)
+
+    def test_read(self):
+        """Test that files are parsed with the given read function
+        """
+        async def scenario(rows):
+            shutil.copyfile(_sample("rw50-8k.json"),
+                            os.path.join(self.directory, "new.json"))
+            await self._wait_for(rows, 1)
+
+        rows = self._watch(scenario, read=rollup.read_runs)
+        runs = rollup.read_runs(_sample("rw50-8k.json"))
+        self.assertEqual([("new.json", runs)], rows)
+
+    def test_debounce(self):
+        """Test that a file still being written is parsed once it settles
+        """
+        with open(_sample("rw70-8k.json"), "rb") as f:
+            data = f.read()
+        path = os.path.join(self.directory, "rw70-8k.json")
+
+        async def scenario(rows):
+            with open(path, "wb") as f:
+                for start in range(0, len(data), len(data) // 4 + 1):
+                    f.write(data[start:start + len(data) // 4 + 1])
+                    f.flush()
+                    await asyncio.sleep(0.1)
+            await self._wait_for(rows, 1)
+
+        rows = self._watch(scenario)
+        self.assertEqual([("rw70-8k.json", extract.read(path))], rows)
+
+    def test_malformed_file(self):
+        """Test that a file that cannot be parsed is logged and skipped
+        """
+        async def scenario(rows):
+            with open(os.path.join(self.directory, "empty.json"), "w") as f:
+                f.write('{"jobs": []}')
+            await asyncio.sleep(0.3)
+            shutil.copyfile(_sample("write-8k.json"),
+                            os.path.join(self.directory, "new.json"))
+            await self._wait_for(rows, 1)
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            rows = self._watch(scenario)
+        self.assertEqual([("new.json", extract.read(_sample("write-8k.json")))],
+                         rows)
+        self.assertIn(os.path.join(self.directory, "empty.json"),
+                      stderr.getvalue())
+
+    def test_invalid_directory(self):
+        """Test for correct error handling when passed an invalid directory
+        """
+        path = os.path.join(self.directory, "not-a-valid-path")
+        self.assertRaises(
+            ValueError,
+            lambda: asyncio.run(watcher.watch(path, print))
+        )
+
+    def test_resume(self):
+        """Test that rows of a previous watch are kept and not converted again
+        """
+        cwd = os.getcwd()
+        path = convert.convert(paths=[_sample("write-8k.json")],
+                               output_filename=os.path.join(cwd,
+                                                            "results.csv"))
+        try:
+            self.assertEqual({"write-8k.json"}, convert._logfiles(path))
+            with convert._CsvWriter(path, append=True) as writer:
+                writer.write(extract.read(_sample("read-8k.json")),
+                             "read-8k.json")
+            with open(path) as f:
+                lines = f.read().split("\n")
+        finally:
+            os.remove(path)
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[2].endswith(",read-8k.json"))
+
+
+if __name__ == '__main__':
+    unittest.main()
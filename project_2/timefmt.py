@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+import re
+
+_EPOCH = datetime(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+
+# Directives whose output only depends on the date, rendered once per day
+_DATE_DIRECTIVES = set("aAbBCdDeFgGhjmuUVwWxyY")
+
+# Directives of the time of day, as the position of the hour, minute or second
+# they show and a table of their text for each value
+_TIME_DIRECTIVES = {
+    "H": (0, [f"{hour:02d}" for hour in range(24)]),
+    "I": (0, [f"{(hour + 11) % 12 + 1:02d}" for hour in range(24)]),
+    "M": (1, [f"{minute:02d}" for minute in range(60)]),
+    "S": (2, [f"{second:02d}" for second in range(60)])}
+
+_TOKEN = re.compile(r"%.|%$|[^%]+", re.DOTALL)
+
+# Formatted timestamps kept per Formatter before the cache starts over
+_CACHE_SIZE = 65536
+
+
+class Formatter:
+    """Formats UTC timestamps with a strftime pattern, caching by second.
+
+    Gives the same strings as datetime.utcfromtimestamp(t).strftime(pattern).
+    The pattern is split once into literal text, date directives and time of
+    day directives. For each day the literal text and date directives are
+    rendered once with strftime into a template, and only %H, %I, %M and %S
+    are filled in per second from tables of zero-padded numbers. Patterns with
+    any other directive, such as %p, %f or %z, use strftime for every new
+    second instead.
+    """
+    def __init__(self, time_format: str):
+        self.time_format = time_format
+        self._values = {}
+        self._days = {}
+        self._tokens = []
+        for token in _TOKEN.findall(time_format):
+            if not token.startswith("%") or token == "%%":
+                kind = "literal"
+            elif token[1:] in _DATE_DIRECTIVES:
+                kind = "date"
+            elif token[1:] in _TIME_DIRECTIVES:
+                kind = "time"
+            else:
+                self._tokens = None
+                break
+            self._tokens.append((kind, token))
+
+    def __call__(self, timestamp) -> str:
+        """Returns timestamp, in seconds since the epoch, formatted.
+        """
+        value = self._values.get(timestamp)
+        if value is None:
+            if len(self._values) >= _CACHE_SIZE:
+                self._values.clear()
+            value = self._values[timestamp] = self._format(timestamp)
+        return value
+
+    def _format(self, timestamp) -> str:
+        """Formats a timestamp that is not in the cache.
+        """
+        if self._tokens is None or timestamp != int(timestamp):
+            return (_EPOCH + timedelta(seconds=timestamp)).strftime(
+                self.time_format)
+        day, second = divmod(int(timestamp), _SECONDS_PER_DAY)
+        template = self._days.get(day)
+        if template is None:
+            template = self._days[day] = self._template(day)
+        hour, second = divmod(second, 3600)
+        clock = (hour, *divmod(second, 60))
+        return "".join([part if table is None else table[clock[part]]
+                        for part, table in template])
+
+    def _template(self, day: int) -> list[tuple]:
+        """Renders the literal text and date directives of one day.
+
+        Returns:
+            A list of (text, None) and (clock position, table) pairs, with
+            neighbouring text joined into one string.
+        """
+        date = _EPOCH + timedelta(days=day)
+        template = []
+        for kind, token in self._tokens:
+            if kind == "time":
+                template.append(_TIME_DIRECTIVES[token[1]])
+                continue
+            text = date.strftime(token)
+            if template and template[-1][1] is None:
+                template[-1] = (template[-1][0] + text, None)
+            else:
+                template.append((text, None))
+        return template
+
+
+@lru_cache(maxsize=16)
+def formatter(time_format: str) -> Formatter:
+    """Returns the shared Formatter of a pattern, so every row reuses it.
+    """
+    return Formatter(time_format)
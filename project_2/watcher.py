@@ -0,0 +1,151 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import time
+
+import extract
+
+# Seconds between polls of the watched directory
+_INTERVAL = 0.1
+
+# Seconds a file's size and mtime must stay the same before it is parsed
+_SETTLE = 0.5
+
+# Settled files waiting for a worker before polling pauses
+_QUEUE_SIZE = 64
+
+
+async def watch(directory: str,
+                write,
+                workers: int = 1,
+                interval: float = _INTERVAL,
+                settle: float = _SETTLE,
+                queue_size: int = _QUEUE_SIZE,
+                skip=(),
+                stop: asyncio.Event = None,
+                read=extract.read):
+    """Parses .JSON files as they are written to directory until stop is set.
+
+    The directory is only listed again when its mtime changes, so an idle
+    directory costs one stat per poll however many files it holds. New files
+    are then stat'ed on every poll until their size and mtime have not changed
+    for settle seconds, which debounces files fio is still writing. Files that
+    were last modified more than settle seconds ago, e.g. moved in once
+    complete, are parsed right away.
+
+    Settled files are parsed in a process pool through a bounded queue. When
+    the workers fall behind, polling waits for room in the queue instead of
+    holding more and more files in memory.
+
+    Args:
+        directory: A path to an existing directory.
+        write: A callable taking the value returned by read and the file
+            name. It is called in the event loop once per parsed file.
+        workers: The number of processes used to parse the .JSON files.
+        interval: Seconds between polls of the directory.
+        settle: Seconds a file must stay unchanged before it is parsed.
+        queue_size: The number of settled files that may wait for a worker.
+        skip: File names that are already converted and must not be parsed.
+        stop: Optional, an asyncio.Event that ends the watch when set.
+            Without it the watch runs until it is cancelled.
+        read: A module level function parsing the file at a path in a worker
+            process, extract.read() by default.
+
+    Raises:
+        ValueError: Not a valid directory
+        ValueError: Not a valid number of workers
+    """
+    if not os.path.isdir(directory):
+        raise ValueError(f"Not a valid directory: {directory}")
+    if workers < 1:
+        raise ValueError(f"Not a valid number of workers: {workers}")
+    if stop is None:
+        stop = asyncio.Event()
+
+    files = asyncio.Queue(maxsize=queue_size)
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        async def parse():
+            while True:
+                path = await files.get()
+                # Any file fio or a user drops in may be malformed, one bad
+                # file must not end the watch
+                try:
+                    fields = await loop.run_in_executor(executor, read, path)
+                except Exception as error:
+                    print(f"Skipped: {path} ({error!r})", file=sys.stderr)
+                else:
+                    write(fields, os.path.basename(path))
+
+        stopped = asyncio.create_task(stop.wait())
+        tasks = [asyncio.create_task(
+                     _poll(directory, files, interval, settle, set(skip)))]
+        tasks += [asyncio.create_task(parse()) for _ in range(workers)]
+        try:
+            done, _ = await asyncio.wait([stopped, *tasks],
+                                         return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in [stopped, *tasks]:
+                task.cancel()
+            await asyncio.gather(stopped, *tasks, return_exceptions=True)
+
+        # A poller or parser only finishes early by raising
+        for task in done:
+            if task is not stopped:
+                task.result()
+
+
+async def _poll(directory: str,
+                files: asyncio.Queue,
+                interval: float,
+                settle: float,
+                done: set):
+    """Puts the paths of new .JSON files on files once they stop changing.
+    """
+    # Unsettled files as name -> (size, mtime, monotonic time of last change)
+    pending = {}
+    listed_mtime = None
+    listed_at = 0
+    while True:
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        # Also list again while the directory changed within a second of the
+        # last listing, an entry added in the same mtime tick would be missed
+        if mtime is not None and (mtime != listed_mtime
+                                  or mtime >= listed_at - 1_000_000_000):
+            listed_mtime = mtime
+            listed_at = time.time_ns()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if (entry.name.endswith(".json")
+                            and entry.name not in done
+                            and entry.name not in pending
+                            and entry.is_file()):
+                        pending[entry.name] = (None, None, 0)
+
+        now = time.monotonic()
+        for name, (size, modified, changed) in list(pending.items()):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del pending[name]
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, modified):
+                if time.time_ns() - stat.st_mtime_ns < settle * 1e9:
+                    pending[name] = (stat.st_size, stat.st_mtime_ns, now)
+                    continue
+            elif now - changed < settle:
+                continue
+            if stat.st_size == 0:
+                continue
+            del pending[name]
+            done.add(name)
+
+            # Waits while the parsers are behind
+            await files.put(path)
+        await asyncio.sleep(interval)
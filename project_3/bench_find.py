@@ -0,0 +1,288 @@
+"""Compares find() against the previous os.walk and re.match traversal.
+
+Builds a synthetic tree in a temporary directory, 'depth' levels deep with
+'width' subdirectories and 'files' files per directory, then times both
+traversals over it. With --latency every directory listing is delayed to
+simulate a high-latency filesystem such as NFS, and find() is also timed with
+each --threads value. With --patterns, find_all() is timed with one pattern
+and with that many literal prefix and extension patterns. With --predicates,
+the directory listings and stat calls of min_size, newer and maxdepth filters
+are counted, applied during the walk and after it.
+
+Example:
+    python bench_find.py --depth 4 --width 6 --files 20
+    python bench_find.py --depth 3 --width 6 --latency 2 --threads 1 4 16
+    python bench_find.py --patterns 20
+    python bench_find.py --predicates --maxdepth 2
+"""
+import argparse
+from contextlib import contextmanager
+import os
+import re
+import tempfile
+import time
+from unittest import mock
+
+import find
+
+
+def build_tree(root: str, depth: int, width: int, files: int) -> int:
+    """Creates a tree of directories and empty files under root.
+
+    Returns:
+        The number of entries created.
+    """
+    count = 0
+    for i in range(files):
+        extension = ".json" if i % 2 else ".log"
+        open(os.path.join(root, f"rw{i % 100}-{i}{extension}"), "w").close()
+        count += 1
+    if depth > 0:
+        for i in range(width):
+            path = os.path.join(root, f"dir_{i}")
+            os.mkdir(path)
+            count += 1 + build_tree(path, depth - 1, width, files)
+    return count
+
+
+@contextmanager
+def simulated_latency(seconds: float):
+    """Delays every os.scandir and os.stat call by seconds while active.
+    """
+    scandir = os.scandir
+    stat = os.stat
+
+    def slow_scandir(*args, **kwargs):
+        time.sleep(seconds)
+        return scandir(*args, **kwargs)
+
+    def slow_stat(*args, **kwargs):
+        time.sleep(seconds)
+        return stat(*args, **kwargs)
+
+    with mock.patch.object(os, "scandir", slow_scandir), \
+            mock.patch.object(os, "stat", slow_stat):
+        yield
+
+
+class _CountedEntry:
+    """A DirEntry that counts the stat calls it makes.
+
+    DirEntry.stat() caches its result, so only the first call on an entry is
+    counted, as only that one reaches the filesystem.
+    """
+    def __init__(self, entry: os.DirEntry, counts: dict):
+        self._entry = entry
+        self._counts = counts
+        self._stat = None
+        self.name = entry.name
+        self.path = entry.path
+
+    def is_dir(self, **kwargs) -> bool:
+        return self._entry.is_dir(**kwargs)
+
+    def is_symlink(self) -> bool:
+        return self._entry.is_symlink()
+
+    def stat(self, **kwargs) -> os.stat_result:
+        if self._stat is None:
+            self._counts["stat"] += 1
+            self._stat = self._entry.stat(**kwargs)
+        return self._stat
+
+
+@contextmanager
+def counted_syscalls():
+    """Counts directory listings and stat calls while active.
+
+    Yields:
+        A dict of the 'scandir' and 'stat' counts so far.
+    """
+    counts = {"scandir": 0, "stat": 0}
+    scandir = os.scandir
+    stat = os.stat
+    lstat = os.lstat
+
+    class CountedScandir:
+        def __init__(self, path):
+            counts["scandir"] += 1
+            self._entries = scandir(path)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self._entries.close()
+
+        def __iter__(self):
+            return (_CountedEntry(entry, counts) for entry in self._entries)
+
+    def counted_stat(*args, **kwargs):
+        counts["stat"] += 1
+        return stat(*args, **kwargs)
+
+    def counted_lstat(*args, **kwargs):
+        counts["stat"] += 1
+        return lstat(*args, **kwargs)
+
+    with mock.patch.object(os, "scandir", CountedScandir), \
+            mock.patch.object(os, "stat", counted_stat), \
+            mock.patch.object(os, "lstat", counted_lstat):
+        yield counts
+
+
+def walk_find(root: str, name: str, search_type: str = None) -> list[str]:
+    """The os.walk based traversal that find() used before os.scandir.
+    """
+    results = []
+    for curr_root, dirs, files in os.walk(root):
+        if search_type not in ("d", "dir"):
+            for fname in files:
+                if re.match(name, fname):
+                    results.append(os.path.join(curr_root, fname))
+        if search_type not in ("f", "file"):
+            for dname in dirs:
+                if re.match(name, dname):
+                    results.append(os.path.join(curr_root, dname))
+    return results
+
+
+def _best(function, repeat: int, **kwargs) -> float:
+    """Returns the fastest of repeat timed calls to function.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(**kwargs)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args: list[str] = None):
+    """Parses command line input and prints a timing table.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--width", type=int, default=6)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--name", type=str, default=r"rw7.*\.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0,
+                        help="Milliseconds added to each directory listing.")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1])
+    parser.add_argument("--patterns", type=int, default=0)
+    parser.add_argument("--predicates", action="store_true")
+    parser.add_argument("--min_size", type=int, default=0)
+    parser.add_argument("--maxdepth", type=int, default=2)
+    parsed = parser.parse_args(args)
+
+    with tempfile.TemporaryDirectory() as root:
+        entries = build_tree(root, parsed.depth, parsed.width, parsed.files)
+        print(f"{entries} entries, pattern {parsed.name!r}")
+        if parsed.latency > 0:
+            _compare_threads(root, parsed)
+            return
+        if parsed.patterns > 0:
+            _compare_patterns(root, parsed)
+            return
+        if parsed.predicates:
+            _compare_predicates(root, parsed)
+            return
+        print(f"{'type':>6} {'os.walk s':>10} {'find s':>10} {'speedup':>8}")
+        for search_type in (None, "f", "d"):
+            before = _best(walk_find, parsed.repeat, root=root,
+                           name=parsed.name, search_type=search_type)
+            after = _best(find.find, parsed.repeat, root=root,
+                          name=parsed.name, search_type=search_type)
+            print(f"{str(search_type):>6} {before:>10.3f} {after:>10.3f} "
+                  f"{before / after:>7.2f}x")
+
+
+def _compare_threads(root: str, parsed: argparse.Namespace):
+    """Prints find() timings per thread count under simulated latency.
+    """
+    print(f"{parsed.latency} ms per listing")
+    print(f"{'threads':>7} {'find s':>10} {'speedup':>8}")
+    baseline = None
+    with simulated_latency(parsed.latency / 1000):
+        for threads in sorted(set(parsed.threads)):
+            seconds = _best(find.find, parsed.repeat, root=root,
+                            name=parsed.name, threads=threads)
+            if baseline is None:
+                baseline = seconds
+            print(f"{threads:>7} {seconds:>10.3f} {baseline / seconds:>7.2f}x")
+
+
+def _compare_patterns(root: str, parsed: argparse.Namespace):
+    """Prints find_all() timings for one pattern and for many patterns.
+    """
+    names = []
+    for i in range(parsed.patterns):
+        if i % 2:
+            names.append(f".*\\.ext{i}$")
+        else:
+            names.append(f"^rw{i}-")
+    print(f"{'patterns':>8} {'find_all s':>11} {'re.match s':>11}")
+    for count in (1, len(names)):
+        fast = _best(find.find_all, parsed.repeat, root=root,
+                     names=names[:count])
+        slow = _best(_regex_find_all, parsed.repeat, root=root,
+                     names=names[:count])
+        print(f"{count:>8} {fast:>11.3f} {slow:>11.3f}")
+
+
+def _compare_predicates(root: str, parsed: argparse.Namespace):
+    """Prints listings, stat calls and timings of metadata filters applied
+    after find() and during its walk.
+    """
+    newer = time.time() - 3600
+    options = dict(root=root, name=parsed.name, search_type="f")
+    filters = dict(min_size=parsed.min_size, newer=newer,
+                   maxdepth=parsed.maxdepth)
+    print(f"min_size {parsed.min_size}, maxdepth {parsed.maxdepth}")
+    print(f"{'filter':>7} {'results':>8} {'scandir':>8} {'stat':>8} "
+          f"{'seconds':>8}")
+    for label, function, kwargs in (
+            ("after", _filter_found, dict(options, **filters)),
+            ("during", find.find, dict(options, **filters))):
+        with counted_syscalls() as counts:
+            results = function(**kwargs)
+        seconds = _best(function, parsed.repeat, **kwargs)
+        print(f"{label:>7} {len(results):>8} {counts['scandir']:>8} "
+              f"{counts['stat']:>8} {seconds:>8.3f}")
+
+
+def _filter_found(root: str,
+                  name: str,
+                  search_type: str,
+                  min_size: int,
+                  newer: float,
+                  maxdepth: int) -> list[str]:
+    """Walks the whole tree with find(), then stats and filters the matches.
+    """
+    prefix = os.path.join(root, "")
+    results = []
+    for path in find.find(root=root, name=name, search_type=search_type):
+        if path[len(prefix):].count(os.sep) >= maxdepth:
+            continue
+        stat = os.stat(path)
+        if stat.st_size >= min_size and stat.st_mtime > newer:
+            results.append(path)
+    return results
+
+
+def _regex_find_all(root: str, names: list[str]) -> dict[str, list[str]]:
+    """Runs every pattern through the regex engine for each entry.
+    """
+    patterns = [re.compile(name) for name in names]
+    results = {name: [] for name in names}
+    for curr_root, dirs, files in os.walk(root):
+        for entry in files + dirs:
+            for name, pattern in zip(names, patterns):
+                if pattern.match(entry):
+                    results[name].append(os.path.join(curr_root, entry))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,36 @@
 import argparse
+from contextlib import nullcontext
+from datetime import datetime
 import os
+import queue
 import re
+import sys
+import threading
 
-from typing import Optional
+from typing import Iterator, Optional
+
+import grep
+import index as find_index
+from patterns import MultiMatcher
+import stats as find_stats
+
+_DEFAULT_INDEX = "find.idx"
 
 
 def find(root: str = None,
          name: str = "",
-         search_type: Optional[str] = None) -> list[str]:
+         search_type: Optional[str] = None,
+         threads: int = 1,
+         sort: bool = False,
+         index: Optional[str] = None,
+         contains: Optional[str] = None,
+         max_size: Optional[int] = None,
+         min_size: Optional[int] = None,
+         newer: Optional[float] = None,
+         maxdepth: Optional[int] = None,
+         follow_symlinks: bool = False,
+         xdev: bool = False,
+         stats=None) -> list[str]:
     """Finds files and/or directories under root that match string pattern.
 
     Searches and returns files and/or directories that match the given string
@@ -20,6 +43,29 @@ def find(root: str = None,
         search_type: Optional, if search_type is 'd' or 'dir' then only matching
             directories will be returned. If search_type is 'f' or 'file' then
             only matching files (non-directory) will be returned.
+        threads: The number of threads listing directories. More than one
+            thread returns matches in no particular order.
+        sort: A flag that sorts the results for a deterministic order.
+        index: Optional, a path to an index built by index.build(). The index
+            is queried instead of walking the live tree.
+        contains: Optional, a regex string pattern that the contents of
+            matching files must also match. Directories never match.
+        max_size: Optional, files larger than this many bytes are skipped
+            when contains is given.
+        min_size: Optional, entries smaller than this many bytes are skipped.
+        newer: Optional, entries last modified at or before this time, in
+            seconds since the epoch, are skipped.
+        maxdepth: Optional, entries more than this many levels below root are
+            neither reported nor listed, so 1 only reports the entries of
+            root itself.
+        follow_symlinks: A flag that descends into symlinks to directories.
+            Every directory is listed once, however many links or bind
+            mounts lead to it, so cycles end.
+        xdev: A flag that does not descend into directories on other
+            filesystems than root, though they are still reported.
+        stats: Optional, a stats.Stats that records the directories listed,
+            regex evaluations, matches and the time spent listing and
+            searching contents.
 
     Returns:
         A list of files and/or directories under 'root' that match the given
@@ -28,47 +74,654 @@ def find(root: str = None,
     Raises:
         ValueError: Not a valid root path
         ValueError: Not a valid string pattern
+        ValueError: Not a valid number of threads
+        ValueError: Not a valid max size
+        ValueError: Not a valid min size
+        ValueError: Not a valid max depth
+        ValueError: Not a valid option with an index
+        ValueError: Root is not covered by the index
+    """
+    results = list(ifind(root=root, name=name, search_type=search_type,
+                         threads=threads, index=index, contains=contains,
+                         max_size=max_size, min_size=min_size, newer=newer,
+                         maxdepth=maxdepth, follow_symlinks=follow_symlinks,
+                         xdev=xdev, stats=stats))
+    if sort is True:
+        results.sort()
+    return results
+
+
+def ifind(root: str = None,
+          name: str = "",
+          search_type: Optional[str] = None,
+          threads: int = 1,
+          index: Optional[str] = None,
+          contains: Optional[str] = None,
+          max_size: Optional[int] = None,
+          min_size: Optional[int] = None,
+          newer: Optional[float] = None,
+          maxdepth: Optional[int] = None,
+          follow_symlinks: bool = False,
+          xdev: bool = False,
+          stats=None) -> Iterator[str]:
+    """Lazily finds files and/or directories under root that match a pattern.
+
+    Same search as find(), but matches are yielded as soon as they are seen
+    instead of being collected into a list. The tree is walked depth first
+    with os.scandir, so entry types come from the directory listing rather
+    than a stat call per entry, and the pattern is compiled once.
+
+    With more than one thread, directories are listed concurrently so that
+    the latency of slow filesystems such as NFS overlaps, and matches are
+    yielded in the order the threads find them.
+
+    With contains, the files whose names match are searched by a pool of
+    threads, see grep.ContentSearch, and only files whose contents match are
+    yielded.
+
+    min_size and newer are checked against the stat that os.scandir caches
+    on each entry, and only for entries whose name and type already match.
+    maxdepth stops the walk from listing deeper directories at all.
+
+    follow_symlinks and xdev stat each directory before descending into it,
+    see _Visited, so they cost one stat call per directory, which the default
+    walk does without.
+
+    Args:
+        root: A path to an existing directory.
+        name: A string pattern to search for. Should be a valid regex.
+        search_type: Optional, if search_type is 'd' or 'dir' then only matching
+            directories will be yielded. If search_type is 'f' or 'file' then
+            only matching files (non-directory) will be yielded.
+        threads: The number of threads listing directories.
+        index: Optional, a path to an index built by index.build(). The index
+            is queried instead of walking the live tree.
+        contains: Optional, a regex string pattern that the contents of
+            matching files must also match.
+        max_size: Optional, files larger than this many bytes are skipped
+            when contains is given.
+        min_size: Optional, entries smaller than this many bytes are skipped.
+        newer: Optional, entries last modified at or before this time, in
+            seconds since the epoch, are skipped.
+        maxdepth: Optional, entries more than this many levels below root are
+            neither reported nor listed, so 1 only reports the entries of
+            root itself.
+        follow_symlinks: A flag that descends into symlinks to directories.
+            Every directory is listed once, however many links or bind
+            mounts lead to it, so cycles end.
+        xdev: A flag that does not descend into directories on other
+            filesystems than root, though they are still reported.
+        stats: Optional, a stats.Stats that records the directories listed,
+            regex evaluations, matches and the time spent listing and
+            searching contents.
+
+    Yields:
+        Paths of files and/or directories under 'root' that match the given
+        name string pattern.
+
+    Raises:
+        ValueError: Not a valid root path
+        ValueError: Not a valid string pattern
+        ValueError: Not a valid number of threads
+        ValueError: Not a valid max size
+        ValueError: Not a valid min size
+        ValueError: Not a valid max depth
+        ValueError: Not a valid option with an index
+        ValueError: Root is not covered by the index
     """
     if not os.path.exists(root):
         raise ValueError(f"Not a valid root path: {root}")
     try:
-        re.compile(name)
+        match = re.compile(name).match
     except re.error:
         raise ValueError(f"Not a valid string pattern: {name}")
+    search = _content_search(contains, max_size)
+    predicate = _metadata(min_size, newer)
+    hits = _search(root, match, search_type, threads, index, search,
+                   predicate, maxdepth, follow_symlinks, xdev, stats)
+    return (path for path, _ in hits)
 
-    # Walk through files to find regex matches and append to 'results'
-    # If type is not "d", "dir", "f", or "file" then will return all matches.
-    results = []
-    for curr_root, dirs, files in os.walk(root):
-        if search_type not in ("d", "dir"):
-            for fname in files:
-                if re.match(name, fname):
-                    results.append(os.path.join(curr_root, fname))
-        if search_type not in ("f", "file"):
-            for dname in dirs:
-                if re.match(name, dname):
-                    results.append(os.path.join(curr_root, dname))
 
-    return results
+def find_all(root: str = None,
+             names: list[str] = None,
+             search_type: Optional[str] = None,
+             threads: int = 1,
+             sort: bool = False,
+             index: Optional[str] = None,
+             contains: Optional[str] = None,
+             max_size: Optional[int] = None,
+             min_size: Optional[int] = None,
+             newer: Optional[float] = None,
+             maxdepth: Optional[int] = None,
+             follow_symlinks: bool = False,
+             xdev: bool = False,
+             stats=None) -> dict[str, list[str]]:
+    """Finds the matches of several string patterns in a single walk.
+
+    Each pattern is analyzed first, so that anchored literals such as '^rw70-'
+    or '.*\\.json$' are tested with string operations grouped across all
+    patterns instead of the regex engine. See patterns.MultiMatcher.
+
+    Args:
+        root: A path to an existing directory.
+        names: A list of string patterns to search for. Should be valid regex.
+        search_type: Optional, if search_type is 'd' or 'dir' then only matching
+            directories will be returned. If search_type is 'f' or 'file' then
+            only matching files (non-directory) will be returned.
+        threads: The number of threads listing directories.
+        sort: A flag that sorts each list of matches.
+        index: Optional, a path to an index built by index.build().
+        contains: Optional, a regex string pattern that the contents of
+            matching files must also match. Each file is searched once
+            however many name patterns it matches.
+        max_size: Optional, files larger than this many bytes are skipped
+            when contains is given.
+        min_size: Optional, entries smaller than this many bytes are skipped.
+        newer: Optional, entries last modified at or before this time, in
+            seconds since the epoch, are skipped.
+        maxdepth: Optional, entries more than this many levels below root are
+            neither reported nor listed, so 1 only reports the entries of
+            root itself.
+        follow_symlinks: A flag that descends into symlinks to directories.
+            Every directory is listed once, however many links or bind
+            mounts lead to it, so cycles end.
+        xdev: A flag that does not descend into directories on other
+            filesystems than root, though they are still reported.
+        stats: Optional, a stats.Stats that records the directories listed,
+            regex evaluations, matches and the time spent listing and
+            searching contents.
+
+    Returns:
+        A dict from each pattern to the list of paths that match it.
+
+    Raises:
+        ValueError: Not a valid root path
+        ValueError: Not a valid string pattern
+        ValueError: Not a valid number of threads
+        ValueError: Not a valid max size
+        ValueError: Not a valid min size
+        ValueError: Not a valid max depth
+        ValueError: Not a valid option with an index
+        ValueError: Root is not covered by the index
+    """
+    if not os.path.exists(root):
+        raise ValueError(f"Not a valid root path: {root}")
+    matcher = MultiMatcher(names)
+    search = _content_search(contains, max_size)
+    predicate = _metadata(min_size, newer)
+    results = [[] for _ in matcher.patterns]
+    for path, hit in _search(root, matcher, search_type, threads, index,
+                             search, predicate, maxdepth, follow_symlinks,
+                             xdev, stats):
+        for i in hit:
+            results[i].append(path)
+    if sort is True:
+        for paths in results:
+            paths.sort()
+    return dict(zip(matcher.patterns, results))
+
+
+def _content_search(contains: Optional[str],
+                    max_size: Optional[int]) -> Optional[grep.ContentSearch]:
+    """Returns the ContentSearch for contains, or None without one.
+
+    Raises:
+        ValueError: Not a valid string pattern
+        ValueError: Not a valid max size
+    """
+    if contains is None:
+        return None
+    return grep.ContentSearch(contains, max_size)
+
+
+def _metadata(min_size: Optional[int], newer: Optional[float]):
+    """Returns a predicate on os.stat_result for min_size and newer, or None
+    without either.
+
+    Raises:
+        ValueError: Not a valid min size
+    """
+    if min_size is not None and min_size < 0:
+        raise ValueError(f"Not a valid min size: {min_size}")
+    if min_size is None and newer is None:
+        return None
+    if newer is None:
+        return lambda stat: stat.st_size >= min_size
+    if min_size is None:
+        return lambda stat: stat.st_mtime > newer
+    return lambda stat: stat.st_size >= min_size and stat.st_mtime > newer
+
+
+def _search(root: str,
+            match,
+            search_type: Optional[str],
+            threads: int,
+            index: Optional[str],
+            contains: Optional[grep.ContentSearch] = None,
+            predicate=None,
+            maxdepth: Optional[int] = None,
+            follow_symlinks: bool = False,
+            xdev: bool = False,
+            stats=None):
+    """Picks the walk for the given options.
+
+    The walks yield (path, hit) pairs for every entry where match(name) is
+    truthy, with hit being the value match returned, and predicate, if any,
+    accepts the entry's stat. With contains, only files whose contents also
+    match are kept. With stats, match, the listing of each directory and the
+    content search are wrapped to be counted and timed.
+
+    Raises:
+        ValueError: Not a valid number of threads
+        ValueError: Not a valid max depth
+        ValueError: Not a valid option with an index
+        ValueError: Root is not covered by the index
+    """
+    if threads < 1:
+        raise ValueError(f"Not a valid number of threads: {threads}")
+    if maxdepth is not None and maxdepth < 0:
+        raise ValueError(f"Not a valid max depth: {maxdepth}")
+
+    # The index was built by a walk of its own, which follows no symlinks
+    if index is not None and (follow_symlinks or xdev):
+        raise ValueError(
+            f"Not a valid option with an index: "
+            f"{'follow_symlinks' if follow_symlinks else 'xdev'}")
+    descend = None
+    if follow_symlinks or xdev:
+        descend = _Visited(root, follow_symlinks, xdev).descend
+    want_dirs = search_type not in ("f", "file") and contains is None
+    want_files = search_type not in ("d", "dir")
+    scan = _scan
+    if stats is not None:
+        match = stats.counted("regex evaluations", match)
+        scan = stats.counted("directories", stats.timed("list", _scan))
+        if contains is not None:
+            contains = stats.counted("files searched",
+                                     stats.timed("search", contains))
+    if maxdepth == 0:
+        hits = iter(())
+    elif index is not None:
+        hits = _search_index(root, index, match, want_dirs, want_files,
+                             predicate, maxdepth)
+    elif threads > 1:
+        hits = _walk_parallel(root, match, want_dirs, want_files, threads,
+                              predicate, maxdepth, scan, descend)
+    else:
+        hits = _walk(root, match, want_dirs, want_files, predicate, maxdepth,
+                     scan, descend)
+    if contains is not None:
+        hits = grep.grep(hits, contains)
+    if stats is not None:
+        hits = _counted_matches(hits, stats)
+    return hits
+
 
+def _counted_matches(hits, stats):
+    """Yields hits, counting them as matches.
+    """
+    for hit in hits:
+        stats.add("matches")
+        yield hit
+
+
+def _walk(root: str,
+          match,
+          want_dirs: bool,
+          want_files: bool,
+          predicate=None,
+          maxdepth: Optional[int] = None,
+          scan=None,
+          descend=None):
+    """Yields matching entries under root, depth first like os.walk.
+    """
+    if scan is None:
+        scan = _scan
+    # Directories with the depth of their entries, which is 1 for root's
+    stack = [(root, 1)]
+    while stack:
+        directory, depth = stack.pop()
+        matches, subdirectories = scan(directory, match, want_dirs,
+                                       want_files, predicate, descend)
+        yield from matches
+
+        # Push in reverse so subdirectories are visited in listing order
+        if maxdepth is None or depth < maxdepth:
+            stack.extend((subdirectory, depth + 1)
+                         for subdirectory in reversed(subdirectories))
+
+
+def _walk_parallel(root: str,
+                   match,
+                   want_dirs: bool,
+                   want_files: bool,
+                   threads: int,
+                   predicate=None,
+                   maxdepth: Optional[int] = None,
+                   scan=None,
+                   descend=None):
+    """Yields matching entries under root, listing directories in threads.
+
+    Worker threads share one stack of directories to list. Whichever thread
+    is idle takes the most recently discovered directory, and the matches of
+    each directory are streamed back through a queue. A counter of listed but
+    unfinished directories tells when the walk is complete.
+    """
+    if scan is None:
+        scan = _scan
+    directories = queue.LifoQueue()
+    results = queue.SimpleQueue()
+    lock = threading.Lock()
+    pending = [1]
+    stop = threading.Event()
+
+    def work():
+        while not stop.is_set():
+            item = directories.get()
+            if item is None:
+                return
+            directory, depth = item
+            try:
+                matches, subdirectories = scan(directory, match, want_dirs,
+                                               want_files, predicate, descend)
+            except Exception as error:
+                results.put(error)
+                return
+            if matches:
+                results.put(matches)
+            if maxdepth is not None and depth >= maxdepth:
+                subdirectories = []
+            with lock:
+                pending[0] += len(subdirectories) - 1
+                done = pending[0] == 0
+            for subdirectory in subdirectories:
+                directories.put((subdirectory, depth + 1))
+            if done:
+                results.put(None)
+
+    workers = [threading.Thread(target=work, daemon=True)
+               for _ in range(threads)]
+    directories.put((root, 1))
+    for worker in workers:
+        worker.start()
+    try:
+        while True:
+            item = results.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        stop.set()
+        for _ in workers:
+            directories.put(None)
+
+
+def _search_index(root: str,
+                  index: str,
+                  match,
+                  want_dirs: bool,
+                  want_files: bool,
+                  predicate=None,
+                  maxdepth: Optional[int] = None):
+    """Yields matching entries under root from an index instead of the tree.
+
+    The index holds no sizes or times, so with a predicate each match is
+    stat'ed, and skipped if it no longer exists.
+
+    Raises:
+        ValueError: Root is not covered by the index
+    """
+    indexed = find_index.Index(index)
+    absolute_root = os.path.abspath(root)
+    prefix = os.path.join(absolute_root, "")
+    if (absolute_root != indexed.root
+            and not absolute_root.startswith(os.path.join(indexed.root, ""))):
+        indexed.close()
+        raise ValueError(f"Root is not covered by the index: {root}")
+
+    def search():
+        # Paths are reported relative to root as given, like a live walk
+        with indexed:
+            for path, hit in indexed.search(match, want_dirs, want_files):
+                if not path.startswith(prefix):
+                    continue
+                relative = path[len(prefix):]
+                if (maxdepth is not None
+                        and relative.count(os.sep) >= maxdepth):
+                    continue
+                path = os.path.join(root, relative)
+                if predicate is not None:
+                    try:
+                        if not predicate(os.stat(path)):
+                            continue
+                    except OSError:
+                        continue
+                yield path, hit
+
+    return search()
+
+
+def _scan(directory: str,
+          match,
+          want_dirs: bool,
+          want_files: bool,
+          predicate=None,
+          descend=None):
+    """Lists a single directory.
+
+    Symlinks to directories are reported as directories but not descended
+    into, and directories that cannot be listed are skipped, as with os.walk.
+    A descend callable, see _Visited.descend(), decides instead which
+    directories to descend into.
+    predicate is only applied to entries whose name matched, through
+    DirEntry.stat(), which caches the result on the entry, so an entry costs
+    at most one stat call and none without a predicate.
+
+    Returns:
+        A tuple of (matching (path, hit) pairs, subdirectory paths to descend
+        into).
+    """
+    matches = []
+    subdirectories = []
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return matches, subdirectories
+    with entries:
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                if want_dirs:
+                    hit = match(entry.name)
+                    if hit and _keep(entry, predicate):
+                        matches.append((entry.path, hit))
+                if descend is not None:
+                    if descend(entry):
+                        subdirectories.append(entry.path)
+                    continue
+                try:
+                    if not entry.is_symlink():
+                        subdirectories.append(entry.path)
+                except OSError:
+                    pass
+            elif want_files:
+                hit = match(entry.name)
+                if hit and _keep(entry, predicate):
+                    matches.append((entry.path, hit))
+    return matches, subdirectories
+
+
+def _keep(entry: os.DirEntry, predicate) -> bool:
+    """Returns True if there is no predicate or it accepts the entry's stat.
+    """
+    if predicate is None:
+        return True
+    try:
+        return predicate(entry.stat())
+    except OSError:
+        return False
+
+
+class _Visited:
+    """The directories a walk descended into, to follow symlinks without
+    listing a directory twice, and to stay on one filesystem.
+
+    Directories are keyed by (st_dev, st_ino), packed into a single int so
+    that a walk of millions of directories keeps a set of small ints rather
+    than of tuples. A directory whose key was seen is not descended into
+    again, which ends symlink cycles and skips trees reached through several
+    links or bind mounts, so a walk lists each directory once.
+    """
+    def __init__(self, root: str, follow_symlinks: bool, xdev: bool):
+        stat = os.stat(root)
+        self._follow_symlinks = follow_symlinks
+        self._device = stat.st_dev if xdev else None
+        self._keys = {self._key(stat)}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(stat: os.stat_result) -> int:
+        return stat.st_dev << 64 | stat.st_ino
+
+    def descend(self, entry: os.DirEntry) -> bool:
+        """Returns True if the walk should list entry, a directory, marking
+        it as visited. Safe to call from several threads.
+        """
+        try:
+            if not self._follow_symlinks and entry.is_symlink():
+                return False
+            stat = entry.stat()
+        except OSError:
+            return False
+        if self._device is not None and stat.st_dev != self._device:
+            return False
+        key = self._key(stat)
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+        return True
 
-def main():
+
+def main(args: list[str] = None):
     """Parses command line input and calls find with parsed arguments.
+
+    'find.py index --root X --index PATH' builds or refreshes an index instead.
     """
+    if args is None:
+        args = sys.argv[1:]
+    if args and args[0] == "index":
+        return index_main(args[1:])
+
     # Create parser
     parser = argparse.ArgumentParser()
     parser.add_argument("--root", type=str, required=True)
-    parser.add_argument("--name", type=str)
+    parser.add_argument("--name", type=str, action="extend", nargs="+")
     parser.add_argument("--type", type=str)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--sort", action="store_true")
+    parser.add_argument("--index", type=str)
+    parser.add_argument("--contains", type=str)
+    parser.add_argument("--max_size", type=int)
+    parser.add_argument("--min_size", type=int)
+    parser.add_argument("--newer", type=str)
+    parser.add_argument("--maxdepth", type=int)
+    parser.add_argument("--follow_symlinks", action="store_true",
+                        help="Descend into symlinks to directories, listing "
+                             "each directory once.")
+    parser.add_argument("--xdev", action="store_true",
+                        help="Do not descend into other filesystems.")
+    parser.add_argument("--stats", type=str, nargs="?", const="",
+                        help="Print timings and counters to stderr, and "
+                             "write them as .json to the given path.")
+    parser.add_argument("--profile", type=str,
+                        help="Write a cProfile of the search to this path.")
 
     # Parse command line args
-    parsed = parser.parse_args()
+    parsed = parser.parse_args(args)
+    names = parsed.name if parsed.name else [""]
+    try:
+        newer = _newer(parsed.newer)
+    except ValueError as error:
+        parser.error(str(error))
+    options = dict(threads=parsed.threads, index=parsed.index,
+                   contains=parsed.contains, max_size=parsed.max_size,
+                   min_size=parsed.min_size, newer=newer,
+                   maxdepth=parsed.maxdepth,
+                   follow_symlinks=parsed.follow_symlinks, xdev=parsed.xdev)
+    run_stats = find_stats.Stats() if parsed.stats is not None else None
+    capture = (find_stats.profile(parsed.profile) if parsed.profile
+               else nullcontext())
+    with capture:
+        _print_results(parsed, names, dict(options, stats=run_stats))
+    if run_stats is not None:
+        run_stats.write(parsed.stats)
+
+
+def _print_results(parsed: argparse.Namespace, names: list[str],
+                   options: dict):
+    """Runs the search of the parsed command line and prints the matches.
+    """
+    # Several patterns share one walk and are printed as a list per pattern
+    if len(names) > 1:
+        results = find_all(root=parsed.root, names=names,
+                           search_type=parsed.type, sort=parsed.sort,
+                           **options)
+        for name, paths in results.items():
+            print(f"{name}:")
+            for entry in paths:
+                print(f"  {entry}")
+        return
 
-    # Find and print matching files
-    results = find(root=parsed.root, name=parsed.name, search_type=parsed.type)
+    # Print matching files as they are found, unless they need sorting first
+    if parsed.sort:
+        results = find(root=parsed.root, name=names[0],
+                       search_type=parsed.type, sort=True, **options)
+    else:
+        results = ifind(root=parsed.root, name=names[0],
+                        search_type=parsed.type, **options)
     for entry in results:
         print(entry)
 
 
+def _newer(value: Optional[str]) -> Optional[float]:
+    """Parses --newer, a reference path whose mtime is used like find's
+    -newer, or else an ISO 8601 date and time in local time.
+
+    Raises:
+        ValueError: Not a valid reference path or date
+    """
+    if value is None:
+        return None
+    if os.path.exists(value):
+        return os.stat(value).st_mtime
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise ValueError(f"Not a valid reference path or date: {value}")
+
+
+def index_main(args: list[str] = None):
+    """Parses command line input and builds or refreshes an index.
+    """
+    # Create parser
+    parser = argparse.ArgumentParser(prog="find.py index")
+    parser.add_argument("--root", type=str, required=True)
+    parser.add_argument("--index", type=str, default=_DEFAULT_INDEX)
+
+    # Parse command line args
+    parsed = parser.parse_args(args)
+
+    listed, reused = find_index.build(root=parsed.root,
+                                      index_path=parsed.index)
+    print(f"Index: {os.path.abspath(parsed.index)} "
+          f"({listed} directories listed, {reused} unchanged)")
+
+
 if __name__ == "__main__":
     main()
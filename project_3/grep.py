@@ -0,0 +1,99 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import mmap
+import os
+import re
+
+from typing import Optional
+
+import patterns
+
+# Files up to this size are read in one call, larger ones are memory-mapped
+_READ_SIZE = 256 * 1024
+
+# Threads reading files, enough to keep a local disk's queue busy
+THREADS = 8
+
+
+class ContentSearch:
+    """Tells whether a file's contents match a pattern.
+
+    The pattern is applied to the raw bytes, anywhere in the file, like
+    re.search. A literal pattern, such as '"rw" : "rw"', is found with a plain
+    byte search instead of the regex engine. Small files are read in a single
+    call and larger ones are memory-mapped, so a large file is never copied
+    into memory and the search stops at the first hit.
+    """
+    def __init__(self, pattern: str, max_size: Optional[int] = None):
+        """Compiles the pattern.
+
+        Args:
+            pattern: A regex string pattern, encoded as UTF-8 to search bytes.
+            max_size: Optional, files larger than this many bytes are skipped
+                and never match.
+
+        Raises:
+            ValueError: Not a valid string pattern
+            ValueError: Not a valid max size
+        """
+        if max_size is not None and max_size < 0:
+            raise ValueError(f"Not a valid max size: {max_size}")
+        try:
+            encoded = pattern.encode("utf-8", "surrogateescape")
+            compiled = re.compile(encoded)
+        except (re.error, AttributeError):
+            raise ValueError(f"Not a valid string pattern: {pattern}")
+        self.pattern = pattern
+        self.max_size = max_size
+        literal = patterns.literal(pattern)
+        if literal:
+            needle = literal.encode("utf-8", "surrogateescape")
+            self._search = lambda data: data.find(needle) >= 0
+        else:
+            self._search = lambda data: compiled.search(data) is not None
+
+    def __call__(self, path: str) -> bool:
+        """Returns True if the file at path matches, False if it does not or
+        cannot be read.
+        """
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if self.max_size is not None and size > self.max_size:
+                    return False
+                if size <= _READ_SIZE:
+                    return self._search(f.read())
+                with mmap.mmap(f.fileno(), 0,
+                               access=mmap.ACCESS_READ) as mapped:
+                    return self._search(mapped)
+        except (OSError, ValueError):
+            return False
+
+
+def grep(hits, search: ContentSearch, threads: int = THREADS):
+    """Keeps the (path, hit) pairs whose file contents match.
+
+    Files are searched by a pool of threads, so the time spent opening and
+    reading one file overlaps with the others. Only a few files per thread are
+    in flight at a time, and pairs are yielded in the order of hits.
+
+    Args:
+        hits: An iterable of (path, hit) pairs of files.
+        search: The ContentSearch to apply to each path.
+        threads: The number of threads reading files.
+
+    Yields:
+        The pairs of hits whose file matches search.
+    """
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = deque()
+        for path, hit in hits:
+            pending.append((path, hit, executor.submit(search, path)))
+            if len(pending) >= threads * 4:
+                path, hit, found = pending.popleft()
+                if found.result():
+                    yield path, hit
+        while pending:
+            path, hit, found = pending.popleft()
+            if found.result():
+                yield path, hit
@@ -0,0 +1,288 @@
+from array import array
+import mmap
+import os
+import struct
+
+_MAGIC = b"FINDIDX1"
+
+# Counts of names, directories and entries, then the length of the names blob
+# and of the root path
+_HEADER = struct.Struct("<8sQQQQQ")
+
+# Entry kinds, a directory symlink is reported as a directory but not walked
+_FILE = 0
+_DIR = 1
+_DIR_LINK = 2
+
+
+def build(root: str, index_path: str) -> tuple[int, int]:
+    """Builds or refreshes the on-disk index of every entry under root.
+
+    When index_path already holds an index of the same root, directories whose
+    mtime has not changed reuse their recorded entries instead of being listed
+    again. Adding, removing or renaming an entry updates the mtime of its
+    parent directory, so only those directories are listed. Every directory is
+    still stat'ed to find changes further down the tree.
+
+    Args:
+        root: A path to an existing directory.
+        index_path: A string path to write the index to.
+
+    Returns:
+        A tuple of (directories listed, directories reused from the old index).
+
+    Raises:
+        ValueError: Not a valid root path
+    """
+    if not os.path.isdir(root):
+        raise ValueError(f"Not a valid root path: {root}")
+    root = os.path.abspath(root)
+    index_path = os.path.abspath(index_path)
+
+    previous = {}
+    if os.path.exists(index_path):
+        with Index(index_path) as old:
+            if old.root == root:
+                previous = old.directories()
+
+    names = {}
+    directory_parents = array("i")
+    directory_names = array("I")
+    directory_mtimes = array("q")
+    entries = []
+    listed = reused = 0
+
+    # Each stack item is (path, id of the parent directory, name id)
+    stack = [(root, -1, _name_id(names, root))]
+    while stack:
+        path, parent, name_id = stack.pop()
+        directory = len(directory_parents)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        directory_parents.append(parent)
+        directory_names.append(name_id)
+        directory_mtimes.append(mtime)
+
+        old = previous.get(path)
+        if old is not None and old[0] == mtime:
+            children = old[1]
+            reused += 1
+        else:
+            children = _list(path, index_path)
+            listed += 1
+
+        subdirectories = []
+        for child, kind in children:
+            child_id = _name_id(names, child)
+            entries.append((child_id, directory, kind))
+            if kind == _DIR:
+                subdirectories.append(
+                    (os.path.join(path, child), directory, child_id))
+        stack.extend(reversed(subdirectories))
+
+    _write(index_path, root, names, directory_parents, directory_names,
+           directory_mtimes, entries)
+    return listed, reused
+
+
+def _name_id(names: dict, name: str) -> int:
+    """Returns the id of name in the table of unique names, adding it if new.
+    """
+    name_id = names.get(name)
+    if name_id is None:
+        name_id = names[name] = len(names)
+    return name_id
+
+
+def _list(path: str, index_path: str) -> list[tuple[str, int]]:
+    """Lists a directory as (name, kind) pairs, skipping the index itself.
+    """
+    children = []
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return children
+    with entries:
+        for entry in entries:
+            if entry.path == index_path:
+                continue
+            try:
+                if not entry.is_dir():
+                    kind = _FILE
+                elif entry.is_symlink():
+                    kind = _DIR_LINK
+                else:
+                    kind = _DIR
+            except OSError:
+                kind = _FILE
+            children.append((entry.name, kind))
+    return children
+
+
+def _write(index_path: str,
+           root: str,
+           names: dict,
+           directory_parents: array,
+           directory_names: array,
+           directory_mtimes: array,
+           entries: list[tuple[int, int, int]]):
+    """Writes the index sections to a temporary file and moves it in place.
+
+    Entries are sorted by name id, with a table of where each name's entries
+    start, so a query only touches the entries of names that matched.
+    """
+    blob = "\0".join(names).encode("utf-8", "surrogateescape")
+    encoded_root = root.encode("utf-8", "surrogateescape")
+
+    entries.sort()
+    name_starts = array("I", bytes(4 * (len(names) + 1)))
+    entry_directories = array("I")
+    entry_kinds = array("B")
+    for name_id, directory, kind in entries:
+        name_starts[name_id + 1] += 1
+        entry_directories.append(directory)
+        entry_kinds.append(kind)
+    for i in range(len(names)):
+        name_starts[i + 1] += name_starts[i]
+
+    temp_path = index_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(names), len(directory_parents),
+                             len(entries), len(blob), len(encoded_root)))
+        for section in (encoded_root, blob, directory_parents,
+                        directory_names, directory_mtimes, name_starts,
+                        entry_directories, entry_kinds):
+            data = bytes(section)
+            f.write(data)
+            f.write(bytes(-len(data) % 8))
+    os.replace(temp_path, index_path)
+
+
+class Index:
+    """A read-only, memory-mapped view of an index written by build().
+
+    The arrays are cast directly from the mapping, so opening an index costs
+    the same however large it is, and a query only reads the names table and
+    the entries of the names that match.
+    """
+    def __init__(self, index_path: str):
+        """Maps the index file at index_path.
+
+        Raises:
+            ValueError: Not a valid index
+        """
+        with open(index_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if (len(view) < _HEADER.size
+                or bytes(view[:len(_MAGIC)]) != _MAGIC):
+            view.release()
+            self._map.close()
+            raise ValueError(f"Not a valid index: {index_path}")
+        (_, name_count, directory_count, entry_count, blob_length,
+         root_length) = _HEADER.unpack_from(view)
+
+        self._views = [view]
+        offset = _HEADER.size
+
+        def section(length: int, item_format: str = "B") -> memoryview:
+            nonlocal offset
+            size = length * struct.calcsize(item_format)
+            data = view[offset:offset + size].cast(item_format)
+            self._views.append(data)
+            offset += size + -size % 8
+            return data
+
+        self.root = bytes(section(root_length)).decode("utf-8",
+                                                       "surrogateescape")
+        self._blob = section(blob_length)
+        self._directory_parents = section(directory_count, "i")
+        self._directory_names = section(directory_count, "I")
+        self._directory_mtimes = section(directory_count, "q")
+        self._name_starts = section(name_count + 1, "I")
+        self._entry_directories = section(entry_count, "I")
+        self._entry_kinds = section(entry_count, "B")
+        self._names = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Releases the views and unmaps the index file.
+        """
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._map.close()
+
+    def names(self) -> list[str]:
+        """Returns the table of unique entry names, decoded once.
+        """
+        if self._names is None:
+            self._names = bytes(self._blob).decode(
+                "utf-8", "surrogateescape").split("\0")
+        return self._names
+
+    def search(self, match, want_dirs: bool, want_files: bool):
+        """Yields the paths of indexed entries whose name matches.
+
+        Args:
+            match: A callable such as a compiled pattern's match method.
+            want_dirs: A flag that includes matching directories.
+            want_files: A flag that includes matching files.
+
+        Yields:
+            Pairs of (absolute path under the indexed root, the truthy value
+            match returned for its name).
+        """
+        paths = {}
+        starts = self._name_starts
+        for name_id, name in enumerate(self.names()):
+            if starts[name_id] == starts[name_id + 1]:
+                continue
+            hit = match(name)
+            if not hit:
+                continue
+            for entry in range(starts[name_id], starts[name_id + 1]):
+                is_dir = self._entry_kinds[entry] != _FILE
+                if (is_dir and want_dirs) or (not is_dir and want_files):
+                    directory = self._path(self._entry_directories[entry],
+                                           paths)
+                    yield os.path.join(directory, name), hit
+
+    def directories(self) -> dict[str, tuple[int, list[tuple[str, int]]]]:
+        """Returns {directory path: (mtime, [(name, kind), ...])}.
+        """
+        names = self.names()
+        paths = {}
+        directories = {}
+        for directory in range(len(self._directory_parents)):
+            directories[self._path(directory, paths)] = (
+                self._directory_mtimes[directory], [])
+        for name_id, name in enumerate(names):
+            for entry in range(self._name_starts[name_id],
+                               self._name_starts[name_id + 1]):
+                path = paths[self._entry_directories[entry]]
+                directories[path][1].append((name, self._entry_kinds[entry]))
+        return directories
+
+    def _path(self, directory: int, paths: dict) -> str:
+        """Returns the path of a directory id, memoizing every ancestor.
+        """
+        # Climb to the nearest known ancestor, then join back down
+        chain = []
+        while directory not in paths and directory >= 0:
+            chain.append(directory)
+            directory = self._directory_parents[directory]
+        path = paths.get(directory)
+        names = self.names()
+        for directory in reversed(chain):
+            name = names[self._directory_names[directory]]
+            path = name if path is None else os.path.join(path, name)
+            paths[directory] = path
+        return path
@@ -0,0 +1,150 @@
+import re
+
+# Characters that make a pattern more than a literal string
+_SPECIAL = set(".^$*+?{}[]|()\\")
+
+
+class MultiMatcher:
+    """Matches a name against several patterns in one call.
+
+    Each pattern behaves as re.match, anchored at the start of the name. Before
+    falling back to the regex engine, every pattern is analyzed and anchored
+    literals are turned into plain string tests that are grouped across
+    patterns:
+
+    'rw70-' or '^rw70-' or 'rw70-.*' become a prefix lookup,
+    'rw70-8k.json$' becomes an exact lookup,
+    '.*\\.json$' becomes an extension lookup, or a suffix lookup for other
+        literal endings,
+    '.*8k.*' or '.*8k' becomes a substring test,
+    '' or '.*' matches every name.
+
+    Prefixes and suffixes are looked up in dicts keyed by the literal, one
+    lookup per distinct literal length, and all extensions share one lookup.
+    Many literal patterns therefore cost about the same as one. A '.' in a
+    pattern never matches a newline, so names containing a newline skip the
+    string tests and use the compiled regexes for every pattern.
+    """
+    def __init__(self, patterns: list[str]):
+        """Analyzes and compiles every pattern.
+
+        Args:
+            patterns: A list of regex string patterns.
+
+        Raises:
+            ValueError: Not a valid string pattern
+        """
+        self.patterns = list(patterns)
+        self._compiled = []
+        self._every = []
+        self._exact = {}
+        self._prefixes = {}
+        self._suffixes = {}
+        self._extensions = {}
+        self._contains = []
+        self._regexes = []
+        for i, pattern in enumerate(self.patterns):
+            try:
+                compiled = re.compile(pattern)
+            except (re.error, TypeError):
+                raise ValueError(f"Not a valid string pattern: {pattern}")
+            self._compiled.append(compiled)
+            self._add(i, pattern, compiled)
+
+    def _add(self, i: int, pattern: str, compiled: re.Pattern):
+        """Files pattern i under the fastest test that is exact for it.
+        """
+        body = pattern[1:] if pattern.startswith("^") else pattern
+        leading = body.startswith(".*")
+        if leading:
+            body = body[2:]
+        anchored = body.endswith("$") and literal(body[:-1]) is not None
+        if anchored:
+            body = body[:-1]
+        trailing = not anchored and body.endswith(".*")
+        if trailing:
+            body = body[:-2]
+        text = literal(body)
+
+        if text is None:
+            self._regexes.append((i, compiled.match))
+        elif text == "" and (leading or not anchored):
+            self._every.append(i)
+        elif not leading and anchored:
+            self._exact.setdefault(text, []).append(i)
+        elif not leading:
+            self._prefixes.setdefault(len(text), {}).setdefault(
+                text, []).append(i)
+        elif anchored and text.startswith(".") \
+                and "." not in text[1:]:
+            self._extensions.setdefault(text, []).append(i)
+        elif anchored:
+            self._suffixes.setdefault(len(text), {}).setdefault(
+                text, []).append(i)
+        else:
+            self._contains.append((i, text))
+
+    def __call__(self, name: str) -> tuple:
+        """Returns the indexes of the patterns that match name.
+
+        Returns:
+            A sorted tuple of pattern indexes, empty when nothing matches.
+        """
+        if "\n" in name:
+            return tuple(i for i, compiled in enumerate(self._compiled)
+                         if compiled.match(name))
+
+        hits = list(self._every)
+        found = self._exact.get(name)
+        if found:
+            hits.extend(found)
+        for length, prefixes in self._prefixes.items():
+            found = prefixes.get(name[:length])
+            if found:
+                hits.extend(found)
+        if self._extensions:
+            dot = name.rfind(".")
+            if dot >= 0:
+                found = self._extensions.get(name[dot:])
+                if found:
+                    hits.extend(found)
+        for length, suffixes in self._suffixes.items():
+            if len(name) >= length:
+                found = suffixes.get(name[-length:])
+                if found:
+                    hits.extend(found)
+        for i, literal in self._contains:
+            if literal in name:
+                hits.append(i)
+        for i, match in self._regexes:
+            if match(name):
+                hits.append(i)
+        if len(hits) > 1:
+            hits.sort()
+        return tuple(hits)
+
+
+def literal(fragment: str):
+    """Returns the plain string a regex fragment matches, or None.
+
+    Also used by grep.py, which searches for a literal --contains pattern
+    with bytes.find() instead of the regex engine. Only characters without a special meaning and backslash escapes of
+    punctuation, such as '\\.' or '\\-', are literal.
+    """
+    characters = []
+    escaped = False
+    for character in fragment:
+        if escaped:
+            if character.isalnum() or character.isspace():
+                return None
+            characters.append(character)
+            escaped = False
+        elif character == "\\":
+            escaped = True
+        elif character in _SPECIAL:
+            return None
+        else:
+            characters.append(character)
+    if escaped:
+        return None
+    return "".join(characters)
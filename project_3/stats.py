@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+import json
+import sys
+import threading
+import time
+
+# Functions listed from a cProfile capture, by cumulative time
+_PROFILE_TOP = 20
+
+
+class Stats:
+    """Per-stage timings and counters of one run, shared by find and convert.
+
+    Code under measurement takes an optional Stats and skips all bookkeeping
+    when it is None, so a run without instrumentation only pays for that
+    check. Stages may nest, e.g. 'format' is part of 'write', and time spent
+    in several threads or processes adds up, so stages can total more than
+    the wall time.
+    """
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+
+    def __getstate__(self):
+        # Sent to worker processes and back, the lock stays behind
+        return {"timings": self.timings, "counters": self.counters}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.timings = state["timings"]
+        self.counters = state["counters"]
+
+    def add(self, counter: str, value: int = 1):
+        """Adds value to a counter.
+        """
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def add_time(self, stage: str, seconds: float):
+        """Adds seconds to the time of a stage.
+        """
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0) + seconds
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Times the body of a with statement as part of stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str, function):
+        """Returns function wrapped to add the time of each call to stage.
+        """
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_time(stage, time.perf_counter() - start)
+        return call
+
+    def counted(self, counter: str, function):
+        """Returns function wrapped to count its calls in counter.
+        """
+        def call(*args, **kwargs):
+            self.add(counter)
+            return function(*args, **kwargs)
+        return call
+
+    def merge(self, other: "Stats"):
+        """Adds the timings and counters of another Stats, such as one
+        returned by a worker process.
+        """
+        for stage, seconds in other.timings.items():
+            self.add_time(stage, seconds)
+        for counter, value in other.counters.items():
+            self.add(counter, value)
+
+    def report(self) -> dict:
+        """Returns the wall time, timings and counters as a json-ready dict.
+        """
+        return {"wall_seconds": time.perf_counter() - self._start,
+                "stage_seconds": dict(self.timings),
+                "counters": dict(self.counters)}
+
+    def summary(self) -> str:
+        """Returns the report as lines of text.
+        """
+        report = self.report()
+        lines = [f"{'wall':<20} {report['wall_seconds']:>12.3f} s"]
+        for stage, seconds in sorted(report["stage_seconds"].items(),
+                                     key=lambda item: item[1], reverse=True):
+            lines.append(f"{stage:<20} {seconds:>12.3f} s")
+        for counter, value in sorted(report["counters"].items()):
+            lines.append(f"{counter:<20} {value:>12}")
+        return "\n".join(lines)
+
+    def write(self, path: str = None):
+        """Prints the summary to stderr, and writes the report as .json to
+        path when given.
+        """
+        print(self.summary(), file=sys.stderr)
+        if path:
+            with open(path, "w") as f:
+                json.dump(self.report(), f, indent=2)
+
+
+@contextmanager
+def profile(path: str):
+    """Captures a cProfile of the body of a with statement.
+
+    The profile is written to path, for pstats or snakeviz, and the functions
+    with the most cumulative time are printed to stderr. Only this process is
+    profiled, not worker processes.
+    """
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats(
+            "cumulative").print_stats(_PROFILE_TOP)
@@ -1,6 +1,10 @@
 import os
+import threading
+import time
 import unittest
+from unittest import mock
 
+import bench_find
 import find
 
 _TOP_DIRECTORY = "top_level_dir"
@@ -110,6 +114,193 @@ class TestFind(unittest.TestCase):
             os.path.join(path, "temp_dir_3", "practice_3.py") in
             results)
 
+    def test_ifind(self):
+        """Test that ifind lazily yields the same matches as find
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        results = find.ifind(root=path, name=".*practice.*")
+        self.assertFalse(isinstance(results, list))
+        self.assertEqual(
+            sorted(find.find(root=path, name=".*practice.*")),
+            sorted(results))
+
+    def test_threads(self):
+        """Test that a threaded walk finds the same matches as a serial one
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        for search_type in (None, "f", "d"):
+            self.assertEqual(
+                find.find(root=path, name=".*practice.*",
+                          search_type=search_type, sort=True),
+                find.find(root=path, name=".*practice.*",
+                          search_type=search_type, threads=4, sort=True))
+
+    def test_threads_under_latency(self):
+        """Test that slow directory listings are taken by several threads
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        listed_by = set()
+        with bench_find.simulated_latency(0.05):
+            scandir = os.scandir
+
+            def recorded_scandir(*args, **kwargs):
+                listed_by.add(threading.get_ident())
+                return scandir(*args, **kwargs)
+
+            serial = find.find(root=path, name=".*", sort=True)
+            with mock.patch.object(os, "scandir", recorded_scandir):
+                threaded = find.find(root=path, name=".*", threads=4,
+                                     sort=True)
+
+        # One listing for the root, then the three subdirectories are taken by
+        # idle threads while the first is still waiting. Timings are in
+        # bench_find.py --latency.
+        self.assertEqual(serial, threaded)
+        self.assertGreater(len(listed_by), 1)
+        self.assertNotIn(threading.get_ident(), listed_by)
+
+    def test_invalid_threads(self):
+        """Test for correct error handling when passed too few threads
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        self.assertRaises(
+            ValueError,
+            lambda: find.find(root=path, name="", threads=0)
+        )
+
+    def test_find_all(self):
+        """Test that several patterns report their own matches from one walk
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        names = [".*practice.*", "temp_", ".*\\.png$", "missing"]
+        results = find.find_all(root=path, names=names, search_type="f",
+                                sort=True)
+        self.assertEqual(names, list(results))
+        for name in names:
+            self.assertEqual(
+                find.find(root=path, name=name, search_type="f", sort=True),
+                results[name])
+
+    def test_maxdepth(self):
+        """Test that maxdepth limits results and the walk to levels under root
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        expected = {0: [],
+                    1: [os.path.join(path, "practice_1.py"),
+                        os.path.join(path, "temp_practice_dir_2")],
+                    2: find.find(root=path, name=".*practice", sort=True)}
+        for threads in (1, 4):
+            for maxdepth, results in expected.items():
+                self.assertEqual(
+                    find.find(root=path, name=".*practice", threads=threads,
+                              sort=True, maxdepth=maxdepth),
+                    results)
+        self.assertRaises(
+            ValueError,
+            lambda: find.find(root=path, name="", maxdepth=-1)
+        )
+
+    def test_min_size_and_newer(self):
+        """Test that size and modification time filters use each entry's stat
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        file_path = os.path.join(path, "temp_dir_3", "practice_3.py")
+        now = time.time()
+        with open(file_path, "w") as f:
+            f.write("print()\n")
+        os.utime(file_path, (now + 3600, now + 3600))
+        try:
+            for threads in (1, 4):
+                self.assertEqual(
+                    find.find(root=path, name="", search_type="f",
+                              threads=threads, min_size=1),
+                    [file_path])
+                self.assertEqual(
+                    find.find(root=path, name="", threads=threads,
+                              newer=now + 60),
+                    [file_path])
+                self.assertEqual(
+                    find.find(root=path, name="", search_type="f",
+                              threads=threads, min_size=100, newer=now + 60),
+                    [])
+        finally:
+            open(file_path, "w").close()
+        self.assertRaises(
+            ValueError,
+            lambda: find.find(root=path, name="", min_size=-1)
+        )
+
+    def test_follow_symlinks(self):
+        """Test that followed symlinks list each directory once, in a cycle
+        or through several links
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        links = {os.path.join(path, "temp_dir_1", "loop"): path,
+                 os.path.join(path, "temp_dir_1", "again"):
+                     os.path.join(path, "temp_practice_dir_2"),
+                 os.path.join(path, "temp_dir_3", "also"):
+                     os.path.join(path, "temp_practice_dir_2")}
+        for link, target in links.items():
+            os.symlink(target, link)
+        try:
+            plain = find.find(root=path, name=r".*\.py$", sort=True)
+            for threads in (1, 4):
+                run_stats = find.find_stats.Stats()
+                found = find.find(root=path, name=r".*\.py$",
+                                  threads=threads, follow_symlinks=True,
+                                  stats=run_stats)
+                self.assertEqual(
+                    sorted(os.path.basename(entry) for entry in plain),
+                    sorted(os.path.basename(entry) for entry in found))
+                self.assertEqual(4, run_stats.counters["directories"])
+
+            # Without following, links are reported but not descended into
+            self.assertEqual(plain, find.find(root=path, name=r".*\.py$",
+                                              sort=True))
+            self.assertEqual(sorted(links),
+                             find.find(root=path, name="(loop|again|also)$",
+                                       search_type="d", sort=True))
+        finally:
+            for link in links:
+                os.remove(link)
+
+    def test_xdev(self):
+        """Test that xdev does not descend into another filesystem
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        self.assertEqual(find.find(root=path, name="", sort=True),
+                         find.find(root=path, name="", sort=True, xdev=True))
+        if os.stat("/proc").st_dev == os.stat(path).st_dev:
+            return
+        link = os.path.join(path, "temp_dir_3", "proc")
+        os.symlink("/proc", link)
+        try:
+            found = find.find(root=path, name="", follow_symlinks=True,
+                              xdev=True)
+            self.assertIn(link, found)
+            self.assertFalse([entry for entry in found
+                              if entry.startswith(os.path.join(link, ""))])
+        finally:
+            os.remove(link)
+
+    def test_walk_options_with_index(self):
+        """Test that following symlinks or xdev cannot query an index
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY)
+        for option in ("follow_symlinks", "xdev"):
+            self.assertRaises(
+                ValueError,
+                lambda: find.find(root=path, name="", index="find.idx",
+                                  **{option: True}))
+
+    def test_newer_option(self):
+        """Test that --newer takes a reference path or an ISO date
+        """
+        path = os.path.join(os.getcwd(), _TOP_DIRECTORY, "practice_1.py")
+        self.assertEqual(find._newer(path), os.stat(path).st_mtime)
+        self.assertEqual(find._newer("1970-01-02T00:00:00+00:00"), 86400)
+        self.assertRaises(ValueError, lambda: find._newer("yesterday"))
+
     def test_invalid_root(self):
         """Test if the program will properly terminate when given invalid path
         """
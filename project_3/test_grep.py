@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import find
+import grep
+
+# File name and contents, one result file is large enough to be mapped
+_FILES = {"rw70-8k.json": b'{"global options" : {"rw" : "rw"}}',
+          "write-8k.json": b'{"global options" : {"rw" : "write"}}',
+          "rw50-1M.json": b" " * (grep._READ_SIZE * 2) + b'"rw" : "rw"',
+          "notes.txt": b'"rw" : "rw"'}
+
+
+class TestGrep(unittest.TestCase):
+    """Unit tests for grep.py
+    """
+    def setUp(self):
+        """Creates the files in a temporary directory
+        """
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, "rw-results"))
+        for name, contents in _FILES.items():
+            with open(os.path.join(self.directory, name), "wb") as f:
+                f.write(contents)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def test_literal_and_regex(self):
+        """Test that literal and regex patterns find the same files
+        """
+        for pattern in ('"rw" : "rw"', r'"rw"\s*:\s*"rw"'):
+            search = grep.ContentSearch(pattern)
+            self.assertTrue(search(self._path("rw70-8k.json")))
+            self.assertTrue(search(self._path("rw50-1M.json")))
+            self.assertFalse(search(self._path("write-8k.json")))
+
+    def test_max_size(self):
+        """Test that files over the max size never match
+        """
+        search = grep.ContentSearch('"rw" : "rw"', max_size=grep._READ_SIZE)
+        self.assertTrue(search(self._path("rw70-8k.json")))
+        self.assertFalse(search(self._path("rw50-1M.json")))
+
+    def test_unreadable(self):
+        """Test that a file that cannot be read does not match
+        """
+        search = grep.ContentSearch("rw")
+        self.assertFalse(search(self._path("not-a-valid-path")))
+        self.assertFalse(search(self._path("rw-results")))
+
+    def test_grep_keeps_order(self):
+        """Test that matching pairs are yielded in the order given
+        """
+        names = sorted(_FILES) * 20
+        hits = [(self._path(name), i) for i, name in enumerate(names)]
+        found = list(grep.grep(hits, grep.ContentSearch('"rw" : "rw"'), 3))
+        self.assertEqual([(path, i) for path, i in hits
+                          if not path.endswith("write-8k.json")], found)
+
+    def test_find_contains(self):
+        """Test find() with contents, skipping directories and large files
+        """
+        for threads in (1, 2):
+            results = find.find(root=self.directory, name=r"rw.*",
+                                threads=threads, sort=True,
+                                contains='"rw" : "rw"')
+            self.assertEqual([self._path("rw50-1M.json"),
+                              self._path("rw70-8k.json")], results)
+        results = find.find(root=self.directory, name=r".*\.json$",
+                            contains='"rw" : "rw"', max_size=1024)
+        self.assertEqual([self._path("rw70-8k.json")], results)
+        results = find.find_all(root=self.directory,
+                                names=[r".*\.json$", r".*\.txt$"],
+                                sort=True, contains=r'"rw" : "w')
+        self.assertEqual({r".*\.json$": [self._path("write-8k.json")],
+                          r".*\.txt$": []}, results)
+
+    def test_invalid_contains(self):
+        """Test for correct error handling of invalid contents patterns
+        """
+        self.assertRaises(
+            ValueError,
+            lambda: find.find(root=self.directory, contains="(")
+        )
+        self.assertRaises(
+            ValueError,
+            lambda: find.find(root=self.directory, contains="rw", max_size=-1)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
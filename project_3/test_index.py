@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import find
+import index
+
+_DIRECTORIES = ["temp_dir_1",
+                "temp_practice_dir_2",
+                os.path.join("temp_practice_dir_2", "nested"),
+                "temp_dir_3"]
+_FILES = ["practice_1.py",
+          os.path.join("temp_practice_dir_2", "practice_2.py"),
+          os.path.join("temp_practice_dir_2", "logo.png"),
+          os.path.join("temp_practice_dir_2", "nested", "practice_4.py"),
+          os.path.join("temp_dir_3", "practice_3.py")]
+
+
+class TestIndex(unittest.TestCase):
+    """Unit tests for index.py
+    """
+    def setUp(self):
+        """Creates a directory tree and an index path in a temporary directory
+        """
+        self.directory = tempfile.mkdtemp()
+        self.root = os.path.join(self.directory, "top_level_dir")
+        os.mkdir(self.root)
+        for directory in _DIRECTORIES:
+            os.mkdir(os.path.join(self.root, directory))
+        for file in _FILES:
+            open(os.path.join(self.root, file), "w").close()
+        self.index_path = os.path.join(self.directory, "find.idx")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _assert_same_as_walk(self, root: str, name: str, search_type=None,
+                             **options):
+        """Checks that an index query returns the same paths as a live walk
+        """
+        self.assertEqual(
+            find.find(root=root, name=name, search_type=search_type,
+                      sort=True, **options),
+            find.find(root=root, name=name, search_type=search_type,
+                      sort=True, index=self.index_path, **options))
+
+    def test_query_matches_walk(self):
+        """Test that queries against the index match a live walk
+        """
+        self.assertEqual((5, 0), index.build(self.root, self.index_path))
+        for search_type in (None, "f", "d"):
+            self._assert_same_as_walk(self.root, ".*practice.*", search_type)
+        self._assert_same_as_walk(self.root, "logo")
+
+    def test_query_predicates(self):
+        """Test that depth, size and time filters on the index match a walk
+        """
+        with open(os.path.join(self.root, _FILES[3]), "w") as f:
+            f.write("print()\n")
+        index.build(self.root, self.index_path)
+        for maxdepth in (0, 1, 2, 3):
+            self._assert_same_as_walk(self.root, ".*", maxdepth=maxdepth)
+        self._assert_same_as_walk(self.root, ".*", "f", min_size=1)
+        self._assert_same_as_walk(self.root, ".*", newer=time.time() - 3600)
+        self._assert_same_as_walk(self.root, ".*", newer=time.time() + 3600)
+
+    def test_query_subdirectory(self):
+        """Test querying a directory below the indexed root
+        """
+        index.build(self.root, self.index_path)
+        self._assert_same_as_walk(
+            os.path.join(self.root, "temp_practice_dir_2"), ".*")
+
+    def test_refresh(self):
+        """Test that a refresh only lists directories that changed
+        """
+        index.build(self.root, self.index_path)
+        self.assertEqual((0, 5), index.build(self.root, self.index_path))
+
+        # Make sure the directory mtime moves on coarse filesystems
+        time.sleep(0.01)
+        nested = os.path.join(self.root, "temp_practice_dir_2", "nested")
+        open(os.path.join(nested, "practice_5.py"), "w").close()
+        os.remove(os.path.join(self.root, "temp_dir_3", "practice_3.py"))
+        self.assertEqual((2, 3), index.build(self.root, self.index_path))
+        self._assert_same_as_walk(self.root, ".*practice.*")
+
+    def test_uncovered_root(self):
+        """Test querying a root outside of the indexed tree
+        """
+        index.build(os.path.join(self.root, "temp_dir_3"), self.index_path)
+        self.assertRaises(
+            ValueError,
+            lambda: find.find(root=self.root, name="", index=self.index_path)
+        )
+
+    def test_invalid_index(self):
+        """Test opening a file that is not an index
+        """
+        with open(self.index_path, "wb") as f:
+            f.write(b"not an index")
+        self.assertRaises(ValueError, lambda: index.Index(self.index_path))
+
+    def test_commandline_index(self):
+        """Test building an index and querying it through main()
+        """
+        find.main(args=["index", "--root", self.root,
+                        "--index", self.index_path])
+        self.assertTrue(os.path.exists(self.index_path))
+        self._assert_same_as_walk(self.root, ".*")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import re
+import unittest
+
+from patterns import MultiMatcher
+
+_NAMES = ["rw70-8k.json",
+          "rw70-1M.json",
+          "rw50-8k.json",
+          "read-8k.json",
+          "write-1M.json",
+          "sumary-results.csv",
+          "results.json.bak",
+          ".json",
+          "json",
+          "rw70-",
+          "rw70-8k.json\n",
+          "a\nrw70-8k.json",
+          "notes.txt",
+          ""]
+
+_PATTERNS = ["^rw70-",
+             "rw70-",
+             "rw70-.*",
+             "rw70-8k.json$",
+             "rw70-8k\\.json$",
+             ".*\\.json$",
+             ".*\\.csv$",
+             ".*results\\.csv$",
+             ".*8k.*",
+             ".*8k",
+             "",
+             ".*",
+             ".*$",
+             "$",
+             "^",
+             "r.*json",
+             "rw[57]0-",
+             "(?i)RW70",
+             "rw70\\-",
+             "\\.json",
+             "a\\\\.*"]
+
+
+class TestMultiMatcher(unittest.TestCase):
+    """Unit tests for patterns.py
+    """
+    def test_same_as_regex(self):
+        """Test that every fast path agrees with re.match
+        """
+        matcher = MultiMatcher(_PATTERNS)
+        for name in _NAMES:
+            expected = tuple(i for i, pattern in enumerate(_PATTERNS)
+                             if re.match(pattern, name))
+            self.assertEqual(expected, matcher(name), repr(name))
+
+    def test_literal_paths_skip_regex(self):
+        """Test that anchored literals are not left to the regex engine
+        """
+        matcher = MultiMatcher(["^rw70-", ".*\\.json$", ".*\\.csv$",
+                                "read-8k\\.json$", ".*8k.*", ".*"])
+        self.assertEqual([], matcher._regexes)
+
+    def test_invalid_pattern(self):
+        """Test for correct error handling when passed an invalid pattern
+        """
+        self.assertRaises(ValueError, lambda: MultiMatcher(["ok", "*bad"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+import find
+import stats
+
+
+class TestStats(unittest.TestCase):
+    """Unit tests for stats.py
+    """
+    def test_counters_and_stages(self):
+        """Test that counters add up and stages record time
+        """
+        run_stats = stats.Stats()
+        run_stats.add("files")
+        run_stats.add("files", 2)
+        with run_stats.stage("read"):
+            pass
+        double = run_stats.counted("calls",
+                                   run_stats.timed("double", lambda x: x * 2))
+        self.assertEqual(4, double(2))
+        self.assertEqual({"files": 3, "calls": 1}, run_stats.counters)
+        self.assertEqual({"read", "double"}, set(run_stats.timings))
+
+    def test_merge_after_pickle(self):
+        """Test that a Stats sent back from a worker process merges
+        """
+        worker = stats.Stats()
+        worker.add("files parsed", 4)
+        worker.add_time("read", 0.5)
+        run_stats = stats.Stats()
+        run_stats.add("files parsed")
+        run_stats.merge(pickle.loads(pickle.dumps(worker)))
+        self.assertEqual(5, run_stats.counters["files parsed"])
+        self.assertEqual(0.5, run_stats.timings["read"])
+
+    def test_write_report(self):
+        """Test that the report is written as .json
+        """
+        run_stats = stats.Stats()
+        run_stats.add("matches", 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "stats.json")
+            run_stats.write(path)
+            with open(path) as f:
+                report = json.load(f)
+        self.assertEqual({"matches": 2}, report["counters"])
+        self.assertIn("wall_seconds", report)
+
+    def test_find_stats(self):
+        """Test that find records its directories, evaluations and matches
+        """
+        with tempfile.TemporaryDirectory() as root:
+            os.mkdir(os.path.join(root, "results"))
+            for name in ("rw70-8k.json", os.path.join("results", "a.json"),
+                         os.path.join("results", "b.log")):
+                open(os.path.join(root, name), "w").close()
+            for threads in (1, 4):
+                run_stats = stats.Stats()
+                results = find.find(root=root, name=r".*\.json$",
+                                    threads=threads, stats=run_stats)
+                self.assertEqual(2, len(results))
+                self.assertEqual({"directories": 2, "regex evaluations": 4,
+                                  "matches": 2}, run_stats.counters)
+                self.assertIn("list", run_stats.timings)
+
+
+if __name__ == "__main__":
+    unittest.main()